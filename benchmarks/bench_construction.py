@@ -0,0 +1,57 @@
+"""Measures the construction time of models, flat and with the elements
+nested in a chain of scopes.
+
+    PYTHONPATH=. python benchmarks/bench_construction.py --blocks 2000
+"""
+import argparse
+import time
+from typing import Callable
+
+from synthetic import build_model
+
+from tmac import Asset, Construct, Model, Score
+
+
+def measure(name: str, count: int, func: Callable[[], None]) -> None:
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"{name:<24}{elapsed:>10.3f}s{elapsed / count * 1e6:>10.1f} us/element")
+
+
+def build_nested(depth: int, elements: int) -> None:
+    model = Model("Nested", skip_validation=True)
+
+    scope: "Construct" = model
+    for i in range(depth):
+        scope = Construct(scope, f"scope-{i}")
+
+    for i in range(elements):
+        Asset(
+            scope,
+            f"Asset{i}",
+            confidentiality=Score.LOW,
+            integrity=Score.LOW,
+            availability=Score.LOW,
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--blocks", type=int, default=1000)
+    parser.add_argument("--elements", type=int, default=20000)
+    args = parser.parse_args()
+
+    # 6 components, 6 data flows and 6 assets per block
+    measure("synthetic", args.blocks * 18, lambda: build_model(args.blocks))
+
+    for depth in [1, 10, 100]:
+        measure(
+            f"nested depth {depth}",
+            args.elements,
+            lambda: build_nested(depth, args.elements),
+        )
+
+
+if __name__ == "__main__":
+    main()
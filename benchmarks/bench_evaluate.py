@@ -0,0 +1,33 @@
+"""Compares serial, vectorized and parallel evaluation.
+
+    PYTHONPATH=. python benchmarks/bench_evaluate.py --blocks 2000 --workers 4
+"""
+import argparse
+import time
+
+from synthetic import build_model
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--blocks", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    variants = [
+        ("serial", dict()),
+        ("vectorized", dict(vectorized=True)),
+        ("thread", dict(workers=args.workers, executor="thread")),
+        ("process", dict(workers=args.workers, executor="process")),
+    ]
+
+    for name, kwargs in variants:
+        model = build_model(args.blocks)
+        start = time.perf_counter()
+        model.evaluate(**kwargs)
+        elapsed = time.perf_counter() - start
+        print(f"{name:<12}{len(model.risks):>10} risks{elapsed:>10.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""Measures the fingerprint of a model, computed from scratch and after a
+change of one component.
+
+    PYTHONPATH=. python benchmarks/bench_fingerprint.py --blocks 2000
+"""
+import argparse
+import time
+from typing import Callable
+
+from synthetic import build_model
+
+from tmac import Technology
+
+
+def measure(name: str, func: Callable[[], None]) -> None:
+    start = time.perf_counter()
+    func()
+    print(f"{name:<24}{time.perf_counter() - start:>10.4f}s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--blocks", type=int, default=1000)
+    args = parser.parse_args()
+
+    model = build_model(args.blocks)
+
+    measure("full", model.fingerprint)
+    measure("unchanged", model.fingerprint)
+
+    component = model.components[len(model.components) // 2]
+    component.technology = Technology.WEB_SERVER
+    measure("one component changed", model.fingerprint)
+
+
+if __name__ == "__main__":
+    main()
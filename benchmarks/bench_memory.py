@@ -0,0 +1,53 @@
+"""Measures the memory of the elements of a model and of its risks and user
+stories.
+
+    PYTHONPATH=. python benchmarks/bench_memory.py --blocks 2000
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+
+from synthetic import build_model
+
+from tmac import Element
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--blocks", type=int, default=1000)
+    parser.add_argument("--evaluate", action="store_true", help="also evaluate")
+    args = parser.parse_args()
+
+    gc.collect()
+    tracemalloc.start()
+
+    start = time.perf_counter()
+    model = build_model(args.blocks)
+    elapsed = time.perf_counter() - start
+
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    elements = len(model._find_all_of_type(Element))
+    print(f"elements      {elements:>10}{elapsed:>10.3f}s{size / 2**20:>10.1f} MiB")
+    print(f"per element   {size / elements:>10.0f} bytes")
+
+    if args.evaluate:
+        start = time.perf_counter()
+        risks = model.risks
+        stories = model.user_stories
+        elapsed = time.perf_counter() - start
+
+        gc.collect()
+        evaluated, _ = tracemalloc.get_traced_memory()
+        count = len(risks) + len(stories)
+        print(
+            f"risks+stories {count:>10}{elapsed:>10.3f}s{(evaluated - size) / 2**20:>10.1f} MiB"
+        )
+        print(f"per object    {(evaluated - size) / count:>10.0f} bytes")
+
+    tracemalloc.stop()
+
+
+if __name__ == "__main__":
+    main()
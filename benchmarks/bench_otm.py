@@ -0,0 +1,42 @@
+"""Compares peak memory and time of Model.otm and Model.write_otm.
+
+    PYTHONPATH=. python benchmarks/bench_otm.py --blocks 2000
+"""
+import argparse
+import os
+import time
+import tracemalloc
+from typing import Callable
+
+from synthetic import build_model
+
+
+def measure(name: str, func: Callable[[], None]) -> None:
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<24}{elapsed:>10.3f}s{peak / 2**20:>10.1f} MiB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--blocks", type=int, default=1000)
+    args = parser.parse_args()
+
+    model = build_model(args.blocks)
+
+    def otm() -> None:
+        with open(os.devnull, "w", encoding="utf8") as f:
+            f.write(str(model.otm))
+
+    measure("otm", otm)
+    measure("write_otm", lambda: model.write_otm(os.devnull))
+    measure("write_otm compact", lambda: model.write_otm(os.devnull, compact=True))
+    measure("write_otm gzip", lambda: model.write_otm(os.devnull, gzip=True))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Compares the per-class OTM serializers with the former __dict__ encoder.
+
+    PYTHONPATH=. python benchmarks/bench_otm_encoder.py --components 10000
+"""
+import argparse
+import json
+import time
+from typing import Any, Callable
+
+from synthetic import build_model
+
+
+class LegacyEncoder(json.JSONEncoder):
+    # the encoder before the per-class serializers
+    def default(self, o: Any) -> Any:
+        if isinstance(o, set):
+            return list(o)
+        return {k: v for k, v in o.__dict__.items() if v is not None}
+
+
+def measure(name: str, func: Callable[[], str], repeat: int = 3) -> None:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    print(f"{name:<28}{best:>10.3f}s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--components", type=int, default=10000)
+    args = parser.parse_args()
+
+    # six components per block
+    model = build_model(-(-args.components // 6))
+    otm = model.otm
+
+    measure("legacy indent=4", lambda: json.dumps(otm, cls=LegacyEncoder, indent=4))
+    measure("legacy compact", lambda: json.dumps(otm, cls=LegacyEncoder))
+    measure("to_dict", lambda: str(len(otm.to_dict())))
+    measure("to_json indent=4", lambda: otm.to_json(indent=4))
+    measure("to_json compact", lambda: otm.to_json(indent=None))
+    measure(
+        "to_json compact stdlib",
+        lambda: json.dumps(otm.to_dict(), separators=(",", ":")),
+    )
+    measure("model.otm.to_json compact", lambda: model.otm.to_json(indent=None))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Synthetic models for the benchmarks."""
+from tmac import (
+    DataFormat,
+    DataStore,
+    Model,
+    Process,
+    Protocol,
+    Score,
+    Technology,
+    TrustBoundary,
+)
+from tmac.plus import Browser, Database
+
+
+def build_model(blocks: int, **kwargs) -> "Model":
+    """Builds a model of blocks of six connected components."""
+    kwargs.setdefault("skip_validation", True)
+    model = Model("Synthetic", **kwargs)
+
+    internet = TrustBoundary(model, "Internet")
+    dmz = TrustBoundary(model, "DMZ")
+    intranet = TrustBoundary(model, "Intranet")
+
+    for i in range(blocks):
+        browser = Browser(model, f"Browser{i}", trust_boundary=internet)
+        web = Process(
+            model,
+            f"WebServer{i}",
+            technology=Technology.WEB_APPLICATION,
+            trust_boundary=dmz,
+            accepts_data_formats=[DataFormat.XML, DataFormat.FILE],
+        )
+        api = Process(
+            model,
+            f"Api{i}",
+            technology=Technology.WEB_SERVICE_REST,
+            trust_boundary=dmz,
+            accepts_data_formats=[DataFormat.JSON],
+        )
+        db = Database(model, f"Database{i}", trust_boundary=intranet)
+        fs = DataStore(model, f"Files{i}", technology=Technology.FILE_SERVER)
+        ldap = Process(model, f"Ldap{i}", technology=Technology.UNKNOWN)
+
+        for name, source, destination, protocol in [
+            ("WebTraffic", browser, web, Protocol.HTTPS),
+            ("Api", web, api, Protocol.HTTP),
+            ("Db", api, db, Protocol.SQL),
+            ("NoSql", api, db, Protocol.NOSQL),
+            ("Fs", web, fs, Protocol.NFS),
+            ("Ldap", web, ldap, Protocol.LDAP),
+        ]:
+            flow = source.add_data_flow(
+                f"{name}{i}", destination=destination, protocol=protocol
+            )
+            flow.transfers(
+                f"Data{name}{i}",
+                confidentiality=Score.HIGH,
+                integrity=Score.HIGH,
+                availability=Score.HIGH,
+            )
+
+    return model
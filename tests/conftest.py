@@ -1,3 +1,5 @@
+from pathlib import Path
+
 import pytest 
 from tmac import Construct, Model
 
@@ -8,3 +10,8 @@ def root() -> "Construct":
 @pytest.fixture
 def model() -> "Model":
     return Model("Model")
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path: "Path", monkeypatch: "pytest.MonkeyPatch") -> None:
+    # tests must not write to the cache in the home directory
+    monkeypatch.setenv("TMAC_CACHE_DIR", str(tmp_path / "cache"))
@@ -0,0 +1,154 @@
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, List
+
+import pytest
+
+from tmac import (
+    DataFormat,
+    Model,
+    Process,
+    Protocol,
+    Score,
+    Technology,
+    ThreatLibrary,
+)
+from tmac.cache import EvaluationCache
+from tmac.threat_library import DEFAULT_THREAT_LIBRARY
+
+if TYPE_CHECKING:
+    from tmac import Risk
+
+
+def build(cache_dir: "Path") -> "Model":
+    model = Model("Model", skip_validation=True, cache_dir=str(cache_dir))
+    a = Process(model, "A", technology=Technology.WEB_APPLICATION)
+    b = Process(model, "B", technology=Technology.WEB_SERVICE_REST)
+    c = Process(model, "C", technology=Technology.DATABASE)
+    a.add_data_flow("Request", destination=b, protocol=Protocol.HTTPS).transfers(
+        "Data",
+        confidentiality=Score.HIGH,
+        integrity=Score.HIGH,
+        availability=Score.HIGH,
+    )
+    b.add_data_flow("Query", destination=c, protocol=Protocol.SQL)
+    model.accept_risk("CAPEC-63@A")
+    return model
+
+
+def entries(cache_dir: "Path") -> List[str]:
+    return sorted(p.name for p in cache_dir.glob("evaluation-*.json"))
+
+
+def test_evaluate_cached(tmp_path: "Path", monkeypatch: "pytest.MonkeyPatch") -> None:
+    expected = build(tmp_path)
+    expected.evaluate()
+    assert len(entries(tmp_path)) == 1
+
+    def apply(*args: Any, **kwargs: Any) -> List["Risk"]:
+        raise AssertionError("threats applied on a cache hit")
+
+    model = build(tmp_path)
+    monkeypatch.setattr(ThreatLibrary, "apply", apply)
+    model.evaluate()
+    monkeypatch.undo()
+
+    assert [r.id for r in model.risks] == [r.id for r in expected.risks]
+    assert [r.treatment.state for r in model.risks] == [
+        r.treatment.state for r in expected.risks
+    ]
+    assert sorted((s.id, s.state) for s in model.user_stories) == sorted(
+        (s.id, s.state) for s in expected.user_stories
+    )
+    assert all(r.model is model for r in model.risks)
+
+    # changes after the hit are evaluated incrementally
+    model.components[2].technology = Technology.WEB_SERVER
+    assert len(model.risks) != len(expected.risks)
+
+
+def test_evaluate_cache_miss(tmp_path: "Path") -> None:
+    model = build(tmp_path)
+    model.evaluate()
+
+    model = build(tmp_path)
+    model.components[0].technology = Technology.WEB_SERVER
+    model.evaluate()
+    assert len(entries(tmp_path)) == 2
+
+    # a corrupt entry is a miss and is replaced
+    for name in entries(tmp_path):
+        (tmp_path / name).write_text("{")
+    model = build(tmp_path)
+    model.evaluate()
+    assert [r.id for r in model.risks] == [r.id for r in build(tmp_path).risks]
+
+
+def test_evaluate_cache_key_covers_threat_library(tmp_path: "Path") -> None:
+    model = build(tmp_path)
+    model.evaluate()
+
+    lib = ThreatLibrary()
+    lib.add_threats(*DEFAULT_THREAT_LIBRARY.values())
+    assert lib.fingerprint() == DEFAULT_THREAT_LIBRARY.fingerprint()
+
+    fingerprint = lib.fingerprint()
+    lib.excludes = ["CAPEC-63"]
+    assert lib.fingerprint() != fingerprint
+
+    model = Model("Model", skip_validation=True, threat_library=lib)
+    model.evaluation_cache = EvaluationCache(str(tmp_path))
+    Process(model, "A", technology=Technology.WEB_APPLICATION)
+    model.evaluate()
+    assert "CAPEC-63@A" not in [r.id for r in model.risks]
+
+
+def test_evaluate_cache_key_covers_tmac_sources(
+    tmp_path: "Path", monkeypatch: "pytest.MonkeyPatch"
+) -> None:
+    build(tmp_path).evaluate()
+
+    # another version of tmac
+    monkeypatch.setattr("tmac.model.source_fingerprint", lambda: "other")
+    build(tmp_path).evaluate()
+    assert len(entries(tmp_path)) == 2
+
+
+def test_eviction(tmp_path: "Path") -> None:
+    cache = EvaluationCache(str(tmp_path), max_size=250)
+    for i in range(4):
+        path = tmp_path / f"evaluation-{i}.json"
+        path.write_text(f'{{"data": "{"x" * 90}"}}')
+        os.utime(path, (i, i))
+
+    # reading an entry makes it the most recently used
+    assert cache.get("0") == {"data": "x" * 90}
+    cache.put("4", {"data": "x" * 90})
+
+    assert entries(tmp_path) == ["evaluation-0.json", "evaluation-4.json"]
+    assert cache.get("1") is None
+
+
+def test_evaluate_cache_key_follows_changes(tmp_path: "Path") -> None:
+    model = build(tmp_path)
+    a = model.components[0]
+    model.fingerprint()
+    a.accepts_data_formats = {*a.accepts_data_formats, DataFormat.FILE}
+    model.evaluate()
+    assert "CAPEC-17@A" in [r.id for r in model.risks]
+
+    # the entry of the changed content is not restored for the original one
+    model = build(tmp_path)
+    model.evaluate()
+    assert "CAPEC-17@A" not in [r.id for r in model.risks]
+    assert len(entries(tmp_path)) == 2
+
+
+def test_entries_readable_by_other_users(tmp_path: "Path") -> None:
+    umask = os.umask(0o022)
+    try:
+        EvaluationCache(str(tmp_path)).put("key", {})
+    finally:
+        os.umask(umask)
+
+    assert (tmp_path / "evaluation-key.json").stat().st_mode & 0o777 == 0o644
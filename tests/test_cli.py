@@ -0,0 +1,128 @@
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from tmac.cli import Status, discover, main
+
+MODEL = """
+from tmac import Model, Process, Protocol, Technology
+from tmac.plus import Browser
+
+model = Model("{name}")
+browser = Browser(model, "Browser")
+web_server = Process(model, "WebServer", technology=Technology.WEB_APPLICATION)
+web_traffic = browser.add_data_flow(
+    "WebTraffic", destination=web_server, protocol=Protocol.HTTPS
+)
+web_traffic.transfers("UserCredentials")
+model.accept_risk("CAPEC-63@WebServer")
+print(model.create_risks_table())
+"""
+
+
+def write(path: str, content: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf8") as f:
+        f.write(content)
+
+
+def test_discover(tmp_path: "Path") -> None:
+    write(str(tmp_path / "a" / "model.py"), "")
+    write(str(tmp_path / "b" / "model.py"), "")
+    write(str(tmp_path / "b" / "notes.txt"), "")
+    write(str(tmp_path / ".venv" / "model.py"), "")
+
+    assert discover([str(tmp_path)], ["*.py"]) == [
+        str(tmp_path / "a" / "model.py"),
+        str(tmp_path / "b" / "model.py"),
+    ]
+
+
+def test_main(tmp_path: "Path") -> None:
+    write(str(tmp_path / "models" / "a.py"), MODEL.format(name="A"))
+    write(str(tmp_path / "models" / "b.py"), MODEL.format(name="B"))
+    write(str(tmp_path / "models" / "error.py"), "raise RuntimeError('broken')")
+    write(str(tmp_path / "models" / "exit.py"), "import sys\nsys.exit(2)")
+    write(str(tmp_path / "models" / "crash.py"), "import os\nos._exit(1)")
+    write(str(tmp_path / "models" / "helper.py"), "VALUE = 1")
+    write(
+        str(tmp_path / "models" / "c.otm.json"),
+        json.dumps({"project": {"name": "C", "id": "c"}, "components": []}),
+    )
+
+    output = str(tmp_path / "summary.json")
+    code = main(
+        [str(tmp_path / "models"), "--workers", "2", "--format", "json", "-o", output]
+    )
+
+    with open(output, encoding="utf8") as f:
+        results = {os.path.basename(r["path"]): r for r in json.load(f)}
+
+    assert code == 1
+    assert results["a.py"]["status"] == Status.OK
+    assert results["a.py"]["models"][0]["name"] == "A"
+    assert results["b.py"]["models"][0]["name"] == "B"
+    assert results["c.otm.json"]["models"][0]["name"] == "C"
+    assert ("CAPEC-63@WebServer", "accepted") in [
+        (r["id"], r["treatment"]) for r in results["a.py"]["models"][0]["risks"]
+    ]
+    assert results["error.py"]["status"] == Status.FAILED
+    assert results["error.py"]["error"] == "RuntimeError: broken"
+    assert results["exit.py"]["status"] == Status.FAILED
+    assert results["crash.py"]["status"] == Status.FAILED
+    assert results["helper.py"]["status"] == Status.SKIPPED
+
+
+def test_main_table(tmp_path: "Path", capsys: "pytest.CaptureFixture[str]") -> None:
+    write(str(tmp_path / "a.py"), MODEL.format(name="A"))
+
+    assert main([str(tmp_path / "a.py"), "--workers", "1"]) == 0
+
+    out = capsys.readouterr().out
+    assert "Total" in out
+
+    row = next(line for line in out.splitlines() if str(tmp_path) in line)
+    _, name, risks, unchecked, user_stories, open_user_stories = row.split()[:6]
+    assert name == "A"
+    assert int(risks) > int(unchecked) > 0
+    # draft user stories are open
+    assert int(open_user_stories) == int(user_stories) > 0
+
+
+def test_main_one_worker_crash(tmp_path: "Path") -> None:
+    write(str(tmp_path / "a.py"), MODEL.format(name="A"))
+    write(str(tmp_path / "crash.py"), "import os\nos._exit(3)")
+
+    output = str(tmp_path / "summary.json")
+    code = main([str(tmp_path), "--workers", "1", "--format", "json", "-o", output])
+
+    with open(output, encoding="utf8") as f:
+        results = {os.path.basename(r["path"]): r for r in json.load(f)}
+
+    assert code == 1
+    assert results["a.py"]["status"] == Status.OK
+    assert results["crash.py"]["status"] == Status.FAILED
+
+
+def test_main_example(tmp_path: "Path") -> None:
+    example = tmp_path / "example.py"
+    example.write_text(
+        (Path(__file__).parent.parent / "examples" / "example.py").read_text(
+            encoding="utf8"
+        ),
+        encoding="utf8",
+    )
+
+    output = str(tmp_path / "summary.json")
+    code = main([str(example), "--workers", "1", "--format", "json", "-o", output])
+
+    with open(output, encoding="utf8") as f:
+        results = json.load(f)
+
+    assert code == 0
+    assert results[0]["status"] == Status.OK
+    assert results[0]["models"][0]["name"] == "Demo Model"
+    # the diagram and the report of the example are not created
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["example.py", "summary.json"]
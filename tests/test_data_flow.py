@@ -0,0 +1,40 @@
+from tmac import Model, Process, Protocol, Technology
+
+
+def test_flow_adjacency(model: "Model") -> None:
+    a = Process(model, "A", technology=Technology.WEB_APPLICATION)
+    b = Process(model, "B", technology=Technology.WEB_SERVICE_REST)
+    c = Process(model, "C", technology=Technology.DATABASE)
+
+    ab = a.add_data_flow("AB", destination=b, protocol=Protocol.HTTPS)
+    bc = b.add_data_flow("BC", destination=c, protocol=Protocol.SQL)
+
+    assert a.incoming_flows == []
+    assert a.outgoing_flows == [ab]
+    assert b.incoming_flows == [ab]
+    assert b.outgoing_flows == [bc]
+    assert c.incoming_flows == [bc]
+
+
+def test_flow_adjacency_follows_reassignment(model: "Model") -> None:
+    a = Process(model, "A", technology=Technology.WEB_APPLICATION)
+    b = Process(model, "B", technology=Technology.WEB_SERVICE_REST)
+    c = Process(model, "C", technology=Technology.DATABASE)
+
+    flow = a.add_data_flow("Flow", destination=b, protocol=Protocol.HTTPS)
+    flow.destination = c
+
+    assert b.incoming_flows == []
+    assert c.incoming_flows == [flow]
+
+
+def test_flow_adjacency_survives_evaluate() -> None:
+    model = Model("Model", skip_validation=True)
+    a = Process(model, "A", technology=Technology.WEB_APPLICATION)
+    b = Process(model, "B", technology=Technology.WEB_SERVICE_REST)
+    flow = a.add_data_flow("Flow", destination=b, protocol=Protocol.HTTPS)
+
+    model.evaluate()
+
+    assert a.outgoing_flows == [flow]
+    assert b.incoming_flows == [flow]
@@ -0,0 +1,105 @@
+import pickle
+
+from tmac import (
+    DataFormat,
+    Model,
+    Process,
+    Protocol,
+    Score,
+    Technology,
+    TrustBoundary,
+)
+
+
+def build() -> "Model":
+    model = Model("Model", skip_validation=True)
+    outer = TrustBoundary(model, "Outer")
+    TrustBoundary(model, "Inner", trust_boundary=outer)
+    a = Process(model, "A", technology=Technology.WEB_APPLICATION, trust_boundary=outer)
+    b = Process(model, "B", technology=Technology.WEB_SERVICE_REST)
+    flow = a.add_data_flow("Flow", destination=b, protocol=Protocol.HTTPS)
+    flow.transfers(
+        "Data",
+        confidentiality=Score.HIGH,
+        integrity=Score.HIGH,
+        availability=Score.HIGH,
+    )
+    return model
+
+
+def test_fingerprint_stable() -> None:
+    model = build()
+    assert model.fingerprint() == build().fingerprint()
+    assert model.fingerprint() == model.fingerprint()
+    assert len(model.fingerprint()) == 64
+
+    restored = pickle.loads(pickle.dumps(model))
+    assert restored.fingerprint() == model.fingerprint()
+
+
+def test_fingerprint_changes() -> None:
+    model = build()
+    a, b = model.components
+    outer, inner = model.trust_boundaries
+    flow = model.data_flows[0]
+    asset = model.assets[0]
+
+    changes = [
+        lambda: setattr(a, "technology", Technology.WEB_SERVER),
+        lambda: setattr(flow, "protocol", Protocol.HTTP),
+        lambda: setattr(asset, "confidentiality", Score.LOW),
+        lambda: setattr(inner, "trust_boundary", None),
+        lambda: setattr(b, "trust_boundary", inner),
+        lambda: setattr(flow, "destination", a),
+        lambda: b.add_tags("internal"),
+        lambda: model.add_tags("internal"),
+        lambda: model.accept_risk("CAPEC-63@A"),
+        lambda: model.close_user_story("ASVS-1.2.3@CAPEC-62@A@Flow"),
+        lambda: Process(model, "C", technology=Technology.WEB_APPLICATION),
+    ]
+
+    fingerprints = {model.fingerprint()}
+    for change in changes:
+        change()
+        fingerprints.add(model.fingerprint())
+
+    assert len(fingerprints) == len(changes) + 1
+
+
+def test_fingerprint_reuses_unchanged_subtrees() -> None:
+    model = build()
+    a, b = model.components
+    flow = model.data_flows[0]
+    fingerprint = model.fingerprint()
+
+    digest = model._digests[b]
+    b.technology = Technology.WEB_SERVICE_SOAP
+    assert a in model._digests
+    assert flow in model._digests
+    assert b not in model._digests
+
+    model.fingerprint()
+    assert model._digests[b] != digest
+
+    b.technology = Technology.WEB_SERVICE_REST
+    assert model.fingerprint() == fingerprint
+
+
+def test_fingerprint_collection_changes() -> None:
+    model = build()
+    a, b = model.components
+    fingerprint = model.fingerprint()
+
+    # changes in place clear the cached digests like assignments
+    a.accepts_data_formats.add(DataFormat.FILE)
+    assert a not in model._digests
+    assert model.fingerprint() != fingerprint
+
+    a.accepts_data_formats.discard(DataFormat.FILE)
+    assert model.fingerprint() == fingerprint
+
+    a.accepts_data_formats = {DataFormat.FILE}
+    assert model.fingerprint() != fingerprint
+
+    a.accepts_data_formats = set()
+    assert model.fingerprint() == fingerprint
@@ -0,0 +1,40 @@
+import os
+import subprocess
+import sys
+from typing import Set
+
+
+def imported_modules(statement: str) -> Set[str]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    modules: Set[str] = set()
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            modules.add(line.rsplit("|", 1)[1].strip())
+
+    return modules
+
+
+def test_import_does_not_load_diagrams() -> None:
+    modules = imported_modules("import tmac, tmac.plus, tmac.plus_aws")
+
+    assert "tmac" in modules
+    assert not any(m.split(".")[0] in ("diagrams", "graphviz") for m in modules)
+
+
+def test_import_does_not_load_jinja2() -> None:
+    modules = imported_modules("import tmac")
+
+    assert not any(m.split(".")[0] == "jinja2" for m in modules)
+
+
+def test_import_does_not_load_orjson() -> None:
+    modules = imported_modules("import tmac")
+
+    assert not any(m.split(".")[0] == "orjson" for m in modules)
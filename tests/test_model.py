@@ -0,0 +1,339 @@
+import pickle
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from tmac import (
+    Asset,
+    DataFormat,
+    IdStrategy,
+    Model,
+    Process,
+    Protocol,
+    Score,
+    Technology,
+    TrustBoundary,
+    UserStoryTemplate,
+    UserStoryTemplateRepository,
+)
+
+
+def test_constructs_by_type(model: "Model") -> None:
+    tb = TrustBoundary(model, "Boundary")
+    a = Process(model, "A", technology=Technology.WEB_APPLICATION)
+    b = Process(model, "B", technology=Technology.WEB_SERVICE_REST)
+    flow = a.add_data_flow("Flow", destination=b, protocol=Protocol.HTTPS)
+    asset = flow.transfers(
+        "Data",
+        confidentiality=Score.HIGH,
+        integrity=Score.HIGH,
+        availability=Score.HIGH,
+    )
+    other = Asset(
+        model,
+        "Other",
+        confidentiality=Score.LOW,
+        integrity=Score.LOW,
+        availability=Score.LOW,
+    )
+
+    assert model.components == [a, b]
+    assert model.data_flows == [flow]
+    assert model.assets == [asset, other]
+    assert model.trust_boundaries == [tb]
+
+
+def test_state_by_id(model: "Model") -> None:
+    assert model.get_state_by_id("CAPEC-63@WebApp") is None
+
+    model.accept_risk("CAPEC-63@WebApp", ticket="T-1")
+    state = model.get_state_by_id("CAPEC-63@WebApp")
+    assert state is not None
+    assert state.state == "accepted"
+    assert state.ticket == "T-1"
+
+    model.mitigate_risk("CAPEC-63@WebApp")
+    assert model.get_state_by_id("CAPEC-63@WebApp") is state
+    assert state.state == "mitigated"
+    assert model.states == [state]
+
+
+def test_deterministic_ids() -> None:
+    def build() -> "Model":
+        model = Model("Model", id_strategy=IdStrategy.DETERMINISTIC)
+        a = Process(model, "A", technology=Technology.WEB_APPLICATION)
+        b = Process(model, "A", technology=Technology.WEB_SERVICE_REST)
+        flow = a.add_data_flow("Flow", destination=b, protocol=Protocol.HTTPS)
+        flow.transfers(
+            "Data",
+            confidentiality=Score.HIGH,
+            integrity=Score.HIGH,
+            availability=Score.HIGH,
+        )
+        return model
+
+    ids = [c.id for c in build().node.find_all()]
+    assert ids == [c.id for c in build().node.find_all()]
+    assert len(set(ids)) == len(ids)
+    assert ids[1].startswith("a-")
+
+    random = Model("Model")
+    assert Process(random, "A", technology=Technology.WEB_APPLICATION).id != ids[1]
+
+
+def test_incremental_evaluate() -> None:
+    model = Model("Model", skip_validation=True)
+    a = Process(model, "A", technology=Technology.WEB_APPLICATION)
+    b = Process(model, "B", technology=Technology.WEB_SERVICE_REST)
+    c = Process(model, "C", technology=Technology.WEB_SERVICE_REST)
+
+    model.evaluate()
+    risks = {r.id: r for r in model.risks}
+    assert list(risks) == ["CAPEC-63@A"]
+
+    flow = b.add_data_flow("Query", destination=c, protocol=Protocol.LDAP)
+    model.evaluate()
+    assert [r.id for r in model.risks] == ["CAPEC-63@A", "CAPEC-136@B@Query"]
+    assert model.risks[0] is risks["CAPEC-63@A"]
+
+    flow.protocol = Protocol.SQL
+    c.technology = Technology.DATABASE
+    assert [r.id for r in model.risks] == ["CAPEC-63@A", "CAPEC-66@B@Query"]
+
+
+def test_construction_not_tracked() -> None:
+    model = Model("Model", skip_validation=True)
+
+    generation = model.generation
+    a = Process(model, "A", technology=Technology.WEB_APPLICATION)
+    # registered and added to its trust boundary, the attributes set by the
+    # constructors are not changes
+    assert model.generation == generation + 2
+
+    a.technology = Technology.WEB_SERVER
+    assert model.generation == generation + 3
+
+
+def test_incremental_evaluate_collections() -> None:
+    model = Model("Model", skip_validation=True)
+    a = Process(model, "A", technology=Technology.WEB_SERVICE_REST)
+    b = Process(model, "B", technology=Technology.WEB_SERVICE_REST)
+    flow = a.add_data_flow("Flow", destination=b, protocol=Protocol.HTTPS)
+
+    assert "CAPEC-17@A" not in [r.id for r in model.risks]
+
+    # changes of collections in place are tracked like assignments
+    a.accepts_data_formats.add(DataFormat.FILE)
+    assert "CAPEC-17@A" in [r.id for r in model.risks]
+
+    a.accepts_data_formats.discard(DataFormat.FILE)
+    assert "CAPEC-17@A" not in [r.id for r in model.risks]
+
+    a.accepts_data_formats |= {DataFormat.FILE}
+    assert "CAPEC-17@A" in [r.id for r in model.risks]
+
+    generation = model.generation
+    flow.assets.clear()
+    assert model.generation > generation
+
+    # a copy of the dict, the caller's dict is not observed
+    attrs = {"color": "red"}
+    c = Process(
+        model, "C", technology=Technology.WEB_SERVER, overwrite_node_attrs=attrs
+    )
+    attrs["color"] = "blue"
+    assert c._overwrite_node_attrs == {"color": "red"}
+
+    generation = model.generation
+    a.add_tags("internal")
+    assert model.generation > generation
+
+
+def test_incremental_evaluate_updates_treatments() -> None:
+    model = Model("Model", skip_validation=True)
+    Process(model, "A", technology=Technology.WEB_APPLICATION)
+
+    assert model.risks[0].treatment.state == "unchecked"
+
+    model.accept_risk("CAPEC-63@A")
+    assert model.risks[0].treatment.state == "accepted"
+
+
+def test_user_stories_materialized_once() -> None:
+    model = Model("Model", skip_validation=True)
+    Process(model, "A", technology=Technology.WEB_APPLICATION)
+
+    risk = model.risks[0]
+    stories = risk.user_stories
+    assert len(stories) > 0
+    assert risk.treatment.state == "unchecked"
+    assert [id(s) for s in risk.user_stories] == [id(s) for s in stories]
+    assert {id(s) for s in model.user_stories} == {id(s) for s in stories}
+
+    # story states are updated in place
+    model.close_user_story(stories[0].id)
+    assert stories[0].state == "closed"
+    assert [id(s) for s in model.risks[0].user_stories] == [id(s) for s in stories]
+
+    for story in stories[1:]:
+        model.close_user_story(story.id)
+    assert model.risks[0].treatment.state == "mitigated"
+
+    # a treatment state of the risk drops its user stories
+    model.accept_risk(risk.id)
+    assert model.risks[0].user_stories == []
+    assert model.user_stories == []
+
+
+def template(id: str, cwe_ids: List[int]) -> "UserStoryTemplate":
+    return UserStoryTemplate(
+        id=id,
+        category="Category",
+        sub_category="",
+        description="",
+        feature_name="",
+        user_story="TODO",
+        scenarios={},
+        references=[],
+        cwe_ids=cwe_ids,
+        nist=[],
+        tags=[],
+    )
+
+
+def test_user_stories_repository_changes() -> None:
+    repository = UserStoryTemplateRepository()
+    repository.add_templates(template("A", [79]))
+    model = Model(
+        "Model", skip_validation=True, user_story_template_repository=repository
+    )
+    Process(model, "A", technology=Technology.WEB_APPLICATION)
+
+    assert len(model.user_stories) == 1
+
+    # templates added after the evaluation
+    repository.add_templates(template("B", [20]))
+    assert len(model.risks[0].user_stories) == 2
+    assert len(model.user_stories) == 2
+
+    generation = model.generation
+    model.user_story_template_repository = UserStoryTemplateRepository()
+    assert model.generation > generation
+    assert model.user_stories == []
+
+    generation = model.generation
+    model.name = "Renamed"
+    assert model.generation > generation
+
+
+def test_pickle() -> None:
+    model = Model("Model", skip_validation=True)
+    a = Process(model, "A", technology=Technology.WEB_APPLICATION)
+    b = Process(model, "B", technology=Technology.WEB_SERVICE_REST)
+    a.add_data_flow("Flow", destination=b, protocol=Protocol.HTTPS)
+    assert not hasattr(a, "__dict__")
+
+    stories = model.user_stories
+    restored = pickle.loads(pickle.dumps(model))
+
+    assert restored.generation == model.generation
+    assert [r.id for r in restored.risks] == [r.id for r in model.risks]
+    assert restored.components[0].outgoing_flows[0].destination.name == "B"
+
+    restored.close_user_story(stories[0].id)
+    assert {s.id: s.state for s in restored.user_stories}[stories[0].id] == "closed"
+
+
+def test_risks_reuse_evaluation(monkeypatch: "pytest.MonkeyPatch") -> None:
+    model = Model("Model", skip_validation=True)
+    a = Process(model, "A", technology=Technology.WEB_APPLICATION)
+
+    calls = 0
+    evaluate = model.evaluate
+
+    def counting_evaluate() -> None:
+        nonlocal calls
+        calls += 1
+        evaluate()
+
+    monkeypatch.setattr(model, "evaluate", counting_evaluate)
+
+    model.risks
+    model.user_stories
+    model.create_risks_table()
+    model.create_backlog_table()
+    assert calls == 1
+
+    generation = model.generation
+    a.technology = Technology.WEB_SERVICE_REST
+    assert model.generation > generation
+    assert model.risks == []
+    assert calls == 2
+
+    model.accept_risk("CAPEC-63@A")
+    model.risks
+    assert calls == 3
+
+
+def test_risks_reevaluate_collection_changes() -> None:
+    model = Model("Model", skip_validation=True)
+    a = Process(model, "A", technology=Technology.UNKNOWN)
+    b = Process(model, "B", technology=Technology.UNKNOWN)
+    flow = a.add_data_flow("Flow", destination=b, protocol=Protocol.HTTPS)
+
+    def risk_ids() -> List[str]:
+        return [r.id for r in model.risks]
+
+    snapshot = model.snapshot()
+    assert "CAPEC-17@A" not in risk_ids()
+
+    generation = model.generation
+    a.accepts_data_formats = {*a.accepts_data_formats, DataFormat.FILE}
+    assert model.generation > generation
+    assert "CAPEC-17@A" in risk_ids()
+    assert model.snapshot() is not snapshot
+    assert "CAPEC-17@A" in [r.id for r in model.snapshot().risks]
+
+    generation = model.generation
+    asset = flow.transfers(
+        "Data",
+        confidentiality=Score.LOW,
+        integrity=Score.LOW,
+        availability=Score.LOW,
+    )
+    assert model.generation > generation
+    risk_ids()
+
+    generation = model.generation
+    asset.confidentiality = Score.HIGH
+    assert model.generation > generation
+    risk_ids()
+
+    generation = model.generation
+    b.add_tags("internal")
+    model.add_tags("internal")
+    assert model.generation > generation + 1
+
+
+def test_create_report(tmp_path: "Path") -> None:
+    model = Model("Model", skip_validation=True)
+    Process(model, "A", technology=Technology.WEB_APPLICATION)
+
+    path = tmp_path / "report.md"
+    model.create_report(str(path))
+
+    report = path.read_text(encoding="utf8")
+    assert report.startswith("# Model")
+    assert "### CAPEC-63@A" in report
+
+    template = tmp_path / "risks.tpl"
+    template.write_text(
+        "{% for risk in risks %}{{ risk.id }}:"
+        "{{ user_stories_by_risk[risk.id]|length }}{% endfor %}",
+        encoding="utf8",
+    )
+    model.create_report(str(path), template=str(template))
+
+    stories = len(model.risks[0].user_stories)
+    assert path.read_text(encoding="utf8") == f"CAPEC-63@A:{stories}"
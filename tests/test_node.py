@@ -1,5 +1,5 @@
 import pytest
-from tmac.node import Construct, kebab_case
+from tmac.node import Construct, deterministic_id, kebab_case, unique_id
 
 
 def test_special_root_construct(root: "Construct") -> None:
@@ -13,7 +13,39 @@ def test_no_empty_id_by_none_root_constructs(root: "Construct") -> None:
     with pytest.raises(ValueError):
         Construct(root, "")
 
+
+def test_root_and_lock(root: "Construct") -> None:
+    parent = Construct(root, "parent")
+    child = Construct(parent, "child")
+    assert child.node.root is root
+    assert child.node.locked is False
+
+    parent.node.lock()
+    root.node.lock()
+    assert child.node.locked
+    with pytest.raises(RuntimeError):
+        Construct(child, "other")
+
+    parent.node.unlock()
+    assert child.node.locked
+    root.node.unlock()
+    assert child.node.locked is False
+    assert Construct(child, "other").node.root is root
+
+
 def test_kebab() -> None:
     assert kebab_case("Foo Bar") == "foo-bar"
     assert kebab_case("foo-bar") == "foo-bar"
     assert kebab_case("FooBar") == "foo-bar"
+
+
+def test_unique_id() -> None:
+    assert unique_id("Foo Bar").startswith("foo-bar-")
+    assert unique_id("Foo Bar") != unique_id("Foo Bar")
+
+
+def test_deterministic_id() -> None:
+    assert deterministic_id("Foo", "scope") == deterministic_id("Foo", "scope")
+    assert deterministic_id("Foo", "scope").startswith("foo-")
+    assert deterministic_id("Foo", "scope") != deterministic_id("Foo", "other")
+    assert deterministic_id("Foo", "scope") != deterministic_id("Foo", "scope", 1)
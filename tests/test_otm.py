@@ -0,0 +1,167 @@
+import gzip
+import io
+import json
+from pathlib import Path
+from typing import Any, Dict
+
+import pytest
+
+from tmac import (
+    DataStore,
+    ExternalEntity,
+    Model,
+    Process,
+    Protocol,
+    Score,
+    Technology,
+    TrustBoundary,
+)
+from tmac.otm import OpenThreatModelEncoder
+from tmac.plus import Browser
+
+
+def create_model() -> "Model":
+    model = Model("Model")
+
+    browser = Browser(model, "Browser")
+    web_server = Process(model, "WebServer", technology=Technology.WEB_APPLICATION)
+    web_server.add_tags("public")
+
+    web_traffic = browser.add_data_flow(
+        "WebTraffic", destination=web_server, protocol=Protocol.HTTPS
+    )
+    web_traffic.transfers(
+        "UserCredentials",
+        confidentiality=Score.HIGH,
+        integrity=Score.HIGH,
+        availability=Score.HIGH,
+    )
+
+    return model
+
+
+def normalize(otm: Dict[str, Any]) -> Dict[str, Any]:
+    for key in ["assets", "trustZones", "components", "dataflows"]:
+        otm[key] = sorted(otm[key], key=lambda e: e["id"])
+    return otm
+
+
+def test_otm_tags() -> None:
+    model = create_model()
+
+    otm = json.loads(str(model.otm))
+
+    assert ["public"] in [c["tags"] for c in otm["components"]]
+
+
+def test_write_otm() -> None:
+    model = create_model()
+
+    fp = io.StringIO()
+    model.write_otm(fp)
+
+    assert fp.getvalue() == str(model.otm)
+
+
+def test_write_otm_compact_gzip(tmp_path: "Path") -> None:
+    model = create_model()
+
+    path = tmp_path / "model.otm.json.gz"
+    model.write_otm(str(path), compact=True, gzip=True)
+
+    with gzip.open(path, "rt", encoding="utf8") as f:
+        content = f.read()
+
+    assert content == model.otm.to_json(indent=None)
+
+    fp = io.BytesIO()
+    model.write_otm(fp, compact=True)
+
+    assert fp.getvalue().decode("utf8") == content
+
+
+def test_otm_to_json() -> None:
+    model = create_model()
+
+    otm = model.otm
+    legacy = json.loads(json.dumps(otm, cls=OpenThreatModelEncoder))
+
+    assert otm.to_dict() == legacy
+    assert json.loads(otm.to_json(indent=None)) == otm.to_dict()
+    assert "\n" not in otm.to_json(indent=None)
+
+
+def test_from_otm() -> None:
+    model = create_model()
+    TrustBoundary(model, "Internet", trust_boundary=TrustBoundary(model, "World"))
+
+    fp = io.BytesIO()
+    model.write_otm(fp, gzip=True)
+    fp.seek(0)
+
+    loaded = Model.from_otm(fp)
+
+    assert loaded.id == model.id
+    assert [c.id for c in loaded.components] == [c.id for c in model.components]
+    assert [type(c) for c in loaded.components] == [ExternalEntity, Process]
+    assert loaded.components[1].tags == ["public"]
+    assert loaded.trust_boundaries[1].trust_boundary == loaded.trust_boundaries[0]
+    assert [r.id for r in loaded.risks] == [r.id for r in model.risks]
+    assert normalize(json.loads(str(loaded.otm))) == normalize(
+        json.loads(str(model.otm))
+    )
+
+
+def test_from_otm_trust_zones() -> None:
+    document = {
+        "project": {"name": "Model", "id": "model"},
+        "trustZones": [
+            {"id": "dmz", "name": "DMZ", "parent": {"trustZone": "internet"}},
+            {"id": "internet", "name": "Internet"},
+        ],
+        "components": [
+            {
+                "id": "web",
+                "name": "Web",
+                "type": "web-application",
+                "parent": {"trustZone": "dmz"},
+            },
+            {"id": "db", "name": "Database", "type": "database"},
+        ],
+        "dataflows": [
+            {
+                "id": "sql",
+                "name": "SQL",
+                "source": "web",
+                "destination": "db",
+                "attributes": {"protocol": "sql"},
+            }
+        ],
+    }
+
+    model = Model.from_otm(io.StringIO(json.dumps(document)), skip_validation=True)
+
+    web, db = model.components
+    assert isinstance(db, DataStore)
+    assert web.trust_boundary is not None
+    assert [tb.name for tb in web.trust_boundary.parents] == ["Internet"]
+    assert web.outgoing_flows[0].protocol == Protocol.SQL
+    assert "CAPEC-66@Web@SQL" in [r.id for r in model.risks]
+
+
+def test_from_otm_invalid() -> None:
+    document: Dict[str, Any] = {
+        "project": {"name": "Model", "id": "model"},
+        "components": [{"id": "web", "name": "Web", "type": "web-application"}],
+        "dataflows": [
+            {"id": "web", "name": "Flow", "source": "web", "destination": "db"}
+        ],
+    }
+
+    with pytest.raises(ValueError, match="Duplicate id: web"):
+        Model.from_otm(io.StringIO(json.dumps(document)))
+
+    document["dataflows"][0]["id"] = "flow"
+
+    with pytest.raises(ValueError, match="Unknown component: db"):
+        Model.from_otm(io.StringIO(json.dumps(document)))
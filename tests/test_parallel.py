@@ -0,0 +1,75 @@
+from typing import List, Tuple
+
+import pytest
+
+from tmac import (
+    DataFormat,
+    DataStore,
+    ExternalEntity,
+    Model,
+    Process,
+    Protocol,
+    Technology,
+)
+
+
+def synthetic_model() -> "Model":
+    model = Model("Model", skip_validation=True)
+
+    for i in range(8):
+        browser = ExternalEntity(model, f"Browser{i}", technology=Technology.BROWSER)
+        web = Process(
+            model,
+            f"Web{i}",
+            technology=Technology.WEB_APPLICATION,
+            accepts_data_formats=[DataFormat.XML, DataFormat.FILE],
+        )
+        db = DataStore(model, f"Database{i}", technology=Technology.DATABASE)
+
+        browser.add_data_flow(f"Traffic{i}", destination=web, protocol=Protocol.HTTPS)
+        web.add_data_flow(f"Db{i}", destination=db, protocol=Protocol.SQL)
+        web.add_data_flow(f"NoSql{i}", destination=db, protocol=Protocol.NOSQL)
+
+    model.accept_risk("CAPEC-63@Web0", comment="Accepted")
+    model.mitigate_risk("CAPEC-66@Web1@Db1")
+
+    return model
+
+
+def snapshot(model: "Model") -> List[Tuple[str, str]]:
+    return [(r.id, r.treatment.state) for r in model.risks]
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_parallel_evaluate(executor: str) -> None:
+    expected = snapshot(synthetic_model())
+
+    model = synthetic_model()
+    model.evaluate(workers=2, executor=executor)
+
+    assert snapshot(model) == expected
+    assert ("CAPEC-63@Web0", "accepted") in snapshot(model)
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_parallel_evaluate_hook(executor: str) -> None:
+    model = synthetic_model()
+
+    calls: List[int] = []
+    model.threat_library.after_apply_hook = lambda risks: calls.append(len(risks))
+    try:
+        model.evaluate(workers=2, executor=executor)
+    finally:
+        model.threat_library.after_apply_hook = None
+
+    assert sum(calls) == len(model.risks) - len(model.threat_library.apply(model, None))
+
+
+def test_parallel_evaluate_invalid() -> None:
+    model = synthetic_model()
+
+    with pytest.raises(ValueError):
+        model.evaluate(workers=0)
+
+    with pytest.raises(ValueError):
+        model.evaluate(workers=2, executor="gpu")
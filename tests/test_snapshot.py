@@ -0,0 +1,107 @@
+from typing import List
+
+import pytest
+
+from tmac import (
+    Model,
+    Process,
+    Protocol,
+    Technology,
+    UserStoryTemplate,
+    UserStoryTemplateRepository,
+)
+from tmac.plus import Browser
+
+
+def create_model() -> "Model":
+    model = Model("Model", skip_validation=True)
+    browser = Browser(model, "Browser")
+    web_server = Process(model, "WebServer", technology=Technology.WEB_APPLICATION)
+    browser.add_data_flow("WebTraffic", destination=web_server, protocol=Protocol.HTTPS)
+    return model
+
+
+def test_snapshot() -> None:
+    model = create_model()
+    model.accept_risk("CAPEC-63@WebServer", comment="Accepted")
+    model.process_user_story("ASVS-1.2.3@CAPEC-62@WebServer@WebTraffic")
+
+    snapshot = model.snapshot()
+
+    assert [r.id for r in snapshot.risks] == [r.id for r in model.risks]
+    assert {s.id for s in snapshot.user_stories} == {s.id for s in model.user_stories}
+
+    accepted = snapshot.risks_by_id["CAPEC-63@WebServer"]
+    assert accepted.treatment.state == "accepted"
+    assert accepted.treatment.comment == "Accepted"
+    assert accepted.user_stories == ()
+
+    risk = snapshot.get_risk_by_id("CAPEC-62@WebServer@WebTraffic")
+    assert risk is not None
+    assert risk.text == model.risks[0].text
+    assert risk.treatment.state == "in-progress"
+    assert snapshot.user_stories_by_risk[risk.id] == risk.user_stories
+
+    story = snapshot.get_user_story_by_id("ASVS-1.2.3@CAPEC-62@WebServer@WebTraffic")
+    assert story is not None
+    assert story.state == "in-progress"
+    assert story.risk_id == risk.id
+
+    with pytest.raises(TypeError):
+        snapshot.risks_by_id["foo"] = risk  # type: ignore[index]
+
+    with pytest.raises(AttributeError):
+        risk.text = ""  # type: ignore[misc]
+
+
+def test_snapshot_is_cached() -> None:
+    model = create_model()
+
+    snapshot = model.snapshot()
+    model.create_risks_table()
+    model.create_backlog_table()
+    assert model.snapshot() is snapshot
+
+    model.close_user_story("ASVS-1.2.3@CAPEC-62@WebServer@WebTraffic")
+    changed = model.snapshot()
+    assert changed is not snapshot
+    assert changed.generation > snapshot.generation
+
+    story_id = "ASVS-1.2.3@CAPEC-62@WebServer@WebTraffic"
+    assert snapshot.user_stories_by_id[story_id].state == "draft"
+    assert changed.user_stories_by_id[story_id].state == "closed"
+
+
+def template(id: str, cwe_ids: List[int]) -> "UserStoryTemplate":
+    return UserStoryTemplate(
+        id=id,
+        category="Category",
+        sub_category="",
+        description="",
+        feature_name="",
+        user_story="TODO",
+        scenarios={},
+        references=[],
+        cwe_ids=cwe_ids,
+        nist=[],
+        tags=[],
+    )
+
+
+def test_snapshot_repository_and_model_changes() -> None:
+    repository = UserStoryTemplateRepository()
+    repository.add_templates(template("A", [79]))
+    model = Model(
+        "Model", skip_validation=True, user_story_template_repository=repository
+    )
+    Process(model, "A", technology=Technology.WEB_APPLICATION)
+
+    snapshot = model.snapshot()
+    assert len(snapshot.user_stories) == 1
+
+    repository.add_templates(template("B", [20]))
+    assert len(model.snapshot().user_stories) == 2
+    assert "B@CAPEC-63@A" in model.create_backlog_table()
+
+    model.name = "Renamed"
+    assert model.snapshot().name == "Renamed"
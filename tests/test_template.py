@@ -0,0 +1,26 @@
+import os
+from pathlib import Path
+
+from tmac.template import compile_template, load_template, render_template
+
+
+def test_compile_template_is_cached() -> None:
+    assert compile_template("{{ foo }}") is compile_template("{{ foo }}")
+
+
+def test_render_template() -> None:
+    assert render_template("Hello {{ name }}", name="World") == "Hello World"
+
+
+def test_load_template(tmp_path: "Path") -> None:
+    path = tmp_path / "report.tpl"
+    path.write_text("Hello {{ name }}", encoding="utf8")
+
+    template = load_template(str(path))
+    assert load_template(str(path)) is template
+    assert template.render(name="World") == "Hello World"
+
+    path.write_text("Bye {{ name }}", encoding="utf8")
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1_000_000))
+
+    assert load_template(str(path)).render(name="World") == "Bye World"
@@ -0,0 +1,88 @@
+from typing import Any, List
+
+from tmac import (
+    Component,
+    CAPEC,
+    ComponentClass,
+    ComponentRisk,
+    ComponentThreat,
+    DataFormat,
+    Model,
+    Process,
+    Protocol,
+    Technology,
+    ThreatLibrary,
+)
+from tmac.threat_library import DEFAULT_THREAT_LIBRARY
+
+
+class Threat(ComponentThreat):
+    def __init__(self, id: str, **applicability: Any) -> None:
+        super().__init__(
+            id=id,
+            name=id,
+            description="",
+            risk_text="{{ component.name }}",
+            category=CAPEC.INJECT_UNEXPECTED_ITEMS,
+            **applicability,
+        )
+
+    def apply(self, model: "Model", component: "Component") -> List["ComponentRisk"]:
+        return [ComponentRisk(self, model=model, component=component)]
+
+
+def test_dispatch_index(model: "Model") -> None:
+    lib = ThreatLibrary()
+    lib.add_threats(
+        Threat("any"),
+        Threat("web-app", component_classes=[ComponentClass.WEB_APPLICATION]),
+        Threat("xml", data_formats=[DataFormat.XML]),
+        Threat(
+            "web-app-ldap",
+            component_classes=[ComponentClass.WEB_APPLICATION],
+            outgoing_protocols=[Protocol.LDAP],
+        ),
+        Threat("database", technologies=[Technology.DATABASE]),
+    )
+
+    web_app = Process(model, "WebApp", technology=Technology.WEB_APPLICATION)
+    ldap = Process(model, "Ldap", technology=Technology.UNKNOWN)
+    api = Process(
+        model,
+        "Api",
+        technology=Technology.WEB_SERVICE_SOAP,
+        accepts_data_formats=[DataFormat.XML],
+    )
+
+    def threat_ids(component: "Component") -> List[str]:
+        return [t.id for t in lib.dispatch_index.get_threats(component)]
+
+    assert threat_ids(web_app) == ["any", "web-app"]
+    assert threat_ids(ldap) == ["any"]
+    assert threat_ids(api) == ["any", "xml"]
+
+    web_app.add_data_flow("Query", destination=ldap, protocol=Protocol.LDAP)
+    assert threat_ids(web_app) == ["any", "web-app", "web-app-ldap"]
+
+    lib.add_threats(Threat("late", technologies=[Technology.UNKNOWN]))
+    assert threat_ids(ldap) == ["any", "late"]
+
+
+def test_dispatch_matches_default_threats(model: "Model") -> None:
+    components = [
+        Process(model, str(t), technology=t, accepts_data_formats=list(DataFormat))
+        for t in Technology
+    ]
+    for i, protocol in enumerate(Protocol):
+        source = components[i % len(components)]
+        destination = components[(i * 7 + 3) % len(components)]
+        source.add_data_flow(str(protocol), destination=destination, protocol=protocol)
+
+    for c in components:
+        expected = [
+            risk.id
+            for threat in DEFAULT_THREAT_LIBRARY.values()
+            if isinstance(threat, ComponentThreat) and threat.is_applicable(c)
+            for risk in threat.apply(model, c)
+        ]
+        assert [r.id for r in c.risks] == expected
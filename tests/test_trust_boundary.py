@@ -0,0 +1,35 @@
+from tmac import Model, Process, Technology, TrustBoundary
+
+
+def test_hierarchy(model: "Model") -> None:
+    org = TrustBoundary(model, "Org")
+    vpc = TrustBoundary(model, "VPC", trust_boundary=org)
+    subnet = TrustBoundary(model, "Subnet", trust_boundary=vpc)
+    app = Process(
+        model, "App", technology=Technology.WEB_APPLICATION, trust_boundary=subnet
+    )
+
+    assert org.children == [vpc]
+    assert vpc.children == [subnet]
+    assert subnet.components == [app]
+    assert vpc.components == []
+    assert subnet.parents == [vpc, org]
+
+
+def test_hierarchy_follows_reassignment(model: "Model") -> None:
+    org = TrustBoundary(model, "Org")
+    vpc = TrustBoundary(model, "VPC", trust_boundary=org)
+    subnet = TrustBoundary(model, "Subnet", trust_boundary=vpc)
+    app = Process(
+        model, "App", technology=Technology.WEB_APPLICATION, trust_boundary=subnet
+    )
+
+    assert subnet.parents == [vpc, org]
+
+    vpc.trust_boundary = None
+    app.trust_boundary = vpc
+
+    assert org.children == []
+    assert subnet.parents == [vpc]
+    assert subnet.components == []
+    assert vpc.components == [app]
@@ -0,0 +1,58 @@
+import json
+from pathlib import Path
+from typing import List
+
+from tmac import UserStoryTemplate, UserStoryTemplateRepository
+
+
+def template(id: str, cwe_ids: List[int]) -> "UserStoryTemplate":
+    return UserStoryTemplate(
+        id=id,
+        category="Category",
+        sub_category="",
+        description="",
+        feature_name="",
+        user_story="TODO",
+        scenarios={},
+        references=[],
+        cwe_ids=cwe_ids,
+        nist=[],
+        tags=[],
+    )
+
+
+def test_get_by_cwe() -> None:
+    repository = UserStoryTemplateRepository()
+    repository.add_templates(
+        template("A", [1, 2]),
+        template("B", [3]),
+        template("C", [2, 3]),
+    )
+
+    assert [t.id for t in repository.get_by_cwe(3, 2)] == ["A", "B", "C"]
+    assert [t.id for t in repository.get_by_cwe(1)] == ["A"]
+    assert repository.get_by_cwe(4) == []
+
+
+def test_get_by_cwe_replaced_template() -> None:
+    repository = UserStoryTemplateRepository()
+    repository.add_templates(template("A", [1]), template("B", [1]))
+    repository.add_templates(template("A", [2]))
+
+    assert [t.id for t in repository.get_by_cwe(1)] == ["B"]
+    assert [t.id for t in repository.get_by_cwe(1, 2)] == ["A", "B"]
+
+
+def write_templates(path: "Path", *templates: "UserStoryTemplate") -> None:
+    path.write_text(json.dumps([t.__dict__ for t in templates]), encoding="utf8")
+
+
+def test_from_file_lazy(tmp_path: "Path") -> None:
+    filename = tmp_path / "templates.json"
+    write_templates(filename, template("A", [1]))
+
+    repository = UserStoryTemplateRepository.fromFile(str(filename), lazy=True)
+    write_templates(filename, template("B", [1]))
+
+    assert [t.id for t in repository.get_all()] == ["B"]
+
@@ -0,0 +1,155 @@
+from typing import List, Tuple
+
+import pytest
+
+from tmac import (
+    CAPEC,
+    Component,
+    ComponentRisk,
+    ComponentThreat,
+    DataFormat,
+    DataStore,
+    ExternalEntity,
+    Model,
+    Process,
+    Protocol,
+    Technology,
+    ThreatLibrary,
+)
+from tmac.threat_library import DEFAULT_THREAT_LIBRARY
+
+np = pytest.importorskip("numpy")
+
+from tmac.vectorized import (  # noqa: E402
+    DEFAULT_RULES,
+    Rule,
+    VectorizedEngine,
+    component,
+    flow,
+)
+
+
+def synthetic_model(
+    threat_library: "ThreatLibrary" = DEFAULT_THREAT_LIBRARY,
+) -> "Model":
+    model = Model("Model", skip_validation=True, threat_library=threat_library)
+
+    technologies = list(Technology)
+    formats = list(DataFormat)
+    components: List["Component"] = []
+    for i in range(60):
+        technology = technologies[i % len(technologies)]
+        kwargs = dict(
+            technology=technology,
+            accepts_data_formats=formats[: i % (len(formats) + 1)],
+        )
+        if i % 11 == 0:
+            components.append(ExternalEntity(model, f"C{i}", **kwargs))
+        elif i % 5 == 0:
+            components.append(DataStore(model, f"C{i}", **kwargs))
+        else:
+            components.append(Process(model, f"C{i}", **kwargs))
+
+    protocols = list(Protocol)
+    for i in range(240):
+        source = components[(i * 7) % len(components)]
+        destination = components[(i * 13 + 5) % len(components)]
+        source.add_data_flow(
+            f"F{i}",
+            destination=destination,
+            protocol=protocols[i % len(protocols)],
+        )
+
+    model.accept_risk("CAPEC-63@C1")
+    model.mitigate_risk("CAPEC-62@C1@F7")
+
+    return model
+
+
+def risks(model: "Model") -> List[Tuple[str, str]]:
+    return [(r.id, r.treatment.state) for r in model.risks]
+
+
+def test_vectorized_equals_default_library() -> None:
+    serial = synthetic_model()
+    serial.evaluate()
+
+    vectorized = synthetic_model()
+    vectorized.evaluate(vectorized=True)
+
+    assert len(serial.risks) > 0
+    assert risks(vectorized) == risks(serial)
+
+
+def test_vectorized_engine_apply() -> None:
+    model = synthetic_model()
+
+    expected = {c: [r.id for r in c.risks] for c in model.components}
+    result = VectorizedEngine(model.threat_library).apply(model)
+
+    assert {c: [r.id for r in rs] for c, rs in result.items()} == expected
+
+
+def test_vectorized_hook_calls_equal_serial() -> None:
+    def hook_calls(vectorized: bool) -> List[List[str]]:
+        lib = ThreatLibrary()
+        lib.add_threats(*DEFAULT_THREAT_LIBRARY.values(), UnencryptedTraffic())
+
+        calls: List[List[str]] = []
+        lib.after_apply_hook = lambda risks: calls.append([r.id for r in risks])
+        synthetic_model(lib).evaluate(vectorized=vectorized)
+        return calls
+
+    serial = hook_calls(vectorized=False)
+    assert [] in serial
+    assert hook_calls(vectorized=True) == serial
+
+
+class UnencryptedTraffic(ComponentThreat):
+    def __init__(self) -> None:
+        super().__init__(
+            id="UNENCRYPTED",
+            name="Unencrypted Traffic",
+            description="",
+            risk_text="{{ data_flow.name }}",
+            category=CAPEC.ENGAGE_IN_DECEPTIVE_INTERACTIONS,
+        )
+
+    def apply(self, model: "Model", component: "Component") -> List["ComponentRisk"]:
+        return [
+            ComponentRisk(self, model=model, component=component, data_flow=f)
+            for f in component.outgoing_flows
+            if not f.is_encrypted and f.destination.is_web_service
+        ]
+
+
+def test_vectorized_custom_rules_and_fallback() -> None:
+    lib = ThreatLibrary()
+    lib.add_threats(*DEFAULT_THREAT_LIBRARY.values(), UnencryptedTraffic())
+
+    model = synthetic_model(lib)
+    expected = {c: [r.id for r in c.risks] for c in model.components}
+
+    # without a rule the custom threat is applied per component
+    result = VectorizedEngine(lib).apply(model)
+    assert {c: [r.id for r in rs] for c, rs in result.items()} == expected
+
+    rule = Rule(
+        flows="outgoing",
+        flow=~flow("is_encrypted")
+        & flow("destination_technology").isin(
+            [
+                Technology.WEB_SERVICE_REST,
+                Technology.WEB_SERVICE_SOAP,
+                Technology.WEB_SERVICE_GRAPHQL,
+            ]
+        ),
+    )
+    engine = VectorizedEngine(lib, rules={**DEFAULT_RULES, UnencryptedTraffic: rule})
+    result = engine.apply(model)
+    assert {c: [r.id for r in rs] for c, rs in result.items()} == expected
+
+
+def test_rule_requires_flows_for_flow_predicate() -> None:
+    with pytest.raises(ValueError):
+        Rule(component("is_client"), flow=flow("vpn"))
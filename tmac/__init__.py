@@ -1,6 +1,7 @@
 from .asset import Asset
 from .component import (
     Component,
+    ComponentClass,
     DataFormat,
     DataStore,
     Encryption,
@@ -13,9 +14,10 @@ from .data_flow import Authentication, Authorization, DataFlow, Protocol
 from .diagram import DataFlowDiagram, DiagramEdge, DiagramNode
 from .element import Element
 from .model import Model, ModelException
-from .node import Construct
+from .node import Construct, IdStrategy
 from .risk import ComponentRisk, ModelRisk, Risk
 from .score import Score
+from .snapshot import ModelSnapshot, RiskSnapshot, UserStorySnapshot
 from .table_format import TableFormat
 from .tag import TagMixin
 from .threat import (
@@ -34,6 +36,7 @@ from .user_story import ASVSCategory, UserStory, UserStoryTemplate, UserStoryTem
 __all__ = (
     "Asset",
     "Component",
+    "ComponentClass",
     "DataFormat",
     "DataStore",
     "Encryption",
@@ -52,10 +55,14 @@ __all__ = (
     "Model",
     "ModelException",
     "Construct",
+    "IdStrategy",
     "ComponentRisk",
     "ModelRisk",
     "Risk",
     "Score",
+    "ModelSnapshot",
+    "RiskSnapshot",
+    "UserStorySnapshot",
     "TableFormat",
     "TagMixin",
     "CAPEC",
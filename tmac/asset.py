@@ -1,10 +1,23 @@
+from typing import TYPE_CHECKING, Any, List, Optional, Set
+
 from .element import Element
 from .node import Construct
 from .otm import OpenThreatModelAsset, OpenThreatModelAssetRisk
 from .score import Score
 
+if TYPE_CHECKING:
+    from .component import Component
+
 
 class Asset(Element):
+    __slots__ = (
+        "_components",
+        "confidentiality",
+        "integrity",
+        "availability",
+        "is_pii",
+    )
+
     def __init__(
         self,
         scope: Construct,
@@ -15,8 +28,12 @@ class Asset(Element):
         availability: Score,
         description: str = "",
         is_pii: bool = False,
+        id: Optional[str] = None,
     ) -> None:
-        super().__init__(scope, name, description=description)
+        super().__init__(scope, name, description=description, id=id)
+
+        # components processing or storing this asset
+        self._components: Set["Component"] = set()
 
         self.name = name
         self.description = description
@@ -25,6 +42,19 @@ class Asset(Element):
         self.availability = availability
         self.is_pii = is_pii
 
+    @property
+    def _affected_components(self) -> List["Component"]:
+        return list(self._components)
+
+    def _fingerprint_fields(self) -> List[Any]:
+        return [
+            *super()._fingerprint_fields(),
+            self.confidentiality,
+            self.integrity,
+            self.availability,
+            self.is_pii,
+        ]
+
     @property
     def average_score(self) -> float:
         return (self.confidentiality + self.integrity + self.availability) / 3
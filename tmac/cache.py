@@ -0,0 +1,160 @@
+import contextlib
+import functools
+import hashlib
+import json
+import os
+import tempfile
+import time
+from typing import Any, Dict, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore[assignment]
+
+EVALUATION_CACHE_FORMAT = 1
+"""Version of the cached evaluation entries, part of every key"""
+
+
+def _current_umask() -> int:
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+# read once, setting the umask to read it is not thread safe
+_UMASK = _current_umask()
+
+
+def default_cache_dir() -> str:
+    """Returns $TMAC_CACHE_DIR, falling back to $XDG_CACHE_HOME/tmac or ~/.cache/tmac"""
+    cache_dir = os.environ.get("TMAC_CACHE_DIR")
+    if cache_dir:
+        return cache_dir
+
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(cache_home, "tmac")
+
+
+@functools.lru_cache(maxsize=None)
+def source_fingerprint() -> str:
+    """Returns a sha256 hex digest of the python sources of tmac, part of every
+    key. Results depend on the code of elements and risks as well, and the
+    installed version does not change with edits of a checkout."""
+    package = os.path.dirname(__file__)
+    h = hashlib.sha256()
+    for root, dirs, files in os.walk(package):
+        dirs[:] = sorted(d for d in dirs if d != "__pycache__")
+        for name in sorted(files):
+            if name.endswith(".py"):
+                path = os.path.join(root, name)
+                h.update(os.path.relpath(path, package).encode("utf8"))
+                with open(path, "rb") as f:
+                    h.update(hashlib.sha256(f.read()).digest())
+    return h.hexdigest()
+
+
+def write_atomic(path: str, data: bytes) -> None:
+    """Writes to a temporary file next to path and renames it, so readers never
+    see a partially written file"""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        # mkstemp creates the file for the owner only, the cache may be shared
+        # with other users
+        os.fchmod(fd, 0o666 & ~_UMASK)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class EvaluationCache:
+    """Evaluation results of models in a directory, shared by processes.
+
+    Entries are json files written atomically, so readers see complete
+    entries or none. Reading an entry touches it. When the directory grows
+    beyond max_size bytes, the least recently used entries are removed by one
+    process at a time. Entries removed by another process are misses.
+    """
+
+    def __init__(self, directory: str, *, max_size: int = 256 * 2**20) -> None:
+        self.directory = directory
+        self.max_size = max_size
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                entry = json.loads(f.read())
+        except (OSError, ValueError):
+            return None
+
+        with contextlib.suppress(OSError):
+            os.utime(path)
+
+        return entry if isinstance(entry, dict) else None
+
+    def put(self, key: str, entry: Dict[str, Any]) -> None:
+        """Stores the entry, the cache is best effort and errors are ignored"""
+        try:
+            write_atomic(self._path(key), json.dumps(entry).encode("utf8"))
+            self._evict()
+        except OSError:
+            pass
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"evaluation-{key}.json")
+
+    def _evict(self) -> None:
+        with self._lock() as locked:
+            if not locked:
+                return
+
+            entries = list()
+            for entry in os.scandir(self.directory):
+                with contextlib.suppress(FileNotFoundError):
+                    stat = entry.stat()
+                    if entry.name.startswith("evaluation-"):
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    elif (
+                        entry.name.startswith(".tmp-")
+                        and stat.st_mtime < time.time() - 3600
+                    ):
+                        # left behind by a crashed writer
+                        os.remove(entry.path)
+
+            size = sum(e[1] for e in entries)
+            for _, entry_size, path in sorted(entries):
+                if size <= self.max_size:
+                    break
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(path)
+                size -= entry_size
+
+    @contextlib.contextmanager
+    def _lock(self) -> Iterator[bool]:
+        # yields False if another process holds the lock, it evicts anyway
+        if fcntl is None:  # pragma: no cover
+            yield True
+            return
+
+        with open(os.path.join(self.directory, ".lock"), "a") as f:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
@@ -0,0 +1,381 @@
+"""Command line interface to evaluate a portfolio of threat models.
+
+    tmac models/ --workers 8 --format json
+
+Model modules and OpenThreatModel documents (*.otm, *.otm.json and
+*.otm.json.gz) are discovered in the given files and directories and evaluated
+in a pool of worker processes. The workers load the threat library and the
+user story templates once and are reused for all models. Every model module
+is evaluated in isolation: failures, including crashed workers, are reported
+per module and do not abort the batch.
+"""
+import argparse
+import contextlib
+import fnmatch
+import io
+import json
+import os
+import runpy
+import sys
+import time
+import traceback
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from enum import Enum
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+)
+
+from .model import Model
+from .table_format import TableFormat
+
+
+class Status(str, Enum):
+    OK = "ok"
+    FAILED = "failed"
+    SKIPPED = "skipped"
+
+    def __str__(self) -> str:
+        return str(self.value)
+
+
+ModelLoader = Callable[[str], List["Model"]]
+
+EXPORTERS = ("create_data_flow_diagram", "create_report")
+"""Methods of Model that write files, no-ops while model modules run"""
+
+
+def _skip_export(self: "Model", *args: Any, **kwargs: Any) -> None:
+    pass
+
+
+@contextlib.contextmanager
+def _exporters_disabled() -> Iterator[None]:
+    exporters = {name: getattr(Model, name) for name in EXPORTERS}
+    for name in exporters:
+        setattr(Model, name, _skip_export)
+    try:
+        yield
+    finally:
+        for name, exporter in exporters.items():
+            setattr(Model, name, exporter)
+
+
+def load_module(path: str) -> List["Model"]:
+    """Runs a model module like a script and returns the models it defines.
+
+    The module runs in its own directory with its directory on sys.path, but
+    not as __main__. Modules it imports from its directory are unloaded
+    afterwards, so modules of different services do not clash. The exporters
+    of Model do nothing while it runs, scripts creating their diagram and
+    report neither need graphviz nor leave files behind.
+    """
+    path = os.path.abspath(path)
+    directory = os.path.dirname(path)
+
+    cwd = os.getcwd()
+    argv = sys.argv
+    sys_path = list(sys.path)
+    modules = set(sys.modules)
+
+    os.chdir(directory)
+    sys.argv = [path]
+    sys.path.insert(0, directory)
+    try:
+        with _exporters_disabled():
+            module_globals = runpy.run_path(path, run_name="__tmac__")
+    finally:
+        os.chdir(cwd)
+        sys.argv = argv
+        sys.path[:] = sys_path
+        for name in set(sys.modules) - modules:
+            file = getattr(sys.modules[name], "__file__", None) or ""
+            if os.path.abspath(file).startswith(directory + os.sep):
+                del sys.modules[name]
+
+    models: Dict[int, "Model"] = dict()
+    for value in module_globals.values():
+        if isinstance(value, Model):
+            models.setdefault(id(value), value)
+
+    return list(models.values())
+
+
+def load_otm(path: str) -> List["Model"]:
+    """Loads an OpenThreatModel document, which may be gzip compressed"""
+    return [Model.from_otm(path)]
+
+
+LOADERS: Dict[str, ModelLoader] = {
+    "*.py": load_module,
+    "*.otm": load_otm,
+    "*.otm.json": load_otm,
+    "*.otm.json.gz": load_otm,
+}
+"""Loaders of models by file name pattern"""
+
+
+def discover(paths: Iterable[str], patterns: Sequence[str]) -> List[str]:
+    """Returns the files matching one of the patterns, directories are walked
+    recursively, skipping hidden directories and __pycache__."""
+    files: List[str] = list()
+    for path in paths:
+        if os.path.isfile(path):
+            files.append(path)
+            continue
+
+        for root, dirs, names in os.walk(path):
+            dirs[:] = sorted(
+                d for d in dirs if not d.startswith(".") and d != "__pycache__"
+            )
+            for name in sorted(names):
+                if any(fnmatch.fnmatch(name, p) for p in patterns):
+                    files.append(os.path.join(root, name))
+
+    return files
+
+
+def _loader(path: str) -> ModelLoader:
+    name = os.path.basename(path)
+    for pattern, loader in LOADERS.items():
+        if fnmatch.fnmatch(name, pattern):
+            return loader
+
+    raise ValueError(f"No loader for {path}")
+
+
+def _warm_up() -> None:
+    # runs once per worker, the loaded library and compiled templates are
+    # reused for every model the worker evaluates
+    from .template import compile_template
+    from .threat_library import (
+        DEFAULT_THREAT_LIBRARY,
+        DEFAULT_USER_STORY_TEMPLATE_REPOSITORY,
+    )
+
+    DEFAULT_THREAT_LIBRARY.dispatch_index
+
+    for threat in DEFAULT_THREAT_LIBRARY.values():
+        compile_template(threat.risk_text)
+
+    for template in DEFAULT_USER_STORY_TEMPLATE_REPOSITORY.get_all():
+        compile_template(template.user_story)
+
+
+def _summarize(model: "Model") -> Dict[str, Any]:
+    snapshot = model.snapshot()
+
+    return {
+        "name": model.name,
+        "risks": [
+            {
+                "id": r.id,
+                "category": str(r.category),
+                "text": r.text,
+                "treatment": r.treatment.state,
+            }
+            for r in snapshot.risks
+        ],
+        "user_stories": [
+            {
+                "id": s.id,
+                "category": s.sub_category,
+                "text": s.text,
+                "state": s.state,
+            }
+            for s in snapshot.user_stories
+        ],
+    }
+
+
+def evaluate_file(path: str) -> Dict[str, Any]:
+    """Loads and evaluates the models of a file. Never raises, errors are
+    returned in the result."""
+    result: Dict[str, Any] = {
+        "path": path,
+        "status": Status.OK,
+        "seconds": 0.0,
+        "models": [],
+        "error": None,
+    }
+
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            models = _loader(path)(path)
+            result["models"] = [_summarize(m) for m in models]
+        if len(models) == 0:
+            result["status"] = Status.SKIPPED
+            result["error"] = "No model found"
+    except (Exception, SystemExit) as e:
+        result["status"] = Status.FAILED
+        result["error"] = _format_error(e)
+        result["traceback"] = traceback.format_exc()
+    result["seconds"] = time.perf_counter() - start
+
+    return result
+
+
+def _format_error(e: BaseException) -> str:
+    errors = [e]
+    if isinstance(e, BaseExceptionGroup):
+        errors.extend(e.exceptions)
+
+    return "; ".join(
+        "".join(traceback.format_exception_only(type(e), e)).strip() for e in errors
+    )
+
+
+def _crashed(path: str) -> Dict[str, Any]:
+    return {
+        "path": path,
+        "status": Status.FAILED,
+        "seconds": 0.0,
+        "models": [],
+        "error": "Worker process terminated abruptly",
+    }
+
+
+def evaluate_files(paths: Sequence[str], *, workers: int) -> List[Dict[str, Any]]:
+    """Evaluates the files in a pool of warm worker processes. Returns the
+    results in the order of the paths."""
+    results: Dict[str, Dict[str, Any]] = dict()
+
+    # always in worker processes, even with one worker, so that a crashing
+    # module cannot take down the batch
+    workers = max(workers, 1)
+    pending = list(paths)
+    isolated = False
+    while len(pending) > 0:
+        with ProcessPoolExecutor(
+            max_workers=1 if isolated else workers, initializer=_warm_up
+        ) as pool:
+            if isolated:
+                # after a crash the remaining files are evaluated one by one,
+                # so that a crash can be attributed to its file
+                while len(pending) > 0:
+                    path = pending.pop(0)
+                    try:
+                        results[path] = pool.submit(evaluate_file, path).result()
+                    except BrokenProcessPool:
+                        results[path] = _crashed(path)
+                        break
+                continue
+
+            futures: Dict[str, "Future[Dict[str, Any]]"] = {
+                p: pool.submit(evaluate_file, p) for p in pending
+            }
+            for path, future in futures.items():
+                with contextlib.suppress(BrokenProcessPool):
+                    results[path] = future.result()
+            pending = [p for p in pending if p not in results]
+            isolated = True
+
+    return [results[p] for p in paths]
+
+
+def _create_table(
+    results: Sequence[Dict[str, Any]], table_format: "TableFormat"
+) -> str:
+    from tabulate import tabulate
+
+    headers = [
+        "Path",
+        "Model",
+        "Risks",
+        "Unchecked",
+        "User Stories",
+        "Open",
+        "Time",
+        "Status",
+    ]
+    table = []
+    totals = [0, 0, 0, 0]
+    for result in results:
+        rows = result["models"] or [None]
+        for summary in rows:
+            counts = [0, 0, 0, 0]
+            name = ""
+            if summary is not None:
+                name = summary["name"]
+                counts = [
+                    len(summary["risks"]),
+                    sum(1 for r in summary["risks"] if r["treatment"] == "unchecked"),
+                    len(summary["user_stories"]),
+                    # a user story is open until it is closed, like in
+                    # Risk.treatment
+                    sum(1 for s in summary["user_stories"] if s["state"] != "closed"),
+                ]
+                totals = [t + c for t, c in zip(totals, counts)]
+            status = str(result["status"])
+            if result["error"] is not None:
+                status = f"{status}: {result['error']}"
+            table.append(
+                [result["path"], name, *counts, f"{result['seconds']:.3f}s", status]
+            )
+
+    table.append(["Total", "", *totals, "", ""])
+
+    return tabulate(table, headers=headers, tablefmt=str(table_format))
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="tmac", description="Evaluates a portfolio of threat models"
+    )
+    parser.add_argument(
+        "paths", nargs="+", metavar="PATH", help="model files or directories"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="number of worker processes (default: number of CPUs)",
+    )
+    parser.add_argument(
+        "--pattern",
+        action="append",
+        dest="patterns",
+        help="file name pattern of models in directories (default: all loaders)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=["table", "json"],
+        default="table",
+        help="output format (default: table)",
+    )
+    parser.add_argument(
+        "--table-format",
+        choices=[str(f) for f in TableFormat],
+        default=str(TableFormat.SIMPLE),
+        help="table format (default: simple)",
+    )
+    parser.add_argument("--output", "-o", help="write the summary to a file")
+    args = parser.parse_args(argv)
+
+    files = discover(args.paths, args.patterns or list(LOADERS))
+    results = evaluate_files(files, workers=min(args.workers, max(len(files), 1)))
+
+    if args.format == "json":
+        output = json.dumps(results, indent=4)
+    else:
+        output = _create_table(results, TableFormat(args.table_format))
+
+    if args.output is not None:
+        with open(args.output, "w", encoding="utf8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    return 1 if any(r["status"] == Status.FAILED for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
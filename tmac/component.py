@@ -3,8 +3,9 @@ from enum import Enum
 from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, cast
 
 from .data_flow import DataFlow, Protocol
-from .diagram import DiagramNode
-from .element import Element
+from .diagram import NO_ATTRS, DiagramNode
+from .element import Element, TrackedSet
+from .fingerprint import reference, references
 from .node import Construct
 from .otm import OpenThreatModelComponent
 from .tag import TagMixin
@@ -75,7 +76,33 @@ class DataFormat(Enum):
         return str(self.value)
 
 
+class ComponentClass(Enum):
+    CLIENT = "client"
+    WEB_APPLICATION = "web-application"
+    WEB_SERVICE = "web-service"
+
+    def __str__(self) -> str:
+        return str(self.value)
+
+
 class Component(Element, TagMixin, metaclass=ABCMeta):
+    __slots__ = (
+        "_tags",
+        "_trust_boundary",
+        "machine",
+        "technology",
+        "vendor",
+        "human_use",
+        "encryption",
+        "multi_tenant",
+        "redundant",
+        "custom_developed_parts",
+        "_accepts_data_formats",
+        "_assets_processed",
+        "_assets_stored",
+        "_overwrite_node_attrs",
+    )
+
     def __init__(
         self,
         scope: Construct,
@@ -94,10 +121,12 @@ class Component(Element, TagMixin, metaclass=ABCMeta):
         accepts_data_formats: List[DataFormat] = [],
         out_of_scope: bool = False,
         overwrite_node_attrs: Dict[str, str] = dict(),
+        id: Optional[str] = None,
     ):
-        super().__init__(scope, name, description)
+        super().__init__(scope, name, description, id=id)
+        TagMixin.__init__(self)
 
-        self.trust_boundary = trust_boundary
+        self._trust_boundary = trust_boundary
         self.machine = machine
         self.technology = technology
         self.vendor = vendor
@@ -106,36 +135,78 @@ class Component(Element, TagMixin, metaclass=ABCMeta):
         self.multi_tenant = multi_tenant
         self.redundant = redundant
         self.custom_developed_parts = custom_developed_parts
-        self.accepts_data_formats = set(accepts_data_formats)
+        self._accepts_data_formats = TrackedSet(self, accepts_data_formats)
         self.out_of_scope = out_of_scope
-        self.trust_boundary = trust_boundary
 
         self._assets_processed: Set["Asset"] = set()
         self._assets_stored: Set["Asset"] = set()
 
-        self._overwrite_node_attrs = overwrite_node_attrs
+        # copied, a change of the caller's dict would bypass _changed
+        self._overwrite_node_attrs = (
+            dict(overwrite_node_attrs) if len(overwrite_node_attrs) > 0 else NO_ATTRS
+        )
+
+        self._model._add_trust_boundary_component(self)
 
     @abstractproperty
     def diagram_node(self) -> "DiagramNode":
         pass
 
     @property
-    def incoming_flows(self) -> List["DataFlow"]:
-        flows: Set["DataFlow"] = set()
-        for flow in self._model.data_flows:
-            if flow.destination == self:
-                flows.add(flow)
+    def trust_boundary(self) -> Optional["TrustBoundary"]:
+        return self._trust_boundary
 
-        return list(flows)
+    @trust_boundary.setter
+    def trust_boundary(self, trust_boundary: Optional["TrustBoundary"]) -> None:
+        self._model._remove_trust_boundary_component(self)
+        self._trust_boundary = trust_boundary
+        self._model._add_trust_boundary_component(self)
+        self._clear_digest()
 
     @property
-    def outgoing_flows(self) -> List["DataFlow"]:
-        flows: Set["DataFlow"] = set()
-        for flow in self._model.data_flows:
-            if flow.source == self:
-                flows.add(flow)
+    def accepts_data_formats(self) -> Set[DataFormat]:
+        return self._accepts_data_formats
+
+    @accepts_data_formats.setter
+    def accepts_data_formats(self, accepts_data_formats: Set[DataFormat]) -> None:
+        # Element.__setattr__ calls _changed for the assignment, the tracked
+        # set for changes in place
+        self._accepts_data_formats = TrackedSet(self, accepts_data_formats)
+
+    @property
+    def _affected_components(self) -> List["Component"]:
+        return [
+            self,
+            *[flow.source for flow in self.incoming_flows],
+            *[flow.destination for flow in self.outgoing_flows],
+        ]
+
+    def _fingerprint_fields(self) -> List[Any]:
+        return [
+            *super()._fingerprint_fields(),
+            self.machine,
+            self.technology,
+            self.vendor,
+            self.human_use,
+            self.encryption,
+            self.multi_tenant,
+            self.redundant,
+            self.custom_developed_parts,
+            frozenset(self._accepts_data_formats),
+            self._tags,
+            reference(self._trust_boundary),
+            references(self._assets_processed),
+            references(self._assets_stored),
+            self._overwrite_node_attrs,
+        ]
+
+    @property
+    def incoming_flows(self) -> List["DataFlow"]:
+        return list(self._model._incoming_flows.get(self, []))
 
-        return list(flows)
+    @property
+    def outgoing_flows(self) -> List["DataFlow"]:
+        return list(self._model._outgoing_flows.get(self, []))
 
     @property
     def otm(self) -> "OpenThreatModelComponent":
@@ -145,10 +216,20 @@ class Component(Element, TagMixin, metaclass=ABCMeta):
             type=str(self.technology),
             description=self.description,
             tags=self.tags,
+            parent=None if self.trust_boundary is None else self.trust_boundary.id,
             attributes={
                 "technologie": str(self.technology),
                 "machine": str(self.machine),
                 "encryption": str(self.encryption),
+                "vendor": self.vendor,
+                "human_use": str(self.human_use),
+                "multi_tenant": str(self.multi_tenant),
+                "redundant": str(self.redundant),
+                "custom_developed_parts": str(self.custom_developed_parts),
+                "accepts_data_formats": ",".join(
+                    sorted(str(f) for f in self.accepts_data_formats)
+                ),
+                "out_of_scope": str(self.out_of_scope),
             },
         )
 
@@ -194,17 +275,32 @@ class Component(Element, TagMixin, metaclass=ABCMeta):
             Technology.WEB_SERVICE_GRAPHQL,
         ]
 
+    @property
+    def component_classes(self) -> Set["ComponentClass"]:
+        classes: Set["ComponentClass"] = set()
+        if self.is_client:
+            classes.add(ComponentClass.CLIENT)
+        if self.is_web_application:
+            classes.add(ComponentClass.WEB_APPLICATION)
+        if self.is_web_service:
+            classes.add(ComponentClass.WEB_SERVICE)
+        return classes
+
     def processes(self, *assets: "Asset") -> None:
         for asset in assets:
             self._assets_processed.add(asset)
             if isinstance(self, DataStore):
                 self._assets_stored.add(asset)
+            asset._components.add(self)
+        self._changed()
 
     def stores(self, *assets: "Asset", skip_process: bool = False) -> None:
         for asset in assets:
             self._assets_stored.add(asset)
             if not skip_process:
                 self._assets_processed.add(asset)
+            asset._components.add(self)
+        self._changed()
 
     def add_data_flow(
         self,
@@ -227,6 +323,8 @@ class Component(Element, TagMixin, metaclass=ABCMeta):
 class ExternalEntity(Component):
     """Task, entity, or data store outside of your direct control."""
 
+    __slots__ = ()
+
     def __init__(self, scope: Construct, name: str, **kwargs: Any):
         super().__init__(scope, name, out_of_scope=True, **kwargs)
 
@@ -245,6 +343,8 @@ class ExternalEntity(Component):
 class Process(Component):
     """Task that receives, modifies, or redirects input to output."""
 
+    __slots__ = ()
+
     def __init__(self, scope: Construct, name: str, **kwargs: Any):
         super().__init__(scope, name, **kwargs)
 
@@ -263,6 +363,8 @@ class Process(Component):
 class DataStore(Component):
     """Permanent and temporary data storage."""
 
+    __slots__ = ()
+
     def __init__(self, scope: Construct, name: str, **kwargs: Any):
         super().__init__(scope, name, **kwargs)
 
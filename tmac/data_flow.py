@@ -1,9 +1,20 @@
 from enum import Enum
-from typing import TYPE_CHECKING, Dict, List, Set, Union, cast, overload
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    List,
+    Optional,
+    Set,
+    Union,
+    cast,
+    overload,
+)
 
 from .asset import Asset
-from .diagram import DataFlowDiagram, DiagramEdge
-from .element import Element
+from .diagram import NO_ATTRS, DataFlowDiagram, DiagramEdge
+from .element import Element, TrackedSet
+from .fingerprint import reference, references
 from .node import Construct
 from .otm import OpenThreatModelDataFlow, OpenThreatModelThreatInstance
 from .score import Score
@@ -56,6 +67,56 @@ class Protocol(Enum):
         return str(self.value)
 
 
+RELATIONAL_DATABASE_PROTOCOLS = frozenset(
+    [
+        Protocol.JDBC,
+        Protocol.JDBC_ENCRYPTED,
+        Protocol.ODBC,
+        Protocol.ODBC_ENCRYPTED,
+        Protocol.SQL,
+        Protocol.SQL_ENCRYPTED,
+    ]
+)
+
+NOSQL_DATABASE_PROTOCOLS = frozenset(
+    [
+        Protocol.NOSQL,
+        Protocol.NOSQL_ENCRYPTED,
+    ]
+)
+
+WEB_ACCESS_PROTOCOLS = frozenset(
+    [
+        Protocol.HTTP,
+        Protocol.HTTPS,
+        Protocol.WS,
+        Protocol.WSS,
+    ]
+)
+
+ENCRYPTED_PROTOCOLS = frozenset(
+    [
+        Protocol.HTTPS,
+        Protocol.WSS,
+        Protocol.JDBC_ENCRYPTED,
+        Protocol.ODBC_ENCRYPTED,
+        Protocol.NOSQL_ENCRYPTED,
+        Protocol.SQL_ENCRYPTED,
+        Protocol.BINARY_ENCRYPTED,
+        Protocol.TEXT_ENCRYPTED,
+        Protocol.SSH,
+        Protocol.SSH_TUNNEL,
+        Protocol.FTPS,
+        Protocol.SCP,
+        Protocol.LDAPS,
+        Protocol.SMB_ENCRYPTED,
+        Protocol.SMTP_ENCRYPTED,
+        Protocol.POP3_ENCRYPTED,
+        Protocol.IMAP_ENCRYPTED,
+    ]
+)
+
+
 class Authentication(Enum):
     NONE = "none"
     CREDENTIALS = "credentials"
@@ -81,6 +142,20 @@ class Authorization(Enum):
 class DataFlow(Element, TagMixin):
     """Asset transfers between processes, data stores, and external entities"""
 
+    __slots__ = (
+        "_tags",
+        "_source",
+        "_destination",
+        "protocol",
+        "vpn",
+        "readonly",
+        "bidirectional",
+        "authentication",
+        "authorization",
+        "_overwrite_edge_attrs",
+        "_assets",
+    )
+
     def __init__(
         self,
         scope: Construct,
@@ -96,6 +171,7 @@ class DataFlow(Element, TagMixin):
         authentication: Authentication = Authentication.NONE,
         authorization: Authorization = Authorization.NONE,
         overwrite_edge_attrs: Dict[str, str] = dict(),
+        id: Optional[str] = None,
     ):
         """
         Constructs all the necessary attributes for the data_flow object.
@@ -105,10 +181,11 @@ class DataFlow(Element, TagMixin):
             scope: The scope in which to define this construct.
 
         """
-        super().__init__(scope, name, description=description)
+        super().__init__(scope, name, description=description, id=id)
+        TagMixin.__init__(self)
 
-        self.source = source
-        self.destination = destination
+        self._source = source
+        self._destination = destination
         self.protocol = protocol
         self.description = description
         self.vpn = vpn
@@ -117,8 +194,55 @@ class DataFlow(Element, TagMixin):
         self.authentication = authentication
         self.authorization = authorization
 
-        self._overwrite_edge_attrs = overwrite_edge_attrs
-        self._assets: Set["Asset"] = set()
+        # copied, a change of the caller's dict would bypass _changed
+        self._overwrite_edge_attrs = (
+            dict(overwrite_edge_attrs) if len(overwrite_edge_attrs) > 0 else NO_ATTRS
+        )
+        self._assets: Set["Asset"] = TrackedSet(self)
+
+        self._model._add_data_flow(self)
+
+    @property
+    def source(self) -> "Component":
+        return self._source
+
+    @source.setter
+    def source(self, source: "Component") -> None:
+        self._model._remove_data_flow(self)
+        self._source = source
+        self._model._add_data_flow(self)
+        self._clear_digest()
+
+    @property
+    def destination(self) -> "Component":
+        return self._destination
+
+    @destination.setter
+    def destination(self, destination: "Component") -> None:
+        self._model._remove_data_flow(self)
+        self._destination = destination
+        self._model._add_data_flow(self)
+        self._clear_digest()
+
+    @property
+    def _affected_components(self) -> List["Component"]:
+        return [self.source, self.destination]
+
+    def _fingerprint_fields(self) -> List[Any]:
+        return [
+            *super()._fingerprint_fields(),
+            reference(self._source),
+            reference(self._destination),
+            self.protocol,
+            self.vpn,
+            self.readonly,
+            self.bidirectional,
+            self.authentication,
+            self.authorization,
+            self._tags,
+            references(self._assets),
+            self._overwrite_edge_attrs,
+        ]
 
     @property
     def assets(self) -> Set["Asset"]:
@@ -211,52 +335,19 @@ class DataFlow(Element, TagMixin):
 
     @property
     def is_relational_database_protocol(self) -> bool:
-        return self.protocol in [
-            Protocol.JDBC,
-            Protocol.JDBC_ENCRYPTED,
-            Protocol.ODBC,
-            Protocol.ODBC_ENCRYPTED,
-            Protocol.SQL,
-            Protocol.SQL_ENCRYPTED,
-        ]
+        return self.protocol in RELATIONAL_DATABASE_PROTOCOLS
 
     @property
     def is_nosql_database_protocol(self) -> bool:
-        return self.protocol in [
-            Protocol.NOSQL,
-            Protocol.NOSQL_ENCRYPTED,
-        ]
+        return self.protocol in NOSQL_DATABASE_PROTOCOLS
 
     @property
     def is_web_access_protocol(self) -> bool:
-        return self.protocol in [
-            Protocol.HTTP,
-            Protocol.HTTPS,
-            Protocol.WS,
-            Protocol.WSS,
-        ]
+        return self.protocol in WEB_ACCESS_PROTOCOLS
 
     @property
     def is_encrypted(self) -> bool:
-        return self.vpn or self.protocol in [
-            Protocol.HTTPS,
-            Protocol.WSS,
-            Protocol.JDBC_ENCRYPTED,
-            Protocol.ODBC_ENCRYPTED,
-            Protocol.NOSQL_ENCRYPTED,
-            Protocol.SQL_ENCRYPTED,
-            Protocol.BINARY_ENCRYPTED,
-            Protocol.TEXT_ENCRYPTED,
-            Protocol.SSH,
-            Protocol.SSH_TUNNEL,
-            Protocol.FTPS,
-            Protocol.SCP,
-            Protocol.LDAPS,
-            Protocol.SMB_ENCRYPTED,
-            Protocol.SMTP_ENCRYPTED,
-            Protocol.POP3_ENCRYPTED,
-            Protocol.IMAP_ENCRYPTED,
-        ]
+        return self.vpn or self.protocol in ENCRYPTED_PROTOCOLS
 
     def create_data_flow_diagram(
         self, auto_view: bool = True, hide_data_flow_labels: bool = False
@@ -1,6 +1,13 @@
-from typing import Dict, Optional, Set, Type, List
+from typing import TYPE_CHECKING, Dict, Optional, Set, Type, List
 
-from diagrams import Diagram, Edge, Node, Cluster
+# diagrams (and graphviz) are only imported when a diagram is rendered
+if TYPE_CHECKING:
+    from diagrams import Node
+
+
+NO_ATTRS: Dict[str, str] = dict()
+"""Overwritten attributes of nodes and edges without any, shared and never
+changed"""
 
 
 class DiagramCluster:
@@ -10,6 +17,8 @@ class DiagramCluster:
         self._clusters = clusters
 
     def render(self, nodes: Dict[str, "Node"]) -> None:
+        from diagrams import Cluster
+
         with Cluster(self._label):
             for n in self._nodes:
                 n.render(nodes)
@@ -34,6 +43,8 @@ class DiagramEdge:
     def render(
         self, nodes: Dict[str, "Node"], hide_data_flow_labels: bool = False
     ) -> "Node":
+        from diagrams import Edge
+
         return nodes[self._source_id].connect(
             nodes[self._target_id],
             Edge(
@@ -70,6 +81,8 @@ class DiagramNode:
         return cls(id, label, node_type=node_type, overwrites=overwrites)
 
     def render(self, nodes: Dict[str, "Node"]) -> None:
+        from diagrams import Node
+
         if self._node_type is not None:
             node = self._node_type(self._label, nodeid=self.id, **self._overwrites)
             nodes[node.nodeid] = node
@@ -107,6 +120,8 @@ class DataFlowDiagram:
         return self._render(show=False, filename=filename)
 
     def _render(self, show: bool, filename: str = "dfd") -> None:
+        from diagrams import Diagram
+
         with Diagram(show=show, filename=filename) as diagram:
             nodes: Dict[str, "Node"] = dict()
 
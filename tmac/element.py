@@ -1,28 +1,203 @@
 from abc import ABCMeta
-from typing import List, TYPE_CHECKING
+from typing import (
+    AbstractSet,
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+    TYPE_CHECKING,
+)
 
-from .node import Construct, unique_id
+from .node import Construct
 
 
 if TYPE_CHECKING:
-    pass
-    
+    from .component import Component
 
-class Element(Construct, metaclass=ABCMeta):
+
+T = TypeVar("T")
+
+
+class ElementMeta(ABCMeta):
+    def __call__(cls, *args: Any, **kwargs: Any) -> Any:
+        element = super().__call__(*args, **kwargs)
+        # changes are tracked once the constructors of all classes ran, the
+        # model marked itself changed when it registered the element
+        element._built = True
+        return element
+
+
+class Element(Construct, metaclass=ElementMeta):
     """A generic model element"""
 
-    def __init__(self, scope: Construct, name: str, description: str = ""):
-        super().__init__(scope, unique_id(name))
+    __slots__ = (
+        "name",
+        "description",
+        "out_of_scope",
+        "_model",
+        "_built",
+    )
+
+    _caches_digest = True
+
+    def __init__(
+        self,
+        scope: Construct,
+        name: str,
+        description: str = "",
+        *,
+        id: Optional[str] = None,
+    ):
+        self._built = False
+
+        # import when need to avoid circular import
+        from .model import Model
+
+        model = Model.of(scope)
+
+        super().__init__(scope, model._create_id(scope, name) if id is None else id)
 
         self.name = name
         self.description = description
         self.out_of_scope = False
+        self._model = model
 
-        # import when need to avoid circular import
-        from .model import Model
-        self._model = Model.of(self)
+        self._clear_scope_digest()
+
+        # the validation of Element finds nothing, only elements overriding
+        # it need the hook and its bound method
+        if type(self).validate is not Element.validate:
+            self.node.add_validation(self.validate)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        object.__setattr__(self, name, value)
+
+        # private attributes are internal state, properties wrapping them
+        # call _changed themselves
+        if name[0] != "_" and self._built:
+            self._changed()
+
+    def __setstate__(
+        self, state: Tuple[Optional[Dict[str, Any]], Dict[str, Any]]
+    ) -> None:
+        # restored without _changed, the model may not be unpickled yet
+        attributes, slots = state
+        for name, value in {**(attributes or {}), **slots}.items():
+            object.__setattr__(self, name, value)
+
+    @property
+    def _affected_components(self) -> List["Component"]:
+        """Components whose risks may change when this element changes"""
+        return []
+
+    def _tags_changed(self) -> None:
+        # threats may check tags
+        self._changed()
+
+    def _fingerprint_fields(self) -> List[Any]:
+        return [type(self).__qualname__, self.name, self.description, self.out_of_scope]
+
+    def _fingerprint(self) -> bytes:
+        digests = self._model._digests
+        fingerprint = digests.get(self)
+        if fingerprint is None:
+            fingerprint = digests[self] = super()._fingerprint()
+        return fingerprint
 
-        self.node.add_validation(self.validate)
+    def _clear_digest(self) -> None:
+        # the scopes of an element without digest have none either
+        if self._model._digests.pop(self, None) is not None:
+            self._clear_scope_digest()
+
+    def _clear_scope_digest(self) -> None:
+        # the nearest scope caching the digest of its subtree
+        scope = self.node.scope
+        while scope is not None and not scope._caches_digest:
+            scope = scope.node.scope
+        if scope is not None:
+            scope._clear_digest()
+
+    def _changed(self) -> None:
+        if not self._built:
+            return
+
+        self._clear_digest()
+
+        model = getattr(self, "_model", None)
+        if model is not None and model._tracking:
+            model._mark_dirty(*self._affected_components)
 
     def validate(self) -> List[str]:
-        return [] 
+        return []
+
+
+class TrackedSet(Set[T]):
+    """A set attribute of an element, changes in place call _changed of the
+    element like assignments of its attributes do"""
+
+    __slots__ = ("_owner",)
+
+    def __init__(self, owner: "Element", iterable: Iterable[T] = ()) -> None:
+        super().__init__(iterable)
+        self._owner = owner
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return (type(self), (self._owner, list(self)))
+
+    def add(self, element: T) -> None:
+        super().add(element)
+        self._owner._changed()
+
+    def discard(self, element: T) -> None:
+        super().discard(element)
+        self._owner._changed()
+
+    def remove(self, element: T) -> None:
+        super().remove(element)
+        self._owner._changed()
+
+    def pop(self) -> T:
+        element = super().pop()
+        self._owner._changed()
+        return element
+
+    def clear(self) -> None:
+        super().clear()
+        self._owner._changed()
+
+    def update(self, *others: Iterable[T]) -> None:
+        super().update(*others)
+        self._owner._changed()
+
+    def difference_update(self, *others: Iterable[Any]) -> None:
+        super().difference_update(*others)
+        self._owner._changed()
+
+    def intersection_update(self, *others: Iterable[Any]) -> None:
+        super().intersection_update(*others)
+        self._owner._changed()
+
+    def symmetric_difference_update(self, other: Iterable[T]) -> None:
+        super().symmetric_difference_update(other)
+        self._owner._changed()
+
+    # the operators of set update in place without calling update
+    def __ior__(self, other: AbstractSet[T]) -> "TrackedSet[T]":  # type: ignore[misc,override]
+        self.update(other)
+        return self
+
+    def __iand__(self, other: AbstractSet[object]) -> "TrackedSet[T]":
+        self.intersection_update(other)
+        return self
+
+    def __isub__(self, other: AbstractSet[object]) -> "TrackedSet[T]":
+        self.difference_update(other)
+        return self
+
+    def __ixor__(self, other: AbstractSet[T]) -> "TrackedSet[T]":  # type: ignore[misc,override]
+        self.symmetric_difference_update(other)
+        return self
@@ -0,0 +1,83 @@
+"""Content digests of constructs for the fingerprint of a model.
+
+The digest of a construct covers its own fields and the digests of its
+children, so the digest of an unchanged subtree is reused. Elements refer to
+other elements by their index in the model, the referenced content is part of
+the digest of the referenced element itself.
+
+The code of threat classes is part of the fingerprint of a threat library.
+"""
+import hashlib
+from types import CodeType
+from typing import TYPE_CHECKING, Any, Iterable, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from .element import Element
+
+
+def digest(fields: Iterable[Any], children: Iterable[bytes] = ()) -> bytes:
+    """Returns the sha256 digest of the fields and the child digests"""
+    h = hashlib.sha256(
+        repr([_normalize(f) if type(f) in _CONTAINERS else f for f in fields]).encode(
+            "utf8"
+        )
+    )
+    for child in children:
+        h.update(child)
+    return h.digest()
+
+
+def reference(element: Optional["Element"]) -> Optional[int]:
+    return None if element is None else element._model._element_index(element)
+
+
+def references(elements: Iterable["Element"]) -> Tuple[int, ...]:
+    return tuple(sorted(e._model._element_index(e) for e in elements))
+
+
+def class_code(cls: type) -> Tuple[Any, ...]:
+    """The bytecode of the functions and properties of the class and of its
+    bases, except for builtins and abc"""
+    code: List[Any] = list()
+    for klass in cls.__mro__:
+        if klass.__module__ in ("builtins", "abc"):
+            continue
+
+        for name, value in sorted(vars(klass).items()):
+            if isinstance(value, property):
+                value = value.fget
+            elif isinstance(value, (staticmethod, classmethod)):
+                value = value.__func__
+
+            func_code = getattr(value, "__code__", None)
+            if isinstance(func_code, CodeType):
+                code.append((klass.__qualname__, name, _code(func_code)))
+
+    return tuple(code)
+
+
+def _code(code: CodeType) -> Tuple[Any, ...]:
+    return (
+        code.co_code,
+        code.co_names,
+        tuple(
+            _code(c) if isinstance(c, CodeType) else _normalize(c)
+            for c in code.co_consts
+        ),
+    )
+
+
+def _normalize(value: Any) -> Any:
+    # only the order of sets and dicts may differ between runs, the reprs of
+    # the other values, enums included, are stable
+    cls = type(value)
+    if cls is set or cls is frozenset:
+        return tuple(sorted(repr(_normalize(v)) for v in value))
+    if cls is dict:
+        return tuple(sorted((repr(k), _normalize(v)) for k, v in value.items()))
+    if cls is list or cls is tuple:
+        return tuple(_normalize(v) for v in value)
+    return value
+
+
+_CONTAINERS = frozenset([set, frozenset, dict, list, tuple])
@@ -1,22 +1,46 @@
+import io
 import os
-from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Set, cast
+import weakref
+from contextlib import ExitStack, contextmanager
+from gzip import GzipFile
+from typing import (
+    IO,
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+    cast,
+)
 
-from jinja2 import Template
 from tabulate import tabulate
 
 from .asset import Asset
+from .cache import EVALUATION_CACHE_FORMAT, EvaluationCache, source_fingerprint
 from .component import Component
 from .data_flow import DataFlow
 from .diagram import DataFlowDiagram
-from .node import Construct, unique_id
-from .otm import OpenThreatModel, OpenThreatModelProject
+from .element import Element
+from .fingerprint import digest
+from .node import Construct, IdStrategy, deterministic_id, unique_id
+from .otm import OpenThreatModel, OpenThreatModelProject, write_otm
+from .risk import ComponentRisk, ModelRisk
 from .table_format import TableFormat
+from .template import load_template
 from .tag import TagMixin
 from .threat import ThreatLibrary
 from .threat_library import (
     DEFAULT_THREAT_LIBRARY,
     DEFAULT_USER_STORY_TEMPLATE_REPOSITORY,
 )
+from .snapshot import ModelSnapshot
 from .trust_boundary import TrustBoundary
 from .user_story import UserStoryTemplateRepository
 
@@ -25,25 +49,37 @@ if TYPE_CHECKING:
     from .user_story import UserStory
 
 
+T = TypeVar("T")
+
+DEFAULT_REPORT_TEMPLATE = os.path.join(
+    os.path.dirname(__file__), "templates", "default.tpl"
+)
+
+
 class ModelException(Exception):
     pass
 
 
 class Model(Construct, TagMixin):
+    _caches_digest = True
+
     @staticmethod
     def of(construct: "Construct") -> "Model":
-        def lookup(c: "Construct") -> "Model":
-            if isinstance(c, Model):
-                return c
+        # a model is always the root of its tree
+        root = construct.node.root
+        if not isinstance(root, Model):
+            raise ValueError("No model could be identified for the construct at path")
 
-            if c.node.scope is None:
-                raise ValueError(
-                    "No model could be identified for the construct at path"
-                )
+        return root
 
-            return lookup(c.node.scope)
+    @staticmethod
+    def from_otm(fp: Union[str, "os.PathLike[str]", IO[Any]], **kwargs: Any) -> "Model":
+        """Creates a model from an OpenThreatModel json document at a path or
+        in a file object, which may be gzip compressed. Keyword arguments are
+        passed to the model."""
+        from .otm_loader import load_model, read_document
 
-        return lookup(construct)
+        return load_model(read_document(fp), **kwargs)
 
     def __init__(
         self,
@@ -56,94 +92,309 @@ class Model(Construct, TagMixin):
         skip_validation: bool = False,
         user_story_template_repository: Optional["UserStoryTemplateRepository"] = None,
         threat_library: Optional["ThreatLibrary"] = None,
+        id: Optional[str] = None,
+        id_strategy: IdStrategy = IdStrategy.RANDOM,
+        cache_dir: Optional[str] = None,
     ) -> None:
-        super().__init__(None, unique_id(name))
-
-        self.name = name
-        self.description = description
-        self.owner = owner
-        self.owner_contact = owner_contact
+        if id is None:
+            id = (
+                deterministic_id(name)
+                if id_strategy == IdStrategy.DETERMINISTIC
+                else unique_id(name)
+            )
+        super().__init__(None, id)
+        TagMixin.__init__(self)
+
+        self.id_strategy = id_strategy
+        # constructs created per scope id and name, numbers deterministic ids
+        self._id_counts: Dict[str, int] = dict()
+
+        # part of the results, the properties setting them call _changed
+        self._name = name
+        self._description = description
+        self._owner = owner
+        self._owner_contact = owner_contact
         self.auto_evaluate = auto_evaluate
         self.skip_validation = skip_validation
 
         if user_story_template_repository is None:
-            self.user_story_template_repository = DEFAULT_USER_STORY_TEMPLATE_REPOSITORY
-        else:
-            self.user_story_template_repository = user_story_template_repository
+            user_story_template_repository = DEFAULT_USER_STORY_TEMPLATE_REPOSITORY
+        self._user_story_template_repository = user_story_template_repository
 
         if threat_library is None:
             self.threat_library = DEFAULT_THREAT_LIBRARY
         else:
             self.threat_library = threat_library
 
+        # evaluation results of models by content, reused across runs
+        self.evaluation_cache: Optional["EvaluationCache"] = None
+        if cache_dir is not None:
+            self.evaluation_cache = EvaluationCache(cache_dir)
+
         self._risks: Dict[str, "Risk"] = dict()
 
+        # incremental evaluation: risks per component from the last evaluation
+        # and the components whose risks have to be recomputed
+        self._component_risks: Dict["Component", List["Risk"]] = dict()
+        self._dirty: Set["Component"] = set()
+        self._states_changed = False
+        # disabled by _bulk_construction, elements then skip marking the
+        # components they affect
+        self._tracking = True
+        self._evaluated_threat_library: Optional[
+            Tuple[int, int, Tuple[str, ...]]
+        ] = None
+
+        # bumped on every structural or state change, results of the last
+        # evaluation are reused as long as it is unchanged
+        self._generation = 0
+        self._evaluated_generation: Optional[int] = None
+        # user stories of the risks and the snapshot, with the template
+        # repository they were created from, see _repository_key
+        self._user_stories: Optional[List["UserStory[Risk]"]] = None
+        self._user_stories_key: Optional[Tuple[int, int]] = None
+        self._snapshot: Optional["ModelSnapshot"] = None
+        self._snapshot_key: Optional[Tuple[int, int]] = None
+        # digest of the children of the model, cleared by elements whose
+        # digest changes and on every change of the model
+        self._children_digest: Optional[bytes] = None
+
+        # constructs of the tree in insertion order, the constructs by type
+        # and the positions of the elements are derived on first use
+        self._constructs: List["Construct"] = list()
+        self._constructs_by_type: Dict[Type["Construct"], List["Construct"]] = dict()
+        self._element_indexes: Optional[Dict["Element", int]] = None
+        # digests of elements and their subtrees, see Element._fingerprint
+        self._digests: Dict["Element", bytes] = dict()
+
+        # risk and user story states by id, maintained by _update_state
+        self._states: Dict[str, "ModelState"] = dict()
+
+        # user stories materialized by the risks, updated in place when their
+        # state changes
+        self._user_stories_by_id: "weakref.WeakValueDictionary[str, UserStory[Risk]]" = (
+            weakref.WeakValueDictionary()
+        )
+
+        # adjacency index maintained by DataFlow, keyed by source/destination
+        self._incoming_flows: Dict["Component", List["DataFlow"]] = dict()
+        self._outgoing_flows: Dict["Component", List["DataFlow"]] = dict()
+
+        # trust boundary hierarchy maintained by Component and TrustBoundary
+        self._trust_boundary_children: Dict[
+            "TrustBoundary", List["TrustBoundary"]
+        ] = dict()
+        self._trust_boundary_components: Dict[
+            "TrustBoundary", List["Component"]
+        ] = dict()
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @name.setter
+    def name(self, name: str) -> None:
+        self._name = name
+        self._changed()
+
+    @property
+    def description(self) -> str:
+        return self._description
+
+    @description.setter
+    def description(self, description: str) -> None:
+        self._description = description
+        self._changed()
+
+    @property
+    def owner(self) -> str:
+        return self._owner
+
+    @owner.setter
+    def owner(self, owner: str) -> None:
+        self._owner = owner
+        self._changed()
+
+    @property
+    def owner_contact(self) -> str:
+        return self._owner_contact
+
+    @owner_contact.setter
+    def owner_contact(self, owner_contact: str) -> None:
+        self._owner_contact = owner_contact
+        self._changed()
+
+    @property
+    def user_story_template_repository(self) -> "UserStoryTemplateRepository":
+        return self._user_story_template_repository
+
+    @user_story_template_repository.setter
+    def user_story_template_repository(
+        self, user_story_template_repository: "UserStoryTemplateRepository"
+    ) -> None:
+        self._user_story_template_repository = user_story_template_repository
+        self._changed()
+
     @property
     def assets(self) -> List["Asset"]:
-        return cast(
-            List["Asset"],
-            list(filter(lambda c: isinstance(c, Asset), self.node.find_all())),
-        )
+        return cast(List["Asset"], self._find_all_of_type(Asset))
 
     @property
     def components(self) -> List["Component"]:
-        return cast(
-            List["Component"],
-            list(filter(lambda c: isinstance(c, Component), self.node.find_all())),
-        )
+        return cast(List["Component"], self._find_all_of_type(Component))
 
     @property
     def data_flows(self) -> List["DataFlow"]:
-        return cast(
-            List["DataFlow"],
-            list(filter(lambda c: isinstance(c, DataFlow), self.node.find_all())),
-        )
+        return cast(List["DataFlow"], self._find_all_of_type(DataFlow))
 
     @property
     def trust_boundaries(self) -> List["TrustBoundary"]:
-        return cast(
-            List["TrustBoundary"],
-            list(filter(lambda c: isinstance(c, TrustBoundary), self.node.find_all())),
-        )
+        return cast(List["TrustBoundary"], self._find_all_of_type(TrustBoundary))
 
     @property
     def states(self) -> List["ModelState"]:
-        return cast(
-            List["ModelState"],
-            list(filter(lambda c: isinstance(c, ModelState), self.node.find_all())),
-        )
+        return list(self._states.values())
+
+    @property
+    def generation(self) -> int:
+        """Incremented whenever a construct or state of the model changes"""
+        return self._generation
 
     @property
     def risks(self) -> List["Risk"]:
-        if self.auto_evaluate:
+        if self.auto_evaluate and self._needs_evaluation():
             self.evaluate()
         return list(self._risks.values())
 
     @property
     def user_stories(self) -> List["UserStory[Risk]"]:
-        stories: Set["UserStory[Risk]"] = set()
-        for risk in self.risks:
-            for story in risk.user_stories:
-                stories.add(story)
+        risks = self.risks
+
+        repository = self._repository_key()
+        if self._user_stories is None or self._user_stories_key != repository:
+            stories: Set["UserStory[Risk]"] = set()
+            for risk in risks:
+                for story in risk.user_stories:
+                    stories.add(story)
+
+            self._user_stories = list(stories)
+            self._user_stories_key = repository
+
+        return list(self._user_stories)
+
+    def snapshot(self) -> "ModelSnapshot":
+        """Returns the immutable results of the evaluation of the current
+        state of the model. The model is evaluated if it changed, the snapshot
+        is shared until the next change."""
+        if self._needs_evaluation():
+            self.evaluate()
 
-        return list(stories)
+        repository = self._repository_key()
+        if self._snapshot is None or self._snapshot_key != repository:
+            self._snapshot = ModelSnapshot(self)
+            self._snapshot_key = repository
+
+        return self._snapshot
+
+    def fingerprint(self) -> str:
+        """Returns a sha256 hex digest of the content of the model: its
+        elements with their attributes and references, the trust boundary
+        nesting and the states of risks and user stories. Element ids are not
+        part of it, models built in the same order have the same fingerprint.
+
+        Digests of unchanged elements and their subtrees are reused."""
+        return self._fingerprint().hex()
+
+    def _fingerprint_fields(self) -> List[Any]:
+        return [
+            type(self).__qualname__,
+            self.name,
+            self.description,
+            self.owner,
+            self.owner_contact,
+            self._tags,
+        ]
+
+    def _fingerprint(self) -> bytes:
+        if self._children_digest is None:
+            self._children_digest = digest(
+                [], (child._fingerprint() for child in self.node.children)
+            )
+        return digest(self._fingerprint_fields(), [self._children_digest])
+
+    def _clear_digest(self) -> None:
+        self._children_digest = None
+
+    def _tags_changed(self) -> None:
+        # model threats may check tags
+        self._changed()
+
+    @property
+    def _otm_project(self) -> "OpenThreatModelProject":
+        return OpenThreatModelProject(
+            name=self.name,
+            id=self.id,
+            description=self.description,
+            owner=self.owner,
+            owner_contact=self.owner_contact,
+            tags=self.tags,
+        )
 
     @property
     def otm(self) -> "OpenThreatModel":
         return OpenThreatModel(
-            project=OpenThreatModelProject(name=self.name, id=self.id),
+            project=self._otm_project,
             assets=[a.otm for a in self.assets],
+            trust_zones=[tb.otm for tb in self.trust_boundaries],
             components=[c.otm for c in self.components],
             data_flows=[df.otm for df in self.data_flows],
             # threats=[r.otm for r in self.risks],
             # mitigations=[m.otm for m in self.mitigations],
         )
 
+    def write_otm(
+        self,
+        fp: Union[str, "os.PathLike[str]", IO[Any]],
+        *,
+        compact: bool = False,
+        gzip: bool = False,
+    ) -> None:
+        """Writes the model as OpenThreatModel json to a path or file object.
+
+        Assets, components and dataflows are written one by one instead of
+        building the whole document first. With compact the json is written
+        without whitespace, with gzip it is compressed, which requires a
+        path or a binary file object.
+        """
+        with ExitStack() as stack:
+            if isinstance(fp, (str, os.PathLike)):
+                fp = stack.enter_context(open(fp, "wb"))
+
+            if gzip:
+                if isinstance(fp, io.TextIOBase):
+                    raise ValueError("gzip requires a binary file object")
+                fp = cast(
+                    IO[bytes], stack.enter_context(GzipFile(fileobj=fp, mode="wb"))
+                )
+
+            if not isinstance(fp, io.TextIOBase):
+                text = io.TextIOWrapper(fp, encoding="utf8")
+                # detaching flushes the wrapper and keeps fp open
+                stack.callback(text.detach)
+                fp = text
+
+            write_otm(
+                fp,
+                self._otm_project,
+                assets=(a.otm for a in self.assets),
+                trust_zones=(tb.otm for tb in self.trust_boundaries),
+                components=(c.otm for c in self.components),
+                data_flows=(df.otm for df in self.data_flows),
+                indent=None if compact else 4,
+            )
+
     def get_state_by_id(self, id: str) -> Optional["ModelState"]:
-        for state in self.states:
-            if state.id == id:
-                return state
-        return None
+        return self._states.get(id)
 
     def accept_risk(self, id: str, *, ticket: str = "", comment: str = "") -> None:
         self._update_state(id, "accepted", ticket=ticket, comment=comment)
@@ -169,13 +420,157 @@ class Model(Construct, TagMixin):
     def _update_state(
         self, id: str, state: str, *, ticket: str = "", comment: str = ""
     ) -> None:
+        self._states_changed = True
+        self._changed()
+
         model_state = self.get_state_by_id(id)
         if model_state is not None:
             model_state.state = state
             model_state.ticket = ticket
             model_state.comment = comment
         else:
-            ModelState(self, id, state, ticket=ticket, comment=comment)
+            self._states[id] = ModelState(
+                self, id, state, ticket=ticket, comment=comment
+            )
+
+        user_story = self._user_stories_by_id.get(id)
+        if user_story is not None:
+            user_story.update_state(state, ticket=ticket, comment=comment)
+
+    def _register_user_stories(self, user_stories: List["UserStory[Risk]"]) -> None:
+        for user_story in user_stories:
+            self._user_stories_by_id[user_story.id] = user_story
+
+    def __getstate__(self) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        # the weak user story map and the read-only snapshot are not picklable,
+        # both are derived from the risks
+        # object.__getstate__ is new in python 3.11, the pinned mypy does not
+        # know it yet
+        state, slots = cast(
+            Tuple[Dict[str, Any], Dict[str, Any]],
+            super().__getstate__(),  # type: ignore[misc]
+        )
+        state = dict(state, _user_stories_by_id=None, _snapshot=None)
+        return state, slots
+
+    def __setstate__(self, state: Tuple[Dict[str, Any], Dict[str, Any]]) -> None:
+        attributes, slots = state
+        self.__dict__.update(attributes)
+        for name, value in slots.items():
+            setattr(self, name, value)
+        self._user_stories_by_id = weakref.WeakValueDictionary()
+        for risk in self._risks.values():
+            if risk._user_stories is not None:
+                self._register_user_stories(risk._user_stories)
+
+    def _create_id(self, scope: "Construct", name: str) -> str:
+        if self.id_strategy != IdStrategy.DETERMINISTIC:
+            return unique_id(name)
+
+        key = f"{scope.id}/{name}"
+        index = self._id_counts.get(key, 0)
+        self._id_counts[key] = index + 1
+        return deterministic_id(name, scope.id, index)
+
+    def _register_construct(self, construct: "Construct") -> None:
+        # new components have no risks yet, evaluate treats them as dirty
+        self._constructs.append(construct)
+        self._constructs_by_type.clear()
+        self._element_indexes = None
+
+        self._changed()
+
+    @contextmanager
+    def _bulk_construction(self) -> Iterator[None]:
+        """Suppresses change tracking of elements while many elements are
+        constructed, all components are marked dirty afterwards"""
+        self._tracking = False
+        try:
+            yield
+        finally:
+            self._tracking = True
+            self._mark_dirty(*self.components)
+
+    def _mark_dirty(self, *components: "Component") -> None:
+        # components without risks are evaluated anyway
+        self._dirty.update(c for c in components if c in self._component_risks)
+        self._changed()
+
+    def _changed(self) -> None:
+        self._generation += 1
+        self._user_stories = None
+        self._snapshot = None
+        self._children_digest = None
+
+    def _needs_evaluation(self) -> bool:
+        return (
+            self._generation != self._evaluated_generation
+            or self._threat_library_key() != self._evaluated_threat_library
+        )
+
+    def _repository_key(self) -> Tuple[int, int]:
+        # templates are added to the repository without a change of the model
+        return (
+            id(self.user_story_template_repository),
+            self.user_story_template_repository.version,
+        )
+
+    def _threat_library_key(self) -> Tuple[int, int, Tuple[str, ...]]:
+        return (
+            id(self.threat_library),
+            self.threat_library.version,
+            tuple(self.threat_library.excludes),
+        )
+
+    def _find_all_of_type(self, cls: Type["Construct"]) -> List["Construct"]:
+        constructs = self._constructs_by_type.get(cls)
+        if constructs is None:
+            constructs = [c for c in self._constructs if isinstance(c, cls)]
+            self._constructs_by_type[cls] = constructs
+        return list(constructs)
+
+    def _element_index(self, element: "Element") -> int:
+        """Position of the element among the elements of the model, stable
+        unlike random ids. Fingerprints and cached evaluations refer to
+        elements by it."""
+        if self._element_indexes is None:
+            elements = cast(List["Element"], self._find_all_of_type(Element))
+            self._element_indexes = {e: i for i, e in enumerate(elements)}
+        return self._element_indexes[element]
+
+    def _add_data_flow(self, flow: "DataFlow") -> None:
+        self._outgoing_flows.setdefault(flow.source, []).append(flow)
+        self._incoming_flows.setdefault(flow.destination, []).append(flow)
+        self._mark_dirty(flow.source, flow.destination)
+
+    def _remove_data_flow(self, flow: "DataFlow") -> None:
+        self._outgoing_flows[flow.source].remove(flow)
+        self._incoming_flows[flow.destination].remove(flow)
+        self._mark_dirty(flow.source, flow.destination)
+
+    def _add_trust_boundary_component(self, component: "Component") -> None:
+        self._mark_dirty(*component._affected_components)
+        if component.trust_boundary is not None:
+            self._trust_boundary_components.setdefault(
+                component.trust_boundary, []
+            ).append(component)
+
+    def _remove_trust_boundary_component(self, component: "Component") -> None:
+        if component.trust_boundary is not None:
+            self._trust_boundary_components[component.trust_boundary].remove(component)
+
+    def _add_trust_boundary_child(self, trust_boundary: "TrustBoundary") -> None:
+        self._mark_dirty(*trust_boundary._affected_components)
+        if trust_boundary.trust_boundary is not None:
+            self._trust_boundary_children.setdefault(
+                trust_boundary.trust_boundary, []
+            ).append(trust_boundary)
+
+    def _remove_trust_boundary_child(self, trust_boundary: "TrustBoundary") -> None:
+        if trust_boundary.trust_boundary is not None:
+            self._trust_boundary_children[trust_boundary.trust_boundary].remove(
+                trust_boundary
+            )
 
     def is_notebook(self) -> bool:
         try:
@@ -197,7 +592,7 @@ class Model(Construct, TagMixin):
     ) -> str:
         headers = ["ID", "Category", "Risk", "Treatment"]
         table = []
-        for risk in self.risks:
+        for risk in self.snapshot().risks:
             table.append([risk.id, risk.category, risk.text, risk.treatment.state])
 
         maxcolwodths: Optional[Iterable[int | None]] = [None, 15, 60, 10]
@@ -216,7 +611,7 @@ class Model(Construct, TagMixin):
     ) -> str:
         headers = ["ID", "Category", "User Story", "State"]
         table = []
-        for user_story in self.user_stories:
+        for user_story in self.snapshot().user_stories:
             table.append(
                 [
                     user_story.id,
@@ -237,14 +632,31 @@ class Model(Construct, TagMixin):
             maxcolwidths=maxcolwodths,
         )
 
-    def create_report(self) -> None:
-        with open(
-            os.path.dirname(__file__) + "/templates/default.tpl", "r", encoding="utf8"
-        ) as tpl_file:
-            template = Template(tpl_file.read())
+    def create_report(
+        self, path: str = "report.md", *, template: Optional[str] = None
+    ) -> None:
+        """Renders the report to path, chunk by chunk.
 
-        with open("report.md", "w+") as f:
-            f.write(template.render(model=self))
+        The template is a path to a jinja2 template, by default the markdown
+        template of tmac. Besides the model it gets the snapshot of the model
+        with its risks, user stories and user stories by risk id.
+        """
+        snapshot = self.snapshot()
+
+        report_template = load_template(
+            DEFAULT_REPORT_TEMPLATE if template is None else template
+        )
+
+        with open(path, "w", encoding="utf8") as f:
+            f.writelines(
+                report_template.generate(
+                    model=self,
+                    snapshot=snapshot,
+                    risks=snapshot.risks,
+                    user_stories=snapshot.user_stories,
+                    user_stories_by_risk=snapshot.user_stories_by_risk,
+                )
+            )
 
     def create_data_flow_diagram(
         self,
@@ -273,30 +685,240 @@ class Model(Construct, TagMixin):
 
         diagram.show()
 
-    def evaluate(self) -> None:
-        self.node.lock()
-        if not self.skip_validation:
-            exceptions: List["ModelException"] = list()
-            for c in self.node.find_all():
-                errors = c.node.validate()
-                for error in errors:
-                    exceptions.append(ModelException(error))
-            if len(exceptions) > 0:
-                raise ExceptionGroup("Validation errors", exceptions)
+    def evaluate(
+        self,
+        *,
+        vectorized: bool = False,
+        workers: int = 1,
+        executor: str = "process",
+    ) -> None:
+        """Evaluates the threat library against the model.
+
+        With vectorized, component threats are evaluated with numpy over all
+        affected components at once (see tmac.vectorized). With more than one
+        worker, components are evaluated in a "process" or "thread" pool (see
+        tmac.parallel).
+
+        With an evaluation cache, a full evaluation of a model whose
+        fingerprint was evaluated before restores the cached risks instead.
+        The fingerprint costs about as much as an evaluation with the default
+        threat library, the cache pays off for expensive threats.
+        """
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        if executor not in ("process", "thread"):
+            raise ValueError(f"Unknown executor: {executor}")
+        if vectorized and workers > 1:
+            raise ValueError("vectorized cannot be combined with workers")
 
+        self.node.lock()
+        try:
+            threat_library = self._threat_library_key()
+
+            # results of a full evaluation may be cached, incremental
+            # evaluations reuse the results in memory
+            cache_key: Optional[str] = None
+            if (
+                self.evaluation_cache is not None
+                and threat_library != self._evaluated_threat_library
+            ):
+                cache_key = self._evaluation_cache_key()
+                entry = self.evaluation_cache.get(cache_key)
+                if entry is not None and self._restore_evaluation(
+                    entry, threat_library
+                ):
+                    return
+
+            if not self.skip_validation:
+                exceptions: List["ModelException"] = list()
+                for c in self.node.find_all():
+                    errors = c.node.validate()
+                    for error in errors:
+                        exceptions.append(ModelException(error))
+                if len(exceptions) > 0:
+                    raise ExceptionGroup("Validation errors", exceptions)
+
+            if threat_library != self._evaluated_threat_library:
+                self._component_risks = dict()
+
+            # ModelRisks
+            model_risks = self.threat_library.apply(self, component=None)
+
+            # ComponentRisks, only recomputed for components affected by changes
+            # since the last evaluation
+            dirty = [
+                c
+                for c in self.components
+                if c in self._dirty or c not in self._component_risks
+            ]
+            if vectorized:
+                from .vectorized import VectorizedEngine
+
+                evaluated = VectorizedEngine(self.threat_library).apply(self, dirty)
+            elif workers > 1 and len(dirty) > 1:
+                from .parallel import evaluate_components
+
+                evaluated = evaluate_components(
+                    self, dirty, workers=workers, executor=executor
+                )
+                risks = [r for c in dirty for r in evaluated[c]]
+                self.threat_library.update_treatments(self, risks)
+            else:
+                evaluated = {c: c.risks for c in dirty}
+
+            component_risks: Dict["Component", List["Risk"]] = dict()
+            for c in self.components:
+                if c in evaluated:
+                    component_risks[c] = evaluated[c]
+                else:
+                    risks = self._component_risks[c]
+                    if self._states_changed:
+                        self.threat_library.update_treatments(self, risks)
+                    component_risks[c] = risks
+
+            self._set_evaluation(model_risks, component_risks, threat_library)
+
+            if cache_key is not None and self.evaluation_cache is not None:
+                entry = self._evaluation_entry(model_risks, component_risks)
+                # the results are stored only under the key of the content
+                # they were computed from
+                if entry is not None and self._evaluation_cache_key() == cache_key:
+                    self.evaluation_cache.put(cache_key, entry)
+        finally:
+            self.node.unlock()
+
+    def _set_evaluation(
+        self,
+        model_risks: List["Risk"],
+        component_risks: Dict["Component", List["Risk"]],
+        threat_library: Tuple[int, int, Tuple[str, ...]],
+    ) -> None:
         self._risks = dict()
-
-        # ModelRisks
-        model_risks = self.threat_library.apply(self, component=None)
         for risk in model_risks:
             self._risks[risk.id] = risk
-
-        # ComponentRisks
-        for c in self.components:
-            for risk in c.risks:
+        for risks in component_risks.values():
+            for risk in risks:
                 self._risks[risk.id] = risk
 
-        self.node.unlock()
+        self._component_risks = component_risks
+        self._dirty = set()
+        self._states_changed = False
+        self._evaluated_threat_library = threat_library
+        self._evaluated_generation = self._generation
+        self._user_stories = None
+        self._snapshot = None
+
+    def _evaluation_cache_key(self) -> str:
+        return digest(
+            [
+                EVALUATION_CACHE_FORMAT,
+                source_fingerprint(),
+                self.fingerprint(),
+                self.threat_library.fingerprint(),
+                self.user_story_template_repository.fingerprint(),
+                self.skip_validation,
+            ]
+        ).hex()
+
+    def _evaluation_entry(
+        self,
+        model_risks: List["Risk"],
+        component_risks: Dict["Component", List["Risk"]],
+    ) -> Optional[Dict[str, Any]]:
+        """Encodes the risks by threat id and element index. Returns None if
+        there are risks of other types than ModelRisk and ComponentRisk."""
+        if any(type(r) is not ModelRisk for r in model_risks):
+            return None
+
+        components: List[Any] = list()
+        for component, risks in component_risks.items():
+            encoded: List[Any] = list()
+            for risk in risks:
+                if type(risk) is not ComponentRisk:
+                    return None
+                risk = cast("ComponentRisk", risk)
+                data_flow = risk.data_flow
+                encoded.append(
+                    [
+                        risk._threat.id,
+                        None if data_flow is None else self._element_index(data_flow),
+                    ]
+                )
+            components.append([self._element_index(component), encoded])
+
+        return {
+            "format": EVALUATION_CACHE_FORMAT,
+            "model_risks": [r._threat.id for r in model_risks],
+            "component_risks": components,
+        }
+
+    def _restore_evaluation(
+        self, entry: Dict[str, Any], threat_library: Tuple[int, int, Tuple[str, ...]]
+    ) -> bool:
+        """Recreates the risks of a cached evaluation. Returns False if the
+        entry does not fit the model."""
+        elements = self._find_all_of_type(Element)
+        # risks applied together, the after_apply_hook gets them as a group
+        groups: List[List["Risk"]] = list()
+
+        def element(index: Optional[int], cls: Type[T]) -> T:
+            if index is None or not 0 <= index < len(elements):
+                raise ValueError(f"Unknown element: {index}")
+            if not isinstance(elements[index], cls):
+                raise ValueError(f"Unexpected element: {index}")
+            return cast(T, elements[index])
+
+        risk: "Risk"
+        try:
+            if entry.get("format") != EVALUATION_CACHE_FORMAT:
+                return False
+
+            model_risks: List["Risk"] = list()
+            for threat_id in entry["model_risks"]:
+                risk = ModelRisk(self.threat_library[threat_id], model=self)
+                if len(groups) == 0 or groups[-1][0]._threat.id != threat_id:
+                    groups.append([])
+                groups[-1].append(risk)
+                model_risks.append(risk)
+
+            component_risks: Dict["Component", List["Risk"]] = dict()
+            for component_index, encoded in entry["component_risks"]:
+                component = element(
+                    component_index, Component  # type: ignore[type-abstract]
+                )
+                risks: List["Risk"] = list()
+                for threat_id, data_flow_index in encoded:
+                    risk = ComponentRisk(
+                        self.threat_library[threat_id],
+                        model=self,
+                        component=component,
+                        data_flow=(
+                            None
+                            if data_flow_index is None
+                            else element(data_flow_index, DataFlow)
+                        ),
+                    )
+                    if len(risks) == 0 or risks[-1]._threat.id != threat_id:
+                        groups.append([])
+                    groups[-1].append(risk)
+                    risks.append(risk)
+                component_risks[component] = risks
+        except (KeyError, TypeError, ValueError):
+            return False
+
+        if set(component_risks) != set(self.components):
+            return False
+
+        if self.threat_library.after_apply_hook is not None:
+            for group in groups:
+                self.threat_library.after_apply_hook(group)
+
+        self.threat_library.update_treatments(
+            self,
+            [*model_risks, *(r for risks in component_risks.values() for r in risks)],
+        )
+        self._set_evaluation(model_risks, component_risks, threat_library)
+        return True
 
 
 class ModelState(Construct):
@@ -314,3 +936,6 @@ class ModelState(Construct):
         self.state = state
         self.ticket = ticket
         self.comment = comment
+
+    def _fingerprint_fields(self) -> List[Any]:
+        return [type(self).__qualname__, self.id, self.state, self.ticket, self.comment]
@@ -1,9 +1,50 @@
-import uuid
+import hashlib
+import os
+from enum import Enum
+from functools import lru_cache
 from re import sub
 from typing import Any, Dict, List, Callable, Optional, cast
 
+from .fingerprint import digest
+
+
+class IdStrategy(Enum):
+    """How ids of constructs without an explicit id are generated"""
+
+    RANDOM = "random"
+    """kebab-case name with a random suffix, differs on every run"""
+
+    DETERMINISTIC = "deterministic"
+    """kebab-case name with a hash of the scope id and the name, stable across
+    runs as long as the constructs are created in the same order"""
+
+    def __str__(self) -> str:
+        return str(self.value)
+
+
+class _Tree:
+    """Shared by the nodes of a tree, counts the locked nodes so unlocked
+    trees need no walk up the scopes"""
+
+    __slots__ = ("root", "locks")
+
+    def __init__(self, root: "Node") -> None:
+        self.root = root
+        self.locks = 0
+
 
 class Node:
+    __slots__ = (
+        "_id",
+        "_scope",
+        "_host",
+        "_locked",
+        "_tree",
+        "_children",
+        "_validations",
+        "_context",
+    )
+
     @staticmethod
     def of(construct: "Construct") -> "Node":
         return construct.node
@@ -18,9 +59,12 @@ class Node:
         self._scope = scope
         self._host = host
         self._locked = False
-        self._children: Dict[str, "Construct"] = dict()
-        self._validations: List[Callable[[], List[str]]] = list()
-        self._context: Dict[str, Any] = dict()
+        self._tree: _Tree = _Tree(self) if scope is None else scope.node._tree
+        # allocated with the first child, validation or context value, most
+        # constructs are leaves
+        self._children: Optional[Dict[str, "Construct"]] = None
+        self._validations: Optional[List[Callable[[], List[str]]]] = None
+        self._context: Optional[Dict[str, Any]] = None
 
         if scope is not None:
             scope.node._add_child(host, id)
@@ -35,19 +79,30 @@ class Node:
 
     @property
     def children(self) -> List["Construct"]:
+        if self._children is None:
+            return []
         return list(self._children.values())
 
+    @property
+    def root(self) -> "Construct":
+        return self._tree.root._host
+
     @property
     def locked(self) -> bool:
-        if self._locked:
-            return True
+        if self._tree.locks == 0:
+            return False
 
-        if self.scope is not None and self.scope.node.locked:
-            return True
+        node: Optional["Node"] = self
+        while node is not None:
+            if node._locked:
+                return True
+            node = None if node._scope is None else node._scope.node
 
         return False
 
     def find_child(self, id: str) -> Optional["Construct"]:
+        if self._children is None:
+            return None
         return self._children.get(id)
 
     def find_all(self) -> List["Construct"]:
@@ -64,25 +119,42 @@ class Node:
         return ret
 
     def add_validation(self, validate: Callable[[], List[str]]) -> None:
-        self._validations.append(validate)
+        if self._validations is None:
+            self._validations = [validate]
+        else:
+            self._validations.append(validate)
 
     def validate(self) -> List[str]:
+        if self._validations is None:
+            return []
         return [error for validate in self._validations for error in validate()]
 
     def lock(self) -> None:
-        self._locked = True
+        if not self._locked:
+            self._locked = True
+            self._tree.locks += 1
 
     def unlock(self) -> None:
-        self._locked = False
+        if self._locked:
+            self._locked = False
+            self._tree.locks -= 1
 
     def _add_child(self, child: "Construct", id: str) -> None:
         if self.locked:
             raise RuntimeError("Cannot add children")
 
+        if self._children is None:
+            self._children = dict()
         self._children[id] = child
+        self.root._register_construct(child)
 
 
 class Construct:
+    __slots__ = ("_id", "_node")
+
+    # constructs caching their digest override _clear_digest
+    _caches_digest = False
+
     def __init__(self, scope: Optional["Construct"], id: str) -> None:
         self._id = id
         self._node = Node(self, scope, id)
@@ -95,12 +167,44 @@ class Construct:
     def node(self) -> "Node":
         return self._node
 
+    def _register_construct(self, construct: "Construct") -> None:
+        """Called on the root construct whenever a construct is added to its tree"""
+        pass
+
+    def _fingerprint_fields(self) -> List[Any]:
+        """Content of the construct, without its children"""
+        return [type(self).__qualname__, self.id]
+
+    def _clear_digest(self) -> None:
+        """Drops the cached digest of the construct and of its scopes"""
+        pass
+
+    def _fingerprint(self) -> bytes:
+        """Digest of the construct and its subtree"""
+        return digest(
+            self._fingerprint_fields(),
+            (child._fingerprint() for child in self.node.children),
+        )
+
 
 def unique_id(name: str) -> str:
-    uid = str(uuid.uuid4())[:8]
-    return kebab_case(f"{name}-{uid}")
+    return _with_suffix(name, os.urandom(4).hex())
+
+
+def deterministic_id(name: str, scope_id: str = "", index: int = 0) -> str:
+    """Returns the id of the index-th construct of the name in the scope"""
+    key = f"{scope_id}/{name}" if index == 0 else f"{scope_id}/{name}#{index}"
+    return _with_suffix(
+        name, hashlib.blake2b(key.encode("utf8"), digest_size=4).hexdigest()
+    )
+
+
+def _with_suffix(name: str, suffix: str) -> str:
+    prefix = kebab_case(name)
+    return f"{prefix}-{suffix}" if prefix != "" else suffix
 
 
+@lru_cache(maxsize=4096)
 def kebab_case(s: str) -> str:
     return "-".join(
         sub(
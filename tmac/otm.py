@@ -1,18 +1,72 @@
 import json
-from abc import ABC
-from typing import List, Dict, Any
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from types import ModuleType
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    TextIO,
+    Tuple,
+    TypeVar,
+)
+
+OTM_VERSION = "0.1.0"
+
+T = TypeVar("T")
+
+
+def _unique(items: Iterable[T], key: Callable[[T], Hashable] = lambda i: i) -> List[T]:
+    # keeps the first of equal items in order, like the former sets but stable
+    unique: Dict[Hashable, T] = dict()
+    for item in items:
+        unique.setdefault(key(item), item)
+    return list(unique.values())
+
+
+# orjson is imported on first use to keep `import tmac` cheap
+@lru_cache(maxsize=None)
+def _orjson() -> Optional[ModuleType]:
+    try:
+        import orjson
+    except ImportError:  # pragma: no cover
+        return None
+    return orjson
+
+
+def dumps(o: Any, indent: Optional[int] = None) -> str:
+    """Serializes plain dicts and lists to json. Without indent the json has
+    no whitespace and is serialized with orjson if it is installed."""
+    if indent is not None:
+        return json.dumps(o, indent=indent)
+    orjson = _orjson()
+    if orjson is not None:
+        return orjson.dumps(o).decode("utf8")
+    return json.dumps(o, separators=(",", ":"))
 
 
 class OpenThreatModelEncoder(json.JSONEncoder):
     def default(self, o: Any) -> Any:
+        if isinstance(o, BaseOpenThreatModel):
+            return o.to_dict()
         if isinstance(o, set):
             return list(o)
         return o.__dict__
 
 
 class BaseOpenThreatModel(ABC):
-    def to_json(self, indent: int = 4) -> str:
-        return json.dumps(self, indent=indent, cls=OpenThreatModelEncoder)
+    @abstractmethod
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns the json structure of plain dicts and lists"""
+        pass
+
+    def to_json(self, indent: Optional[int] = 4) -> str:
+        return dumps(self.to_dict(), indent=indent)
 
     def __str__(self) -> str:
         return self.to_json(indent=4)
@@ -34,9 +88,20 @@ class OpenThreatModelProject(BaseOpenThreatModel):
         self.description = description
         self.owner = owner
         self.ownerContact = owner_contact
-        self.tags = set(tags)
+        self.tags = _unique(tags)
         self.attributes = attributes
 
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "id": self.id,
+            "description": self.description,
+            "owner": self.owner,
+            "ownerContact": self.ownerContact,
+            "tags": self.tags,
+            "attributes": self.attributes,
+        }
+
 
 class OpenThreatModelAsset(BaseOpenThreatModel):
     def __init__(
@@ -53,6 +118,15 @@ class OpenThreatModelAsset(BaseOpenThreatModel):
         self.risk = risk
         self.attributes = attributes
 
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "description": self.description,
+            "risk": self.risk.to_dict(),
+            "attributes": self.attributes,
+        }
+
 
 class OpenThreatModelAssetRisk(BaseOpenThreatModel):
     def __init__(
@@ -63,6 +137,41 @@ class OpenThreatModelAssetRisk(BaseOpenThreatModel):
         self.availability = availability
         self.comment = comment
 
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "confidentiality": int(self.confidentiality),
+            "integrity": int(self.integrity),
+            "availability": int(self.availability),
+            "comment": self.comment,
+        }
+
+
+class OpenThreatModelTrustZone(BaseOpenThreatModel):
+    def __init__(
+        self,
+        id: str,
+        name: str,
+        description: str = "",
+        parent: Optional[str] = None,
+        attributes: Dict[str, str] = dict(),
+    ) -> None:
+        self.id = id
+        self.name = name
+        self.description = description
+        self.parent = parent
+        self.attributes = attributes
+
+    def to_dict(self) -> Dict[str, Any]:
+        d: Dict[str, Any] = {
+            "id": self.id,
+            "name": self.name,
+            "description": self.description,
+        }
+        if self.parent is not None:
+            d["parent"] = {"trustZone": self.parent}
+        d["attributes"] = self.attributes
+        return d
+
 
 class OpenThreatModelComponent(BaseOpenThreatModel):
     def __init__(
@@ -72,15 +181,30 @@ class OpenThreatModelComponent(BaseOpenThreatModel):
         type: str,
         tags: List[str] = list(),
         description: str = "",
+        parent: Optional[str] = None,
         attributes: Dict[str, str] = dict(),
     ) -> None:
         self.id = id
         self.name = name
         self.type = type
-        self.tags = set(tags)
+        self.tags = _unique(tags)
         self.description = description
+        self.parent = parent
         self.attributes = attributes
 
+    def to_dict(self) -> Dict[str, Any]:
+        d: Dict[str, Any] = {
+            "id": self.id,
+            "name": self.name,
+            "type": self.type,
+            "tags": self.tags,
+            "description": self.description,
+        }
+        if self.parent is not None:
+            d["parent"] = {"trustZone": self.parent}
+        d["attributes"] = self.attributes
+        return d
+
 
 class OpenThreatModelDataFlow(BaseOpenThreatModel):
     def __init__(
@@ -103,10 +227,24 @@ class OpenThreatModelDataFlow(BaseOpenThreatModel):
         self.bidirectional = bidirectional
         self.source = source
         self.destination = destination
-        self.assets = set(assets)
-        self.threats = set(threats)
+        self.assets = _unique(assets)
+        self.threats = _unique(threats, key=lambda t: t.threat)
         self.attributes = attributes
 
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "description": self.description,
+            "tags": self.tags,
+            "bidirectional": self.bidirectional,
+            "source": self.source,
+            "destination": self.destination,
+            "assets": self.assets,
+            "threats": [t.to_dict() for t in self.threats],
+            "attributes": self.attributes,
+        }
+
 
 class OpenThreatModelThreatRisk(BaseOpenThreatModel):
     def __init__(
@@ -121,6 +259,14 @@ class OpenThreatModelThreatRisk(BaseOpenThreatModel):
         self.likelihoodComment = likelihood_comment
         self.impactComment = impact_comment
 
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "likelihood": int(self.likelihood),
+            "impact": int(self.impact),
+            "likelihoodComment": self.likelihoodComment,
+            "impactComment": self.impactComment,
+        }
+
 
 class OpenThreatModelThreat(BaseOpenThreatModel):
     def __init__(
@@ -135,23 +281,36 @@ class OpenThreatModelThreat(BaseOpenThreatModel):
         self.id = id
         self.name = name
         self.description = description
-        self.categories = set(categories)
-        self.cwes = set(cwes)
+        self.categories = _unique(categories)
+        self.cwes = _unique(cwes)
         self.attributes = attributes
 
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "description": self.description,
+            "categories": self.categories,
+            "cwes": self.cwes,
+            "attributes": self.attributes,
+        }
+
 
 class OpenThreatModelThreatInstance(BaseOpenThreatModel):
     def __init__(self, threat: str, state: str) -> None:
         self.threat = threat
         self.state = state
 
+    def to_dict(self) -> Dict[str, Any]:
+        return {"threat": self.threat, "state": self.state}
+
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, OpenThreatModelThreatInstance):
             return False
         return self.threat == other.threat
 
     def __hash__(self) -> int:
-        return id(self.threat)
+        return hash(self.threat)
 
 
 class OpenThreatModelMitigation(BaseOpenThreatModel):
@@ -169,19 +328,31 @@ class OpenThreatModelMitigation(BaseOpenThreatModel):
         self.riskReduction = risk_reduction
         self.attributes = attributes
 
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "description": self.description,
+            "riskReduction": int(self.riskReduction),
+            "attributes": self.attributes,
+        }
+
 
 class OpenThreatModelMigrationInstance(BaseOpenThreatModel):
     def __init__(self, mitigation: str, state: str) -> None:
         self.mitigation = mitigation
         self.state = state
 
+    def to_dict(self) -> Dict[str, Any]:
+        return {"mitigation": self.mitigation, "state": self.state}
+
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, OpenThreatModelMigrationInstance):
             return False
         return self.mitigation == other.mitigation
 
     def __hash__(self) -> int:
-        return id(self.mitigation)
+        return hash(self.mitigation)
 
 
 class OpenThreatModel(BaseOpenThreatModel):
@@ -189,15 +360,84 @@ class OpenThreatModel(BaseOpenThreatModel):
         self,
         project: "OpenThreatModelProject",
         assets: List["OpenThreatModelAsset"] = list(),
+        trust_zones: List["OpenThreatModelTrustZone"] = list(),
         components: List["OpenThreatModelComponent"] = list(),
         data_flows: List["OpenThreatModelDataFlow"] = list(),
         threats: List["OpenThreatModelThreat"] = list(),
         mitigations: List["OpenThreatModelMitigation"] = list(),
     ) -> None:
-        self.otmVersion = "0.1.0"
+        self.otmVersion = OTM_VERSION
         self.project = project
-        self.assets = set(assets)
-        self.components = set(components)
-        self.dataflows = set(data_flows)
-        self.threats = set(threats)
-        self.mitigations = set(mitigations)
+        self.assets = list(assets)
+        self.trustZones = list(trust_zones)
+        self.components = list(components)
+        self.dataflows = list(data_flows)
+        self.threats = list(threats)
+        self.mitigations = list(mitigations)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "otmVersion": self.otmVersion,
+            "project": self.project.to_dict(),
+            "assets": [a.to_dict() for a in self.assets],
+            "trustZones": [tz.to_dict() for tz in self.trustZones],
+            "components": [c.to_dict() for c in self.components],
+            "dataflows": [df.to_dict() for df in self.dataflows],
+            "threats": [t.to_dict() for t in self.threats],
+            "mitigations": [m.to_dict() for m in self.mitigations],
+        }
+
+
+def write_otm(
+    fp: TextIO,
+    project: "OpenThreatModelProject",
+    *,
+    assets: Iterable["OpenThreatModelAsset"] = (),
+    trust_zones: Iterable["OpenThreatModelTrustZone"] = (),
+    components: Iterable["OpenThreatModelComponent"] = (),
+    data_flows: Iterable["OpenThreatModelDataFlow"] = (),
+    threats: Iterable["OpenThreatModelThreat"] = (),
+    mitigations: Iterable["OpenThreatModelMitigation"] = (),
+    indent: Optional[int] = 4,
+) -> None:
+    """Writes an OpenThreatModel document item by item, so only one item is
+    held in memory. The document is the same as OpenThreatModel.to_json,
+    with indent None it is written without whitespace."""
+    fields: List[Tuple[str, Any]] = [
+        ("otmVersion", OTM_VERSION),
+        ("project", project),
+        ("assets", iter(assets)),
+        ("trustZones", iter(trust_zones)),
+        ("components", iter(components)),
+        ("dataflows", iter(data_flows)),
+        ("threats", iter(threats)),
+        ("mitigations", iter(mitigations)),
+    ]
+
+    key_separator = ":" if indent is None else ": "
+
+    def newline(level: int) -> str:
+        return "" if indent is None else "\n" + " " * indent * level
+
+    def encode(o: Any, level: int) -> str:
+        if isinstance(o, BaseOpenThreatModel):
+            o = o.to_dict()
+        # nested lines are indented to the level of the value
+        return dumps(o, indent=indent).replace("\n", newline(level))
+
+    fp.write("{")
+    for i, (key, value) in enumerate(fields):
+        if i > 0:
+            fp.write(",")
+        fp.write(newline(1) + json.dumps(key) + key_separator)
+
+        if not isinstance(value, Iterator):
+            fp.write(encode(value, 1))
+            continue
+
+        empty = True
+        for item in value:
+            fp.write(("[" if empty else ",") + newline(2) + encode(item, 2))
+            empty = False
+        fp.write("[]" if empty else newline(1) + "]")
+    fp.write(newline(0) + "}")
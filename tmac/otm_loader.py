@@ -0,0 +1,236 @@
+"""Rebuilds a Model from an OpenThreatModel document.
+
+Elements keep the ids of the document and are constructed directly in the
+scope of the model or of their source component, so neither unique ids nor
+model lookups are needed per element.
+"""
+import gzip
+import io
+import json
+import os
+from enum import Enum
+from typing import IO, TYPE_CHECKING, Any, Dict, Optional, Set, Type, TypeVar, Union
+
+from .asset import Asset
+from .component import (
+    Component,
+    DataFormat,
+    DataStore,
+    Encryption,
+    ExternalEntity,
+    Machine,
+    Process,
+    Technology,
+)
+from .data_flow import Authentication, Authorization, DataFlow, Protocol
+from .score import Score
+from .trust_boundary import TrustBoundary
+
+if TYPE_CHECKING:
+    from .model import Model
+
+E = TypeVar("E", bound=Enum)
+T = TypeVar("T")
+
+CLIENT_TECHNOLOGIES = frozenset(
+    [
+        Technology.BROWSER,
+        Technology.DESKTOP,
+        Technology.MOBILE_APP,
+        Technology.WEB_UI,
+    ]
+)
+
+DATA_STORE_TECHNOLOGIES = frozenset(
+    [
+        Technology.DATABASE,
+        Technology.FILE_SERVER,
+        Technology.LOCAL_FILE_SYSTEM,
+    ]
+)
+
+DATA_FORMATS = {str(f): f for f in DataFormat}
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+def read_document(fp: Union[str, "os.PathLike[str]", IO[Any]]) -> Dict[str, Any]:
+    """Reads a json document from a path or file object, gzip compressed
+    documents are detected and decompressed."""
+    if isinstance(fp, (str, os.PathLike)):
+        with open(fp, "rb") as f:
+            return read_document(f)
+
+    if isinstance(fp, io.TextIOBase):
+        return json.load(fp)
+
+    data = fp.read()
+    if data[:2] == GZIP_MAGIC:
+        data = gzip.decompress(data)
+    return json.loads(data)
+
+
+def _enum(cls: Type[E], value: Optional[str], default: E) -> E:
+    try:
+        return cls(value)
+    except ValueError:
+        return default
+
+
+def _bool(value: Optional[str]) -> bool:
+    return value is not None and str(value).lower() == "true"
+
+
+def _parent(element: Dict[str, Any]) -> Optional[str]:
+    parent = element.get("parent") or {}
+    return parent.get("trustZone")
+
+
+def _lookup(elements: Dict[str, T], id: str, kind: str) -> T:
+    try:
+        return elements[id]
+    except KeyError:
+        raise ValueError(f"Unknown {kind}: {id}") from None
+
+
+def load_model(document: Dict[str, Any], **kwargs: Any) -> "Model":
+    """Creates a model of the project, trust zones, components, dataflows and
+    assets of an OpenThreatModel document. Threats and mitigations are not
+    imported, they are evaluated by the threat library of the model."""
+    from .model import Model
+
+    project = document.get("project", {})
+    model = Model(
+        project.get("name", ""),
+        id=project.get("id") or None,
+        description=project.get("description", ""),
+        owner=project.get("owner", ""),
+        owner_contact=project.get("ownerContact", ""),
+        **kwargs,
+    )
+    model.add_tags(*project.get("tags", []))
+
+    ids: Set[str] = set()
+
+    def element_id(element: Dict[str, Any]) -> str:
+        id = element["id"]
+        if id in ids:
+            raise ValueError(f"Duplicate id: {id}")
+        ids.add(id)
+        return id
+
+    with model._bulk_construction():
+        trust_boundaries: Dict[str, "TrustBoundary"] = dict()
+        for zone in document.get("trustZones", []):
+            tb = TrustBoundary(
+                model,
+                zone.get("name", ""),
+                description=zone.get("description", ""),
+                id=element_id(zone),
+            )
+            trust_boundaries[tb.id] = tb
+
+        # parents are assigned once all zones exist, they may be listed in any order
+        for zone in document.get("trustZones", []):
+            parent = _parent(zone)
+            if parent is not None:
+                trust_boundaries[zone["id"]].trust_boundary = _lookup(
+                    trust_boundaries, parent, "trust zone"
+                )
+
+        assets: Dict[str, "Asset"] = dict()
+        for otm_asset in document.get("assets", []):
+            risk = otm_asset.get("risk", {})
+            attributes = otm_asset.get("attributes") or {}
+            asset = Asset(
+                model,
+                otm_asset.get("name", ""),
+                confidentiality=Score(int(risk.get("confidentiality", 0))),
+                integrity=Score(int(risk.get("integrity", 0))),
+                availability=Score(int(risk.get("availability", 0))),
+                description=otm_asset.get("description", ""),
+                is_pii=_bool(attributes.get("is_pii")),
+                id=element_id(otm_asset),
+            )
+            assets[asset.id] = asset
+
+        components: Dict[str, "Component"] = dict()
+        for otm_component in document.get("components", []):
+            attributes = otm_component.get("attributes") or {}
+
+            technology = _enum(
+                Technology, otm_component.get("type"), Technology.UNKNOWN
+            )
+            if technology == Technology.UNKNOWN:
+                technology = _enum(
+                    Technology, attributes.get("technologie"), Technology.UNKNOWN
+                )
+
+            cls: Type["Component"] = Process
+            if technology in CLIENT_TECHNOLOGIES:
+                cls = ExternalEntity
+            elif technology in DATA_STORE_TECHNOLOGIES:
+                cls = DataStore
+
+            parent = _parent(otm_component)
+            component = cls(
+                model,
+                otm_component.get("name", ""),
+                id=element_id(otm_component),
+                technology=technology,
+                machine=Machine(attributes.get("machine", Machine.UNKNOWN)),
+                description=otm_component.get("description", ""),
+                vendor=attributes.get("vendor", ""),
+                trust_boundary=(
+                    None
+                    if parent is None
+                    else _lookup(trust_boundaries, parent, "trust zone")
+                ),
+                human_use=_bool(attributes.get("human_use")),
+                encryption=_enum(
+                    Encryption, attributes.get("encryption"), Encryption.NONE
+                ),
+                multi_tenant=_bool(attributes.get("multi_tenant")),
+                redundant=_bool(attributes.get("redundant")),
+                custom_developed_parts=_bool(attributes.get("custom_developed_parts")),
+                accepts_data_formats=[
+                    DATA_FORMATS[f]
+                    for f in attributes.get("accepts_data_formats", "").split(",")
+                    if f in DATA_FORMATS
+                ],
+            )
+            if cls is not ExternalEntity and "out_of_scope" in attributes:
+                component.out_of_scope = _bool(attributes["out_of_scope"])
+            component.add_tags(*otm_component.get("tags", []))
+            components[component.id] = component
+
+        for otm_data_flow in document.get("dataflows", []):
+            attributes = otm_data_flow.get("attributes") or {}
+            source = _lookup(components, otm_data_flow["source"], "component")
+            data_flow = DataFlow(
+                source,
+                otm_data_flow.get("name", ""),
+                id=element_id(otm_data_flow),
+                source=source,
+                destination=_lookup(
+                    components, otm_data_flow["destination"], "component"
+                ),
+                protocol=_enum(Protocol, attributes.get("protocol"), Protocol.UNKNOEN),
+                description=otm_data_flow.get("description", ""),
+                vpn=_bool(attributes.get("vpn")),
+                readonly=_bool(attributes.get("readonly")),
+                bidirectional=bool(otm_data_flow.get("bidirectional", False)),
+                authentication=_enum(
+                    Authentication,
+                    attributes.get("authentication"),
+                    Authentication.NONE,
+                ),
+                authorization=_enum(
+                    Authorization, attributes.get("authorization"), Authorization.NONE
+                ),
+            )
+            data_flow.add_tags(*otm_data_flow.get("tags", []))
+            for asset_id in otm_data_flow.get("assets", []):
+                data_flow.transfers(_lookup(assets, asset_id, "asset"))
+
+    return model
@@ -0,0 +1,153 @@
+"""Parallel evaluation of component threats in a thread or process pool.
+
+Components are partitioned into chunks that are evaluated by the workers.
+Process workers get their own copy of the model (inherited when the platform
+supports fork) and send back the threat id and flow of every risk, the risks
+are rebuilt in the evaluating process. Results are merged in the order of the
+components, so ids and ordering match the serial evaluation.
+"""
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+
+from .risk import ComponentRisk
+
+if TYPE_CHECKING:
+    from multiprocessing.context import BaseContext
+
+    from .component import Component
+    from .model import Model
+    from .risk import Risk
+    from .threat import BaseThreat
+
+# per applied threat its id and the index of the data flow (in model.data_flows)
+# of each of its risks
+EncodedThreat = Tuple[str, List[Optional[int]]]
+
+_worker_model: Optional["Model"] = None
+
+
+def _init_worker(model: "Model") -> None:
+    global _worker_model
+    _worker_model = model
+
+
+def _evaluate_chunk(indices: Sequence[int]) -> List[Tuple[int, List[EncodedThreat]]]:
+    model = _worker_model
+    assert model is not None
+
+    components = model.components
+    flow_index = {f: i for i, f in enumerate(model.data_flows)}
+
+    result: List[Tuple[int, List[EncodedThreat]]] = list()
+    for i in indices:
+        c = components[i]
+        applied: List[EncodedThreat] = list()
+        for threat, risks in model.threat_library.apply_threats(model, c):
+            encoded: List[Optional[int]] = list()
+            for risk in risks:
+                if (
+                    type(risk) is not ComponentRisk
+                    or risk._threat is not threat
+                    or risk.component is not c
+                ):
+                    raise TypeError(
+                        f"Risks of {threat.id} cannot be evaluated in a process "
+                        "pool, use executor='thread'"
+                    )
+                data_flow = risk.data_flow
+                encoded.append(None if data_flow is None else flow_index[data_flow])
+            applied.append((threat.id, encoded))
+        result.append((i, applied))
+
+    return result
+
+
+def _create_executor(model: "Model", workers: int, executor: str) -> "Executor":
+    if executor == "thread":
+        return ThreadPoolExecutor(max_workers=workers)
+
+    if executor == "process":
+        # with fork the workers inherit the model instead of unpickling it
+        context: "BaseContext"
+        if "fork" in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context("fork")
+        else:  # pragma: no cover
+            context = multiprocessing.get_context()
+
+        return ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(model,),
+        )
+
+    raise ValueError(f"Unknown executor: {executor}")
+
+
+def _chunks(indices: Sequence[int], workers: int) -> List[Sequence[int]]:
+    # a few chunks per worker to balance uneven components
+    size = max(1, -(-len(indices) // (workers * 4)))
+    return [indices[i : i + size] for i in range(0, len(indices), size)]
+
+
+def evaluate_components(
+    model: "Model",
+    components: Sequence["Component"],
+    *,
+    workers: int,
+    executor: str = "process",
+) -> Dict["Component", List["Risk"]]:
+    """Applies the threat library to the components in parallel. Returns the
+    risks of each component in the order of the components; treatments are not
+    updated."""
+    library = model.threat_library
+    all_components = model.components
+    position = {c: i for i, c in enumerate(all_components)}
+    indices = [position[c] for c in components]
+
+    # build lazily created state before the workers share or copy it
+    library.dispatch_index
+
+    applied: Dict[int, List[Tuple["BaseThreat", List["Risk"]]]] = dict()
+
+    with _create_executor(model, workers, executor) as pool:
+        if isinstance(pool, ThreadPoolExecutor):
+
+            def evaluate(chunk: Sequence[int]) -> None:
+                for i in chunk:
+                    applied[i] = library.apply_threats(model, all_components[i])
+
+            for _ in pool.map(evaluate, _chunks(indices, workers)):
+                pass
+        else:
+            flows = model.data_flows
+            for chunk_result in pool.map(_evaluate_chunk, _chunks(indices, workers)):
+                for i, threats in chunk_result:
+                    c = all_components[i]
+                    applied[i] = [
+                        (
+                            library[threat_id],
+                            [
+                                ComponentRisk(
+                                    library[threat_id],
+                                    model=model,
+                                    component=c,
+                                    data_flow=None if j is None else flows[j],
+                                )
+                                for j in flow_indices
+                            ],
+                        )
+                        for threat_id, flow_indices in threats
+                    ]
+
+    result: Dict["Component", List["Risk"]] = dict()
+    for c, i in zip(components, indices):
+        risks: List["Risk"] = list()
+        for _, threat_risks in applied[i]:
+            if library.after_apply_hook is not None:
+                library.after_apply_hook(threat_risks)
+            risks.extend(threat_risks)
+        result[c] = risks
+
+    return result
@@ -1,12 +1,12 @@
 from typing import Any
 
-from diagrams.onprem import client
-
 from ..component import ExternalEntity, Machine, Encryption, Technology
 from ..node import Construct
 
 
 class Browser(ExternalEntity):
+    __slots__ = ()
+
     def __init__(self, scope: Construct, name: str, **kwargs: Any):
         super().__init__(scope, name,
                          machine=Machine.PHYSICAL,
@@ -1,7 +1,4 @@
 from typing import Any
-from diagrams.onprem import database
-from diagrams.generic.database import SQL
-from diagrams.generic.storage import Storage
 
 from ..component import DataStore, Technology
 from ..diagram import DiagramNode
@@ -9,6 +6,8 @@ from ..node import Construct
 
 
 class Database(DataStore):
+    __slots__ = ()
+
     def __init__(self, scope: Construct, name: str, **kwargs: Any):
         super().__init__(
             scope,
@@ -19,10 +18,15 @@ class Database(DataStore):
 
     @property
     def diagram_node(self) -> "DiagramNode":
+        from diagrams.generic.database import SQL
+        from diagrams.onprem import database
+
         return DiagramNode.from_type(self.id, self.name, node_type=getattr(database, self.vendor, SQL))
 
 
 class FileServer(DataStore):
+    __slots__ = ()
+
     def __init__(self, scope: Construct, name: str, **kwargs: Any):
         super().__init__(
             scope,
@@ -33,4 +37,6 @@ class FileServer(DataStore):
     
     @property
     def diagram_node(self) -> "DiagramNode":
+        from diagrams.generic.storage import Storage
+
         return DiagramNode.from_type(self.id, self.name, node_type=Storage)
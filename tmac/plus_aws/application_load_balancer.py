@@ -1,5 +1,4 @@
 from typing import Any
-from diagrams.aws.network import ElbApplicationLoadBalancer
 
 from ..component import Process, Machine, Encryption, Technology
 from ..diagram import DiagramNode
@@ -7,6 +6,8 @@ from ..node import Construct
 
 
 class ApplicationLoadBalancer(Process):
+    __slots__ = ()
+
     def __init__(self, scope: Construct, name: str, waf: bool = False, **kwargs: Any):
         super().__init__(scope, name,
                          machine=Machine.VIRTUAL,
@@ -21,5 +22,7 @@ class ApplicationLoadBalancer(Process):
 
     @property
     def diagram_node(self) -> "DiagramNode":
+        from diagrams.aws.network import ElbApplicationLoadBalancer
+
         return DiagramNode.from_type(self.id, self.name, node_type=ElbApplicationLoadBalancer)
 
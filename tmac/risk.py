@@ -1,8 +1,7 @@
 from abc import ABC, abstractproperty
-from typing import TYPE_CHECKING, List, Optional, Set, cast
-
-from jinja2 import Template
+from typing import TYPE_CHECKING, Any, List, Optional, Tuple, cast
 
+from .template import render_template
 from .threat import ComponentThreat, ModelThreat
 from .user_story import ComponentUserStory, ModelUserStory, UserStory
 
@@ -13,12 +12,22 @@ if TYPE_CHECKING:
     from .threat import BaseThreat, Category
 
 class RiskTreatment:
+    __slots__ = ("state", "ticket", "comment")
+
     def __init__(self, state: str, *, ticket: str = "", comment: str = "") -> None:
         self.state = state
         self.ticket = ticket
         self.comment = comment
 
 class Risk(ABC):
+    __slots__ = (
+        "_threat",
+        "_model",
+        "_treatment",
+        "_user_stories",
+        "_user_stories_key",
+    )
+
     def __init__(
         self,
         threat: "BaseThreat",
@@ -28,6 +37,11 @@ class Risk(ABC):
         self._model = model
         self._treatment = RiskTreatment("unchecked")
 
+        # materialized user stories and the template repository version they
+        # were created from, dropped when the treatment state changes
+        self._user_stories: Optional[List["UserStory[Risk]"]] = None
+        self._user_stories_key: Optional[Tuple[Any, int]] = None
+
     @abstractproperty
     def id(self) -> str:
         pass
@@ -36,9 +50,34 @@ class Risk(ABC):
     def text(self) -> str:
         pass
 
-    @abstractproperty
+    @property
     def user_stories(self) -> List["UserStory[Risk]"]:
-        pass
+        repository = self._model.user_story_template_repository
+        if self._user_stories is None or self._user_stories_key != (
+            repository,
+            repository.version,
+        ):
+            stories = self._create_user_stories()
+            if stories is NotImplemented:
+                return stories
+
+            self._user_stories = stories
+            self._user_stories_key = (repository, repository.version)
+            self._model._register_user_stories(stories)
+
+        return list(self._user_stories)
+
+    def _create_user_stories(self) -> List["UserStory[Risk]"]:
+        return []
+
+    def _apply_state(self, user_story: "UserStory[Any]") -> None:
+        new_state = self._model.get_state_by_id(user_story.id)
+        if new_state is not None:
+            user_story.update_state(
+                state=new_state.state,
+                ticket=new_state.ticket,
+                comment=new_state.comment,
+            )
 
     @property
     def name(self) -> str:
@@ -75,19 +114,25 @@ class Risk(ABC):
         if self._treatment.state != "unchecked":
             return self._treatment
         
-        if all(story.state in ["closed"] for story in self.user_stories):
+        user_stories = self.user_stories
+
+        if all(story.state in ["closed"] for story in user_stories):
             return RiskTreatment("mitigated", comment="All user stories are closed")
 
-        if any(story.state != "draft" for story in self.user_stories):
+        if any(story.state != "draft" for story in user_stories):
             return RiskTreatment("in-progress")
 
         return self._treatment
 
     def update_treatment(self, state: str, *, ticket: str = "", comment: str = "") -> None:
+        if state != self._treatment.state:
+            self._user_stories = None
         self._treatment = RiskTreatment(state, ticket=ticket, comment=comment)
 
 
 class ComponentRisk(Risk):
+    __slots__ = ("_component", "_data_flow")
+
     def __init__(
         self,
         threat: "BaseThreat",
@@ -109,8 +154,11 @@ class ComponentRisk(Risk):
 
     @property
     def text(self) -> str:
-        return Template(self._threat.risk_text).render(
-            component=self._component, data_flow=self._data_flow, model=self._model
+        return render_template(
+            self._threat.risk_text,
+            component=self._component,
+            data_flow=self._data_flow,
+            model=self._model,
         )
 
     @property
@@ -121,34 +169,27 @@ class ComponentRisk(Risk):
     def data_flow(self) -> Optional["DataFlow"]:
         return self._data_flow
 
-    @property
-    def user_stories(self) -> List["UserStory[Risk]"]:
+    def _create_user_stories(self) -> List["UserStory[Risk]"]:
         if self._treatment.state in ["accepted", "transferred", "n/a", "mitigated"]:
             return []
 
-        stories: Set["ComponentUserStory"] = set()
         if isinstance(self._threat, ComponentThreat):
+            stories: List["ComponentUserStory"] = list()
             for tpl in self._threat.get_user_story_templates(
                 self._model.user_story_template_repository, self._component
             ):
                 id = f"{tpl.id}@{self.id}"
                 user_story = ComponentUserStory(id=id, template=tpl, risk=self)
-
-                new_state = self._model.get_state_by_id(id)
-                if new_state is not None:
-                    user_story.update_state(
-                        state=new_state.state,
-                        ticket=new_state.ticket,
-                        comment=new_state.comment,
-                    )
-
-                stories.add(user_story)
-            return cast(List["UserStory[Risk]"], list(stories))
+                self._apply_state(user_story)
+                stories.append(user_story)
+            return cast(List["UserStory[Risk]"], stories)
 
         return NotImplemented
 
 
 class ModelRisk(Risk):
+    __slots__ = ()
+
     def __init__(
         self,
         threat: "BaseThreat",
@@ -162,28 +203,18 @@ class ModelRisk(Risk):
 
     @property
     def text(self) -> str:
-        return Template(self._threat.risk_text).render(model=self._model)
-
-    @property
-    def user_stories(self) -> List["UserStory[Risk]"]:
-        stories: Set["ModelUserStory"] = set()
+        return render_template(self._threat.risk_text, model=self._model)
 
+    def _create_user_stories(self) -> List["UserStory[Risk]"]:
         if isinstance(self._threat, ModelThreat):
+            stories: List["ModelUserStory"] = list()
             for tpl in self._threat.get_user_story_templates(
                 self._model.user_story_template_repository
             ):
                 id = f"{tpl.id}@{self.id}"
                 user_story = ModelUserStory(id=id, template=tpl, risk=self)
-
-                new_state = self._model.get_state_by_id(id)
-                if new_state is not None:
-                    user_story.update_state(
-                        state=new_state.state,
-                        ticket=new_state.ticket,
-                        comment=new_state.comment,
-                    )
-
-                stories.add(user_story)
-            return cast(List["UserStory[Risk]"], list(stories))
+                self._apply_state(user_story)
+                stories.append(user_story)
+            return cast(List["UserStory[Risk]"], stories)
 
         return NotImplemented
@@ -0,0 +1,196 @@
+"""Immutable results of one evaluation of a model.
+
+A snapshot holds the rendered texts, treatments and user stories of all risks,
+so exporters can share it instead of deriving them from the live model again.
+"""
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Dict, Mapping, Optional, Tuple
+
+from .risk import RiskTreatment
+
+if TYPE_CHECKING:
+    from .model import Model
+    from .risk import Risk
+    from .threat import Category
+    from .user_story import UserStory
+
+
+class UserStorySnapshot:
+    def __init__(self, story: "UserStory[Risk]", risk_id: str) -> None:
+        self._id = story.id
+        self._risk_id = risk_id
+        self._category = story.category
+        self._sub_category = story.sub_category
+        self._feature_name = story.feature_name
+        self._description = story.description
+        self._text = story.text
+        self._state = story.state
+        self._ticket = story.ticket
+        self._comment = story.comment
+        self._scenarios = MappingProxyType(dict(story.scenarios))
+        self._references = tuple(story.references)
+
+    @property
+    def id(self) -> str:
+        return self._id
+
+    @property
+    def risk_id(self) -> str:
+        return self._risk_id
+
+    @property
+    def category(self) -> str:
+        return self._category
+
+    @property
+    def sub_category(self) -> str:
+        return self._sub_category
+
+    @property
+    def feature_name(self) -> str:
+        return self._feature_name
+
+    @property
+    def description(self) -> str:
+        return self._description
+
+    @property
+    def text(self) -> str:
+        return self._text
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    @property
+    def ticket(self) -> str:
+        return self._ticket
+
+    @property
+    def comment(self) -> str:
+        return self._comment
+
+    @property
+    def scenarios(self) -> Mapping[str, str]:
+        return self._scenarios
+
+    @property
+    def references(self) -> Tuple[str, ...]:
+        return self._references
+
+
+class RiskSnapshot:
+    def __init__(self, risk: "Risk") -> None:
+        self._id = risk.id
+        self._name = risk.name
+        self._category = risk.category
+        self._description = risk.description
+        self._prerequisites = tuple(risk.prerequisites)
+        self._text = risk.text
+        self._references = tuple(risk.references)
+        self._user_stories = tuple(
+            UserStorySnapshot(story, self._id) for story in risk.user_stories
+        )
+
+        # copied, the treatment of the risk may be updated later
+        treatment = risk.treatment
+        self._treatment = RiskTreatment(
+            treatment.state, ticket=treatment.ticket, comment=treatment.comment
+        )
+
+    @property
+    def id(self) -> str:
+        return self._id
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def category(self) -> "Category":
+        return self._category
+
+    @property
+    def description(self) -> str:
+        return self._description
+
+    @property
+    def prerequisites(self) -> Tuple[str, ...]:
+        return self._prerequisites
+
+    @property
+    def text(self) -> str:
+        return self._text
+
+    @property
+    def treatment(self) -> "RiskTreatment":
+        return self._treatment
+
+    @property
+    def references(self) -> Tuple[str, ...]:
+        return self._references
+
+    @property
+    def user_stories(self) -> Tuple["UserStorySnapshot", ...]:
+        return self._user_stories
+
+
+class ModelSnapshot:
+    """Risks and user stories of one evaluation, in the order of the model"""
+
+    def __init__(self, model: "Model") -> None:
+        self._name = model.name
+        self._description = model.description
+        self._generation = model.generation
+        self._risks = tuple(RiskSnapshot(risk) for risk in model.risks)
+
+        user_stories: Dict[str, "UserStorySnapshot"] = dict()
+        for risk in self._risks:
+            for story in risk.user_stories:
+                user_stories.setdefault(story.id, story)
+        self._user_stories = tuple(user_stories.values())
+
+        self._risks_by_id = MappingProxyType({r.id: r for r in self._risks})
+        self._user_stories_by_id = MappingProxyType(user_stories)
+        self._user_stories_by_risk = MappingProxyType(
+            {r.id: r.user_stories for r in self._risks}
+        )
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def description(self) -> str:
+        return self._description
+
+    @property
+    def generation(self) -> int:
+        """Generation of the model that was evaluated"""
+        return self._generation
+
+    @property
+    def risks(self) -> Tuple["RiskSnapshot", ...]:
+        return self._risks
+
+    @property
+    def user_stories(self) -> Tuple["UserStorySnapshot", ...]:
+        return self._user_stories
+
+    @property
+    def risks_by_id(self) -> Mapping[str, "RiskSnapshot"]:
+        return self._risks_by_id
+
+    @property
+    def user_stories_by_id(self) -> Mapping[str, "UserStorySnapshot"]:
+        return self._user_stories_by_id
+
+    @property
+    def user_stories_by_risk(self) -> Mapping[str, Tuple["UserStorySnapshot", ...]]:
+        return self._user_stories_by_risk
+
+    def get_risk_by_id(self, id: str) -> Optional["RiskSnapshot"]:
+        return self._risks_by_id.get(id)
+
+    def get_user_story_by_id(self, id: str) -> Optional["UserStorySnapshot"]:
+        return self._user_stories_by_id.get(id)
@@ -1,16 +1,29 @@
-from typing import List, Set
+from typing import List, Optional, Set
 
 class TagMixin:
+    # classes using the mixin declare the _tags slot themselves, a non-empty
+    # layout here would conflict with the slots of their base class
+    __slots__ = ()
+
     def __init__(self) -> None:
-        self._tags: Set[str] = set()
+        # allocated with the first tag, most elements have none
+        self._tags: Optional[Set[str]] = None  # type: ignore[misc]
 
     @property
     def tags(self) -> List[str]:
+        if self._tags is None:
+            return []
         return list(self._tags)
 
     def add_tags(self, *tags: str) -> None:
+        if self._tags is None:
+            self._tags = set()  # type: ignore[misc]
         for tag in tags:
             self._tags.add(tag)
+        self._tags_changed()
+
+    def _tags_changed(self) -> None:
+        pass
 
     def has_tag(self, tag: str) -> bool:
-        return tag in self._tags
+        return self._tags is not None and tag in self._tags
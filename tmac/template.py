@@ -0,0 +1,37 @@
+import os
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any
+
+# jinja2 is imported on first use to keep `import tmac` cheap
+if TYPE_CHECKING:
+    from jinja2 import Environment, Template
+
+
+@lru_cache(maxsize=None)
+def _environment() -> "Environment":
+    from jinja2 import Environment
+
+    return Environment()
+
+
+@lru_cache(maxsize=1024)
+def compile_template(source: str) -> "Template":
+    """Compiles a template source once and reuses it for every render"""
+    return _environment().from_string(source)
+
+
+def render_template(source: str, **context: Any) -> str:
+    return compile_template(source).render(**context)
+
+
+def load_template(path: str) -> "Template":
+    """Compiles a template file once per process, it is compiled again when
+    the file is modified"""
+    path = os.path.abspath(path)
+    return _load_template(path, os.stat(path).st_mtime_ns)
+
+
+@lru_cache(maxsize=32)
+def _load_template(path: str, mtime_ns: int) -> "Template":
+    with open(path, "r", encoding="utf8") as f:
+        return _environment().from_string(f.read())
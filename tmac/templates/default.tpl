@@ -7,19 +7,19 @@
 ## Potential Risks
 |ID|Category|Risk|Treatment|
 |---|---|---|---|
-{% for risk in model.risks -%}
+{% for risk in risks -%}
 |[{{ risk.id }}](#{{ risk.id|lower|replace("@", "")|replace(".", "") }})|{{ risk.category }}|{{ risk.text }}|{{ risk.treatment.state }}|
 {% endfor %}
 
 ## User Stories
 |ID|Category|User Story|State|
 |---|---|---|---|
-{% for story in model.user_stories -%}
+{% for story in user_stories -%}
 |[{{ story.id }}](#{{ story.id|lower|replace("@", "")|replace(".", "") }})|{{ story.sub_category }}|{{ story.text }}|{{ story.state }}|
 {% endfor %}
 
 ## Risk Details
-{% for risk in model.risks -%}
+{% for risk in risks -%}
 ### {{ risk.id }} 
 > {{ risk.description }}
 
@@ -31,7 +31,7 @@
 ⚠ {{ risk.text }} [{{ risk.treatment.state }}]
 
 **Mitigations**:
-{% for story in risk.user_stories -%}
+{% for story in user_stories_by_risk[risk.id] -%}
 - {{ story.feature_name }}: [{{ story.id }}](#{{ story.id|lower|replace("@", "")|replace(".", "") }})
 {% endfor %}
 **References**:
@@ -42,7 +42,7 @@
 {% endfor %}
 
 ## User Story Details
-{% for story in model.user_stories -%}
+{% for story in user_stories -%}
 ### {{ story.id }} 
 > {{ story.description }} 
 
@@ -1,18 +1,25 @@
+import hashlib
 from abc import ABC, abstractmethod
 from enum import Enum
 from typing import (
+    Any,
     Callable,
     Dict,
+    FrozenSet,
+    Iterable,
     List,
     MutableMapping,
     Iterator,
     Optional,
     Sequence,
+    Set,
+    Tuple,
     TYPE_CHECKING,
 )
 
 if TYPE_CHECKING:
-    from .component import Component
+    from .component import Component, ComponentClass, DataFormat, Technology
+    from .data_flow import Protocol
     from .model import Model
     from .risk import ComponentRisk, ModelRisk, Risk
     from .user_story import UserStoryTemplate, UserStoryTemplateRepository
@@ -132,42 +139,96 @@ class ThreatLibrary(MutableMapping[str, "BaseThreat"]):
     def __init__(self) -> None:
         self.excludes: List[str] = list()  # TODO
         self._lib: Dict[str, "BaseThreat"] = dict()
+        self._version = 0
+        self._dispatch_index: Optional["ThreatDispatchIndex"] = None
+        self._fingerprint: Optional[Tuple[Tuple[int, Tuple[str, ...]], str]] = None
         self.after_apply_hook: Optional[Callable[[Sequence["Risk"]], None]] = None
 
+    @property
+    def version(self) -> int:
+        """Incremented whenever threats are added, replaced or removed"""
+        return self._version
+
+    def fingerprint(self) -> str:
+        """Returns a sha256 hex digest of the threats, with their attributes
+        and the code of their classes, and of the excludes"""
+        from .fingerprint import class_code, digest
+
+        key = (self._version, tuple(self.excludes))
+        if self._fingerprint is None or self._fingerprint[0] != key:
+            h = hashlib.sha256(repr(key[1]).encode("utf8"))
+            for threat in self.values():
+                cls = type(threat)
+                h.update(
+                    digest(
+                        [
+                            cls.__module__,
+                            cls.__qualname__,
+                            vars(threat),
+                            class_code(cls),
+                        ]
+                    )
+                )
+            self._fingerprint = (key, h.hexdigest())
+
+        return self._fingerprint[1]
+
     def add_threats(self, *threats: "BaseThreat") -> None:
         for threat in threats:
             self._lib[threat.id] = threat
+        self._version += 1
 
     def apply(
         self, model: "Model", component: Optional["Component"]
     ) -> List["Risk"]:
         risks: List["Risk"] = list()
 
-        for item in self.values():
+        for _, threat_risks in self.apply_threats(model, component):
+            if self.after_apply_hook is not None:
+                self.after_apply_hook(threat_risks)
+
+            risks.extend(threat_risks)
+
+        self.update_treatments(model, risks)
+
+        return risks
+
+    def apply_threats(
+        self, model: "Model", component: Optional["Component"]
+    ) -> List[Tuple["BaseThreat", List["Risk"]]]:
+        """Returns the risks of every applied threat, without calling the
+        after_apply_hook and without updating treatments"""
+        applied: List[Tuple["BaseThreat", List["Risk"]]] = list()
+
+        items: Iterable["BaseThreat"] = self.values()
+        if component is not None:
+            items = self.dispatch_index.get_threats(component)
+
+        for item in items:
             if item.id in self.excludes:
                 continue
 
             if isinstance(item, ComponentThreat) and component is not None:
                 if item.is_applicable(component):
-                    component_risks = item.apply(model, component)
-                    
-                    if self.after_apply_hook is not None:
-                        self.after_apply_hook(component_risks)    
-                    
-                    risks.extend(component_risks)
+                    applied.append((item, list(item.apply(model, component))))
                     continue
-                    
 
             if isinstance(item, ModelThreat) and component is None:
-                model_risks = item.apply(model)
-
-                if self.after_apply_hook is not None:
-                        self.after_apply_hook(model_risks)
-
-                risks.extend(model_risks)
+                applied.append((item, list(item.apply(model))))
                 continue
 
-        # Update states
+        return applied
+
+    @property
+    def dispatch_index(self) -> "ThreatDispatchIndex":
+        if (
+            self._dispatch_index is None
+            or self._dispatch_index.version != self._version
+        ):
+            self._dispatch_index = ThreatDispatchIndex(self)
+        return self._dispatch_index
+
+    def update_treatments(self, model: "Model", risks: Sequence["Risk"]) -> None:
         for risk in risks:
             new_state = model.get_state_by_id(risk.id)
             if new_state is not None:
@@ -176,17 +237,23 @@ class ThreatLibrary(MutableMapping[str, "BaseThreat"]):
                     ticket=new_state.ticket,
                     comment=new_state.comment,
                 )
-        
-        return risks
 
     def __getitem__(self, id: str) -> "BaseThreat":
         return self._lib[id]
 
+    def __getstate__(self) -> Dict[str, Any]:
+        # hooks are often lambdas and are only called in the evaluating process
+        state = self.__dict__.copy()
+        state["after_apply_hook"] = None
+        return state
+
     def __setitem__(self, id: str, value: "BaseThreat") -> None:
         self._lib[id] = value
+        self._version += 1
 
     def __delitem__(self, id: str) -> None:
         del self._lib[id]
+        self._version += 1
 
     def __iter__(self) -> Iterator[str]:
         return iter(self._lib)
@@ -195,6 +262,73 @@ class ThreatLibrary(MutableMapping[str, "BaseThreat"]):
         return len(self._lib)
 
 
+class ThreatDispatchIndex:
+    """Index of the component threats of a library by their applicability keys.
+
+    Each threat declaring keys is indexed under the keys of its first declared
+    kind, so a component is only offered threats matching one of its keys (and
+    threats without keys). Remaining kinds are checked on the candidates.
+    """
+
+    KINDS = (
+        "technologies",
+        "component_classes",
+        "data_formats",
+        "incoming_protocols",
+        "outgoing_protocols",
+    )
+
+    def __init__(self, library: "ThreatLibrary") -> None:
+        self.version = library.version
+
+        self._positions: Dict[str, int] = dict()
+        self._unconditional: List["ComponentThreat"] = list()
+        self._index: Dict[Tuple[str, Any], List["ComponentThreat"]] = dict()
+
+        for position, threat in enumerate(library.values()):
+            if not isinstance(threat, ComponentThreat):
+                continue
+
+            self._positions[threat.id] = position
+
+            applicability = threat.applicability
+            if len(applicability) == 0:
+                self._unconditional.append(threat)
+                continue
+
+            kind = next(kind for kind in self.KINDS if kind in applicability)
+            for key in applicability[kind]:
+                self._index.setdefault((kind, key), []).append(threat)
+
+    def get_threats(self, component: "Component") -> List["ComponentThreat"]:
+        """Returns the threats that may apply to the component, in library order"""
+        keys: Dict[str, Set[Any]] = {
+            "technologies": {component.technology},
+            "component_classes": component.component_classes,
+            "data_formats": set(component.accepts_data_formats),
+            "incoming_protocols": {f.protocol for f in component.incoming_flows},
+            "outgoing_protocols": {f.protocol for f in component.outgoing_flows},
+        }
+
+        candidates: Dict[str, "ComponentThreat"] = dict()
+        for kind in self.KINDS:
+            for key in keys[kind]:
+                for threat in self._index.get((kind, key), []):
+                    candidates[threat.id] = threat
+
+        threats = [
+            threat
+            for threat in candidates.values()
+            if all(
+                not keys[kind].isdisjoint(values)
+                for kind, values in threat.applicability.items()
+            )
+        ]
+        threats.extend(self._unconditional)
+
+        return sorted(threats, key=lambda threat: self._positions[threat.id])
+
+
 class BaseThreat(ABC):
     def __init__(
         self,
@@ -261,9 +395,42 @@ class ComponentThreat(BaseThreat):
         cwe_ids: List[int] = [],
         prerequisites: List[str] = [],
         references: List[str] = [],
+        *,
+        technologies: Iterable["Technology"] = (),
+        component_classes: Iterable["ComponentClass"] = (),
+        data_formats: Iterable["DataFormat"] = (),
+        incoming_protocols: Iterable["Protocol"] = (),
+        outgoing_protocols: Iterable["Protocol"] = (),
     ) -> None:
+        """
+        The optional applicability keys are necessary conditions of the threat:
+        if keys of a kind are declared, the threat is only applied to components
+        matching at least one of them, e.g. with an outgoing flow using one of
+        the outgoing_protocols.
+        """
         super().__init__(id, name, description, risk_text, category, cwe_ids, prerequisites, references)
 
+        self.technologies = frozenset(technologies)
+        self.component_classes = frozenset(component_classes)
+        self.data_formats = frozenset(data_formats)
+        self.incoming_protocols = frozenset(incoming_protocols)
+        self.outgoing_protocols = frozenset(outgoing_protocols)
+
+    @property
+    def applicability(self) -> Dict[str, FrozenSet[Any]]:
+        """The declared applicability keys by kind"""
+        return {
+            kind: keys
+            for kind, keys in [
+                ("technologies", self.technologies),
+                ("component_classes", self.component_classes),
+                ("data_formats", self.data_formats),
+                ("incoming_protocols", self.incoming_protocols),
+                ("outgoing_protocols", self.outgoing_protocols),
+            ]
+            if len(keys) > 0
+        }
+
     def is_applicable(self, component: "Component") -> bool:
         if component.out_of_scope:
             return False
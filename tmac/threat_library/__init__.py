@@ -1,8 +1,13 @@
 import os
 from typing import TYPE_CHECKING, List
 
-from ..component import DataFormat, Component, Technology
-from ..data_flow import Protocol
+from ..component import ComponentClass, DataFormat, Component, Technology
+from ..data_flow import (
+    NOSQL_DATABASE_PROTOCOLS,
+    RELATIONAL_DATABASE_PROTOCOLS,
+    WEB_ACCESS_PROTOCOLS,
+    Protocol,
+)
 from ..risk import ComponentRisk
 from ..threat import CAPEC, ComponentThreat, ThreatLibrary
 from ..user_story import ASVSCategory, UserStoryTemplate, UserStoryTemplateRepository
@@ -25,6 +30,7 @@ class CAPEC_17(ComponentThreat):
             risk_text="Using Malicious Files risk at {{ component.name }}.",
             cwe_ids=[732, 285, 272, 59, 282, 270, 693],
             references=["https://capec.mitre.org/data/definitions/17.html"],
+            data_formats=[DataFormat.FILE],
         )
 
     def apply(self, model: "Model", component: "Component") -> List["ComponentRisk"]:
@@ -46,6 +52,8 @@ class CAPEC_62(ComponentThreat):
             risk_text="Cross-Site Request Forgery (CSRF) risk at {{ component.name }} via {{ data_flow.name }} from {{ data_flow.source.name }}",
             cwe_ids=[352, 306, 664, 732, 1275],
             references=["https://capec.mitre.org/data/definitions/62.html"],
+            component_classes=[ComponentClass.WEB_APPLICATION],
+            incoming_protocols=WEB_ACCESS_PROTOCOLS,
         )
 
     def apply(self, model: "Model", component: "Component") -> List["ComponentRisk"]:
@@ -78,6 +86,7 @@ class CAPEC_63(ComponentThreat):
             risk_text="Cross-Site Scripting (XSS) risk at {{ component.name }}",
             cwe_ids=[79, 20],
             references=["https://capec.mitre.org/data/definitions/63.html"],
+            component_classes=[ComponentClass.WEB_APPLICATION],
         )
 
     def apply(self, model: "Model", component: "Component") -> List["ComponentRisk"]:
@@ -133,6 +142,7 @@ class CAPEC_66(ComponentThreat):
             risk_text="SQL Injection risk at {{ component.name }} against database {{ data_flow.destination.name }} via {{ data_flow.name }}",
             cwe_ids=[89, 1286],
             references=["https://capec.mitre.org/data/definitions/66.html"],
+            outgoing_protocols=RELATIONAL_DATABASE_PROTOCOLS,
         )
 
     def apply(self, model: "Model", component: "Component") -> List["ComponentRisk"]:
@@ -195,6 +205,7 @@ class CAPEC_136(ComponentThreat):
             risk_text="LDAP Injection risk at {{ component.name }} against LDAP server {{ data_flow.destination.name }} via {{ data_flow.name }}.",
             cwe_ids=[77, 90, 20],
             references=["https://capec.mitre.org/data/definitions/136.html"],
+            outgoing_protocols=[Protocol.LDAP, Protocol.LDAPS],
         )
 
     def apply(self, model: "Model", component: "Component") -> List["ComponentRisk"]:
@@ -225,6 +236,7 @@ class CAPEC_250(ComponentThreat):
             risk_text="XML Injection risk at {{ component.name }}.",
             cwe_ids=[91, 74, 20, 707],
             references=["https://capec.mitre.org/data/definitions/250.html"],
+            data_formats=[DataFormat.XML],
         )
 
     def apply(self, model: "Model", component: "Component") -> List["ComponentRisk"]:
@@ -249,6 +261,7 @@ class CAPEC_664(ComponentThreat):
             risk_text="Server Side Request Forgery (SSRF) risk at {{ component.name }} requesting the target {{ data_flow.destination.name }} via {{ data_flow.name }}.",
             cwe_ids=[918, 20],
             references=["https://capec.mitre.org/data/definitions/664.html"],
+            outgoing_protocols=WEB_ACCESS_PROTOCOLS,
         )
 
     def apply(self, model: "Model", component: "Component") -> List["ComponentRisk"]:
@@ -284,6 +297,7 @@ class CAPEC_676(ComponentThreat):
             risk_text="NoSQL Injection risk at {{ component.name }} against database {{ data_flow.destination.name }} via {{ data_flow.name }}",
             cwe_ids=[943, 1286],
             references=["https://capec.mitre.org/data/definitions/676.html"],
+            outgoing_protocols=NOSQL_DATABASE_PROTOCOLS,
         )
 
     def apply(self, model: "Model", component: "Component") -> List["ComponentRisk"]:
@@ -315,7 +329,8 @@ DEFAULT_THREAT_LIBRARY.add_threats(
 )
 
 DEFAULT_USER_STORY_TEMPLATE_REPOSITORY = UserStoryTemplateRepository.fromFile(
-    os.path.dirname(__file__) + "/templates/user_story_templates.json"
+    os.path.dirname(__file__) + "/templates/user_story_templates.json",
+    lazy=True,
 )
 
 __all__ = (
@@ -1,8 +1,10 @@
-from typing import TYPE_CHECKING, List, Optional, Set
+from typing import TYPE_CHECKING, Any, List, Optional
 
 from .diagram import DiagramCluster
 from .element import Element
+from .fingerprint import reference
 from .node import Construct
+from .otm import OpenThreatModelTrustZone
 
 if TYPE_CHECKING:
     from .component import Component
@@ -11,43 +13,71 @@ if TYPE_CHECKING:
 class TrustBoundary(Element):
     """Trust boundary."""
 
+    __slots__ = ("_trust_boundary", "_parents")
+
     def __init__(
         self,
         scope: Construct,
         name: str,
         description: str = "",
         trust_boundary: Optional["TrustBoundary"] = None,
+        *,
+        id: Optional[str] = None,
     ) -> None:
-        super().__init__(scope, name, description=description)
+        super().__init__(scope, name, description=description, id=id)
+
+        self._trust_boundary = trust_boundary
+        self._parents: Optional[List["TrustBoundary"]] = None
 
-        self.trust_boundary = trust_boundary
+        self._model._add_trust_boundary_child(self)
 
     @property
-    def components(self) -> List["Component"]:
-        components: Set["Component"] = set()
-        for c in self._model.components:
-            if c.trust_boundary == self:
-                components.add(c)
+    def trust_boundary(self) -> Optional["TrustBoundary"]:
+        return self._trust_boundary
 
-        return list(components)
+    @trust_boundary.setter
+    def trust_boundary(self, trust_boundary: Optional["TrustBoundary"]) -> None:
+        self._model._remove_trust_boundary_child(self)
+        self._trust_boundary = trust_boundary
+        self._model._add_trust_boundary_child(self)
+        self._clear_parents()
+        self._clear_digest()
 
     @property
-    def children(self) -> List["TrustBoundary"]:
-        children: Set["TrustBoundary"] = set()
-        for tb in self._model.trust_boundaries:
-            if tb.trust_boundary == self:
-                children.add(tb)
+    def components(self) -> List["Component"]:
+        return list(self._model._trust_boundary_components.get(self, []))
 
-        return list(children)
+    @property
+    def children(self) -> List["TrustBoundary"]:
+        return list(self._model._trust_boundary_children.get(self, []))
 
     @property
     def parents(self) -> List["TrustBoundary"]:
-        result = []
-        parent = self.trust_boundary
-        while parent is not None:
-            result.append(parent)
-            parent = parent.trust_boundary
-        return result
+        if self._parents is None:
+            parent = self.trust_boundary
+            if parent is None:
+                self._parents = []
+            else:
+                self._parents = [parent, *parent.parents]
+        return list(self._parents)
+
+    def _fingerprint_fields(self) -> List[Any]:
+        return [*super()._fingerprint_fields(), reference(self._trust_boundary)]
+
+    @property
+    def _affected_components(self) -> List["Component"]:
+        return [
+            affected for c in self.components for affected in c._affected_components
+        ]
+
+    @property
+    def otm(self) -> "OpenThreatModelTrustZone":
+        return OpenThreatModelTrustZone(
+            self.id,
+            self.name,
+            description=self.description,
+            parent=None if self.trust_boundary is None else self.trust_boundary.id,
+        )
 
     @property
     def diagram_cluster(self) -> "DiagramCluster":
@@ -56,3 +86,8 @@ class TrustBoundary(Element):
             nodes=[c.diagram_node for c in self.components],
             clusters=[tb.diagram_cluster for tb in self.children],
         )
+
+    def _clear_parents(self) -> None:
+        self._parents = None
+        for tb in self.children:
+            tb._clear_parents()
@@ -1,9 +1,21 @@
+import hashlib
 import json
 from abc import ABC, abstractproperty
 from enum import Enum
-from typing import TYPE_CHECKING, Dict, Generic, List, TypeVar
-
-from jinja2 import Template
+from functools import partial
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    Generic,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+from .fingerprint import digest
+from .template import render_template
 
 
 if TYPE_CHECKING:
@@ -17,36 +29,81 @@ class ASVSCategory(str, Enum):
 
 class UserStoryTemplateRepository:
     @staticmethod
-    def fromFile(filename: str) -> "UserStoryTemplateRepository":
+    def fromFile(filename: str, *, lazy: bool = False) -> "UserStoryTemplateRepository":
+        """Creates a repository from a json file of templates. With lazy the
+        file is loaded on first use of the repository."""
         repostiroy = UserStoryTemplateRepository()
+        repostiroy._loader = partial(_load_templates, filename)
 
-        with open(filename, "r", encoding="utf8") as tpl_file:
-            tpl_json = json.load(tpl_file)
-
-        for tpl in tpl_json:
-            repostiroy.add_templates(UserStoryTemplate(**tpl))
+        if not lazy:
+            repostiroy._load()
 
         return repostiroy
 
     def __init__(self) -> None:
         self._lib: Dict[str, "UserStoryTemplate"] = dict()
+        self._positions: Dict[str, int] = dict()
+        self._cwe_index: Dict[int, List["UserStoryTemplate"]] = dict()
+        self._loader: Optional[Callable[[], List["UserStoryTemplate"]]] = None
+        self._version = 0
+        self._fingerprint: Optional[Tuple[int, str]] = None
+
+    @property
+    def version(self) -> int:
+        """Incremented whenever templates are added or replaced"""
+        return self._version
+
+    def _load(self) -> None:
+        if self._loader is not None:
+            loader, self._loader = self._loader, None
+            self.add_templates(*loader())
 
     def add_templates(self, *templates: "UserStoryTemplate") -> None:
+        self._load()
+
         for template in templates:
+            replaced = self._lib.get(template.id)
+            if replaced is not None:
+                for cwe_id in replaced.cwe_ids:
+                    self._cwe_index[cwe_id].remove(replaced)
+
             self._lib[template.id] = template
+            self._positions.setdefault(template.id, len(self._positions))
+
+            for cwe_id in template.cwe_ids:
+                tpls = self._cwe_index.setdefault(cwe_id, [])
+                if template not in tpls:
+                    tpls.append(template)
+
+        self._version += 1
+
+    def fingerprint(self) -> str:
+        """Returns a sha256 hex digest of the templates"""
+        self._load()
+
+        if self._fingerprint is None or self._fingerprint[0] != self._version:
+            h = hashlib.sha256()
+            for template in self._lib.values():
+                h.update(digest([vars(template)]))
+            self._fingerprint = (self._version, h.hexdigest())
+
+        return self._fingerprint[1]
 
     def get_by_id(self, id: str) -> "UserStoryTemplate":
+        self._load()
         return self._lib[id]
 
     def get_all(self) -> List["UserStoryTemplate"]:
+        self._load()
         return list(self._lib.values())
 
     def get_by_cwe(self, *cwe_ids: int) -> List["UserStoryTemplate"]:
-        tpls: List["UserStoryTemplate"] = list()
-        for tpl in self._lib.values():
-            if any(x in tpl.cwe_ids for x in cwe_ids):
-                tpls.append(tpl)
-        return tpls
+        self._load()
+        tpls: Dict[str, "UserStoryTemplate"] = dict()
+        for cwe_id in cwe_ids:
+            for tpl in self._cwe_index.get(cwe_id, []):
+                tpls[tpl.id] = tpl
+        return sorted(tpls.values(), key=lambda tpl: self._positions[tpl.id])
 
 
 class UserStoryTemplate:
@@ -77,10 +134,28 @@ class UserStoryTemplate:
         self.tags = tags
 
 
+def _load_templates(filename: str) -> List["UserStoryTemplate"]:
+    with open(filename, "r", encoding="utf8") as tpl_file:
+        tpl_json = json.load(tpl_file)
+
+    return [UserStoryTemplate(**tpl) for tpl in tpl_json]
+
+
 T = TypeVar("T")
 
 
 class UserStory(Generic[T]):
+    # weak referenced by the user story map of the model
+    __slots__ = (
+        "_id",
+        "_template",
+        "_risk",
+        "state",
+        "ticket",
+        "comment",
+        "__weakref__",
+    )
+
     def __init__(
         self,
         id: str,
@@ -141,6 +216,8 @@ class UserStory(Generic[T]):
 
 
 class ComponentUserStory(UserStory["ComponentRisk"]):
+    __slots__ = ()
+
     def __init__(
         self,
         id: str,
@@ -154,7 +231,8 @@ class ComponentUserStory(UserStory["ComponentRisk"]):
         if self._template.user_story == "TODO":
             return self.description
 
-        return Template(self._template.user_story).render(
+        return render_template(
+            self._template.user_story,
             component=self._risk.component,
             data_flow=self._risk.data_flow,
             model=self._risk.model,
@@ -162,6 +240,8 @@ class ComponentUserStory(UserStory["ComponentRisk"]):
 
 
 class ModelUserStory(UserStory["ModelRisk"]):
+    __slots__ = ()
+
     def __init__(
         self,
         id: str,
@@ -175,4 +255,4 @@ class ModelUserStory(UserStory["ModelRisk"]):
         if self._template.user_story == "TODO":
             return self.description
 
-        return Template(self._template.user_story).render(model=self._risk.model)
+        return render_template(self._template.user_story, model=self._risk.model)
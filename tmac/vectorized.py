@@ -0,0 +1,476 @@
+"""Vectorized evaluation of component threats with numpy.
+
+Component and data flow attributes are packed into columnar arrays, and
+threats described by a declarative Rule are evaluated as boolean masks over
+all components at once. Threats without a rule are applied per component as
+ThreatLibrary.apply does, so the result is the same list of risks.
+
+    from tmac.vectorized import VectorizedEngine
+
+    risks = VectorizedEngine(model.threat_library).apply(model)
+"""
+from abc import ABC, abstractmethod
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
+
+try:
+    import numpy as np
+except ImportError as e:  # pragma: no cover
+    raise ImportError(
+        "tmac.vectorized requires numpy, install it with: pip install tmac[numpy]"
+    ) from e
+
+from .component import DataFormat, Technology
+from .data_flow import (
+    NOSQL_DATABASE_PROTOCOLS,
+    RELATIONAL_DATABASE_PROTOCOLS,
+    WEB_ACCESS_PROTOCOLS,
+    Protocol,
+)
+from .risk import ComponentRisk
+from .threat import ComponentThreat
+from .threat_library import (
+    CAPEC_17,
+    CAPEC_62,
+    CAPEC_63,
+    CAPEC_66,
+    CAPEC_126,
+    CAPEC_136,
+    CAPEC_250,
+    CAPEC_664,
+    CAPEC_676,
+)
+
+if TYPE_CHECKING:
+    from .component import Component
+    from .data_flow import DataFlow
+    from .model import Model
+    from .risk import Risk
+    from .threat import ThreatLibrary
+
+
+class Predicate(ABC):
+    """A boolean condition evaluated over all rows of a table"""
+
+    @abstractmethod
+    def evaluate(self, table: "Table") -> "np.ndarray":
+        pass
+
+    def __and__(self, other: "Predicate") -> "Predicate":
+        return _And(self, other)
+
+    def __or__(self, other: "Predicate") -> "Predicate":
+        return _Or(self, other)
+
+    def __invert__(self) -> "Predicate":
+        return _Not(self)
+
+
+class Column(Predicate):
+    """A column of the component or flow table. Boolean columns can be used as
+    predicates directly."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def isin(self, values: Iterable[Any]) -> "Predicate":
+        return _IsIn(self.name, list(values))
+
+    def contains(self, value: Any) -> "Predicate":
+        return _Contains(self.name, value)
+
+    def evaluate(self, table: "Table") -> "np.ndarray":
+        column = table.column(self.name)
+        if not isinstance(column, np.ndarray):
+            raise ValueError(f"Column {self.name} is not a boolean column")
+        return column
+
+
+class _IsIn(Predicate):
+    def __init__(self, name: str, values: List[Any]) -> None:
+        self._name = name
+        self._values = values
+
+    def evaluate(self, table: "Table") -> "np.ndarray":
+        column = table.column(self._name)
+        if not isinstance(column, _Categorical):
+            raise ValueError(f"Column {self._name} is not a categorical column")
+        selected = np.zeros(len(column.lookup) + 1, dtype=bool)
+        for v in self._values:
+            if v in column.lookup:
+                selected[column.lookup[v]] = True
+        return selected[column.codes]
+
+
+class _Contains(Predicate):
+    def __init__(self, name: str, value: Any) -> None:
+        self._name = name
+        self._value = value
+
+    def evaluate(self, table: "Table") -> "np.ndarray":
+        column = table.column(self._name)
+        if not isinstance(column, _Set):
+            raise ValueError(f"Column {self._name} is not a set column")
+        return column.members.get(self._value, np.zeros(len(table), dtype=bool))
+
+
+class _And(Predicate):
+    def __init__(self, left: "Predicate", right: "Predicate") -> None:
+        self._left = left
+        self._right = right
+
+    def evaluate(self, table: "Table") -> "np.ndarray":
+        return self._left.evaluate(table) & self._right.evaluate(table)
+
+
+class _Or(Predicate):
+    def __init__(self, left: "Predicate", right: "Predicate") -> None:
+        self._left = left
+        self._right = right
+
+    def evaluate(self, table: "Table") -> "np.ndarray":
+        return self._left.evaluate(table) | self._right.evaluate(table)
+
+
+class _Not(Predicate):
+    def __init__(self, predicate: "Predicate") -> None:
+        self._predicate = predicate
+
+    def evaluate(self, table: "Table") -> "np.ndarray":
+        return ~self._predicate.evaluate(table)
+
+
+def component(name: str) -> "Column":
+    """A column of the component table: technology, machine, encryption,
+    out_of_scope, accepts_data_formats, is_client, is_web_application or
+    is_web_service"""
+    return Column(name)
+
+
+def flow(name: str) -> "Column":
+    """A column of the flow table: protocol, authentication, authorization,
+    is_encrypted, vpn, readonly, bidirectional, is_across_trust_boundary,
+    source_technology or destination_technology"""
+    return Column(name)
+
+
+class Rule:
+    """Declarative description of the risks of a component threat.
+
+    Without flows the threat yields one risk per component matching the
+    component predicate. With flows="incoming" or "outgoing" it yields one
+    risk per flow of a matching component that matches the flow predicate.
+    """
+
+    def __init__(
+        self,
+        component: Optional["Predicate"] = None,
+        *,
+        flows: Optional[str] = None,
+        flow: Optional["Predicate"] = None,
+    ) -> None:
+        if flows not in (None, "incoming", "outgoing"):
+            raise ValueError(f"Unknown flows: {flows}")
+        if flows is None and flow is not None:
+            raise ValueError("A flow predicate requires flows")
+
+        self.component = component
+        self.flows = flows
+        self.flow = flow
+
+
+class _Categorical:
+    def __init__(self, values: Sequence[Any]) -> None:
+        self.lookup: Dict[Any, int] = dict()
+        codes = [self.lookup.setdefault(v, len(self.lookup)) for v in values]
+        self.codes = np.array(codes, dtype=np.int64)
+
+
+class _Set:
+    def __init__(self, values: Sequence[Iterable[Any]]) -> None:
+        self.members: Dict[Any, "np.ndarray"] = dict()
+        for i, members in enumerate(values):
+            for member in members:
+                if member not in self.members:
+                    self.members[member] = np.zeros(len(values), dtype=bool)
+                self.members[member][i] = True
+
+
+def _boolean(values: Sequence[bool]) -> "np.ndarray":
+    return np.array(values, dtype=bool)
+
+
+class Table:
+    """Columns are built on first use, so only the columns used by rules are
+    packed"""
+
+    def __init__(
+        self,
+        size: int,
+        columns: Mapping[str, Callable[[], Union["np.ndarray", _Categorical, _Set]]],
+    ) -> None:
+        self._size = size
+        self._factories = columns
+        self._columns: Dict[str, Union["np.ndarray", _Categorical, _Set]] = dict()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def column(self, name: str) -> Union["np.ndarray", _Categorical, _Set]:
+        if name not in self._columns:
+            try:
+                factory = self._factories[name]
+            except KeyError:
+                raise ValueError(f"Unknown column: {name}") from None
+            self._columns[name] = factory()
+        return self._columns[name]
+
+    @classmethod
+    def from_components(cls, components: Sequence["Component"]) -> "Table":
+        cs = components
+        return cls(
+            len(cs),
+            {
+                "technology": lambda: _Categorical([c.technology for c in cs]),
+                "machine": lambda: _Categorical([c.machine for c in cs]),
+                "encryption": lambda: _Categorical([c.encryption for c in cs]),
+                "out_of_scope": lambda: _boolean([c.out_of_scope for c in cs]),
+                "accepts_data_formats": lambda: _Set(
+                    [c.accepts_data_formats for c in cs]
+                ),
+                "is_client": lambda: _boolean([c.is_client for c in cs]),
+                "is_web_application": lambda: _boolean(
+                    [c.is_web_application for c in cs]
+                ),
+                "is_web_service": lambda: _boolean([c.is_web_service for c in cs]),
+            },
+        )
+
+    @classmethod
+    def from_data_flows(cls, flows: Sequence["DataFlow"]) -> "Table":
+        fs = flows
+        return cls(
+            len(fs),
+            {
+                "protocol": lambda: _Categorical([f.protocol for f in fs]),
+                "authentication": lambda: _Categorical([f.authentication for f in fs]),
+                "authorization": lambda: _Categorical([f.authorization for f in fs]),
+                "is_encrypted": lambda: _boolean([f.is_encrypted for f in fs]),
+                "vpn": lambda: _boolean([f.vpn for f in fs]),
+                "readonly": lambda: _boolean([f.readonly for f in fs]),
+                "bidirectional": lambda: _boolean([f.bidirectional for f in fs]),
+                "is_across_trust_boundary": lambda: _boolean(
+                    [f.is_across_trust_boundary for f in fs]
+                ),
+                "source_technology": lambda: _Categorical(
+                    [f.source.technology for f in fs]
+                ),
+                "destination_technology": lambda: _Categorical(
+                    [f.destination.technology for f in fs]
+                ),
+            },
+        )
+
+
+class _Edges:
+    """The incoming or outgoing flows of the components, in adjacency order"""
+
+    def __init__(
+        self,
+        components: Sequence["Component"],
+        direction: str,
+        flow_index: Dict["DataFlow", int],
+        flows: List["DataFlow"],
+    ) -> None:
+        owners: List[int] = list()
+        edges: List[int] = list()
+        for i, c in enumerate(components):
+            for f in c.incoming_flows if direction == "incoming" else c.outgoing_flows:
+                if f not in flow_index:
+                    flow_index[f] = len(flows)
+                    flows.append(f)
+                owners.append(i)
+                edges.append(flow_index[f])
+
+        self.owners = np.array(owners, dtype=np.int64)
+        self.flows = np.array(edges, dtype=np.int64)
+
+
+DEFAULT_RULES: Dict[Type["ComponentThreat"], "Rule"] = {
+    CAPEC_17: Rule(component("accepts_data_formats").contains(DataFormat.FILE)),
+    CAPEC_62: Rule(
+        component("is_web_application"),
+        flows="incoming",
+        flow=flow("protocol").isin(WEB_ACCESS_PROTOCOLS),
+    ),
+    CAPEC_63: Rule(component("is_web_application")),
+    CAPEC_66: Rule(
+        flows="outgoing",
+        flow=flow("protocol").isin(RELATIONAL_DATABASE_PROTOCOLS),
+    ),
+    CAPEC_126: Rule(
+        flows="outgoing",
+        flow=flow("destination_technology").isin(
+            [Technology.FILE_SERVER, Technology.LOCAL_FILE_SYSTEM]
+        ),
+    ),
+    CAPEC_136: Rule(
+        flows="outgoing",
+        flow=flow("protocol").isin([Protocol.LDAP, Protocol.LDAPS]),
+    ),
+    CAPEC_250: Rule(component("accepts_data_formats").contains(DataFormat.XML)),
+    CAPEC_664: Rule(
+        ~(
+            component("is_client")
+            | component("technology").isin([Technology.LOAD_BALANCER])
+        ),
+        flows="outgoing",
+        flow=flow("protocol").isin(WEB_ACCESS_PROTOCOLS),
+    ),
+    CAPEC_676: Rule(
+        flows="outgoing",
+        flow=flow("protocol").isin(NOSQL_DATABASE_PROTOCOLS),
+    ),
+}
+
+
+class VectorizedEngine:
+    """Applies the component threats of a library to many components at once.
+
+    Threats whose type has a rule are evaluated with numpy, other threats (and
+    threats overriding is_applicable) are applied per component. A rule has
+    to describe exactly the risks the threat's apply returns.
+    """
+
+    def __init__(
+        self,
+        library: "ThreatLibrary",
+        rules: Mapping[Type["ComponentThreat"], "Rule"] = DEFAULT_RULES,
+    ) -> None:
+        self.library = library
+        self.rules = rules
+
+    def _rule(self, threat: "ComponentThreat") -> Optional["Rule"]:
+        if type(threat).is_applicable is not ComponentThreat.is_applicable:
+            return None
+        return self.rules.get(type(threat))
+
+    def apply(
+        self, model: "Model", components: Optional[Sequence["Component"]] = None
+    ) -> Dict["Component", List["Risk"]]:
+        """Returns the risks of each component, in the order of the components
+        and as ThreatLibrary.apply returns them"""
+        if components is None:
+            components = model.components
+
+        threats = [
+            (position, threat)
+            for position, threat in enumerate(self.library.values())
+            if isinstance(threat, ComponentThreat)
+            and threat.id not in self.library.excludes
+        ]
+
+        component_table = Table.from_components(components)
+        flows: List["DataFlow"] = list()
+        flow_index: Dict["DataFlow", int] = dict()
+        edges = {
+            direction: _Edges(components, direction, flow_index, flows)
+            for direction in ("incoming", "outgoing")
+        }
+        flow_table = Table.from_data_flows(flows)
+
+        hook = self.library.after_apply_hook
+        offered: Optional[List[Set["ComponentThreat"]]] = None
+
+        # the closure does not see that components is not None
+        targets: Sequence["Component"] = components
+
+        def applicable(threat: "ComponentThreat") -> Iterator[int]:
+            # the components ThreatLibrary.apply applies the threat to
+            nonlocal offered
+            if offered is None:
+                index = self.library.dispatch_index
+                offered = [set(index.get_threats(c)) for c in targets]
+            for i, c in enumerate(targets):
+                if threat in offered[i] and threat.is_applicable(c):
+                    yield i
+
+        # (component, threat position, order, risk) of every risk
+        found: List[Tuple[int, int, int, "Risk"]] = list()
+        # (component, threat position) of every applied threat, the hook is
+        # called for each, also without risks
+        applied: List[Tuple[int, int]] = list()
+        risk: "Risk"
+
+        for position, threat in threats:
+            rule = self._rule(threat)
+
+            if rule is None:
+                for i in applicable(threat):
+                    applied.append((i, position))
+                    for j, risk in enumerate(threat.apply(model, components[i])):
+                        found.append((i, position, j, risk))
+                continue
+
+            if hook is not None:
+                # only needed for the hook, the rule describes the risks
+                applied.extend((i, position) for i in applicable(threat))
+
+            mask: "np.ndarray" = ~component("out_of_scope").evaluate(component_table)
+            if rule.component is not None:
+                mask &= rule.component.evaluate(component_table)
+
+            if rule.flows is None:
+                for i in np.flatnonzero(mask):
+                    c = components[i]
+                    risk = ComponentRisk(threat, model=model, component=c)
+                    found.append((int(i), position, 0, risk))
+                continue
+
+            edge = edges[rule.flows]
+            edge_mask = mask[edge.owners]
+            if rule.flow is not None:
+                edge_mask &= rule.flow.evaluate(flow_table)[edge.flows]
+
+            for e in np.flatnonzero(edge_mask):
+                i = int(edge.owners[e])
+                risk = ComponentRisk(
+                    threat,
+                    model=model,
+                    component=components[i],
+                    data_flow=flows[edge.flows[e]],
+                )
+                found.append((i, position, int(e), risk))
+
+        found.sort(key=lambda f: f[:3])
+
+        result: Dict["Component", List["Risk"]] = {c: [] for c in components}
+        groups: Dict[Tuple[int, int], List["Risk"]] = dict()
+        for i, position, _, risk in found:
+            result[components[i]].append(risk)
+            groups.setdefault((i, position), []).append(risk)
+
+        # like ThreatLibrary.apply, the hook is called with the risks of each
+        # applied threat and component, in the order of the components
+        if hook is not None:
+            for key in sorted({*applied, *groups}):
+                hook(groups.get(key, []))
+
+        for risks in result.values():
+            self.library.update_treatments(model, risks)
+
+        return result